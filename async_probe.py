@@ -0,0 +1,181 @@
+import contextlib
+import contextvars
+import functools
+import shlex
+import subprocess
+import threading
+from typing import Callable, List, Optional, Sequence, Set
+from lazy_backend import lazy_module
+
+# Загружается при первом обращении: цикл событий нужен только запускам с --async
+asyncio = lazy_module('asyncio')
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_PROBE_TIMEOUT = 30.0
+
+
+class ProbeError(Exception):
+    """Пробу не удалось запустить, или она завершилась с ненулевым кодом"""
+
+    def __init__(self, message: str, returncode: Optional[int] = None):
+        super().__init__(message)
+        self.returncode = returncode
+
+
+class ProbeTimeout(ProbeError):
+    """Проба превысила таймаут и была завершена"""
+
+
+class ProbeCancelled(ProbeError):
+    """Сбор, запустивший пробу, отменен"""
+
+
+def split_command(cmd: str) -> List[str]:
+    """Разбивает командную строку на argv без участия оболочки.
+
+    Кавычки Windows сохраняются как есть (posix=False), чтобы аргументы вида
+    ``/C:"text"`` доходили до программы так же, как через cmd.exe.
+    """
+    return shlex.split(cmd, posix=False)
+
+
+# Задается внутри сборщиков, запущенных AsyncProbeEngine.call(): синхронные
+# функции run_command отправляют команды через него, а не блокируются
+_probe_runner: contextvars.ContextVar = contextvars.ContextVar('probe_runner', default=None)
+
+
+def active_probe_runner() -> Optional[Callable[..., str]]:
+    """Исполнитель проб текущего асинхронного сбора или None вне движка"""
+    return _probe_runner.get()
+
+
+@contextlib.contextmanager
+def use_probe_runner(runner: Callable[..., str]):
+    """Направляет функции run_command этого потока через ``runner``.
+
+    Исполнитель вызывается как ``runner(argv, encoding=..., timeout=...)`` и
+    возвращает stdout или выбрасывает ProbeError; у него может быть и метод
+    ``powershell(script, timeout)``.
+    """
+    token = _probe_runner.set(runner)
+    try:
+        yield runner
+    finally:
+        _probe_runner.reset(token)
+
+
+class AsyncProbeEngine:
+    """Выполняет пробы оборудования через asyncio.create_subprocess_exec (без оболочки).
+
+    Одновременно выполняется не более ``concurrency`` проб; по истечении таймаута
+    процесс завершается, как и при отмене ожидающей его задачи.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, timeout: float = DEFAULT_PROBE_TIMEOUT,
+                 encoding: str = 'utf-8'):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.encoding = encoding
+        self.spawns = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _limit(self) -> 'asyncio.Semaphore':
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    @staticmethod
+    async def _kill(process: 'asyncio.subprocess.Process'):
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+
+    async def run(self, argv: Sequence[str], timeout: Optional[float] = None,
+                  encoding: Optional[str] = None) -> str:
+        """Выполняет одну пробу и возвращает ее декодированный stdout"""
+        timeout = self.timeout if timeout is None else timeout
+        async with self._limit():
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *argv, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            except OSError as e:
+                raise ProbeError(f"{argv[0]}: {e}") from e
+            self.spawns += 1
+            try:
+                stdout, _ = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                await self._kill(process)
+                raise ProbeTimeout(f"{argv[0]}: no result within {timeout:g} s") from None
+            except asyncio.CancelledError:
+                await self._kill(process)
+                raise
+        if process.returncode != 0:
+            raise ProbeError(f"{argv[0]}: exit status {process.returncode}", process.returncode)
+        return stdout.decode(encoding or self.encoding, errors='replace')
+
+    async def call(self, func: Callable, *args, timeout: Optional[float] = None):
+        """Выполняет синхронный сборщик в рабочем потоке, направляя его пробы
+        через этот движок; ``timeout`` ограничивает весь сборщик"""
+        loop = asyncio.get_running_loop()
+        bridge = _ProbeBridge(self, loop)
+        context = contextvars.copy_context()
+        context.run(_probe_runner.set, bridge)
+        future = loop.run_in_executor(None, functools.partial(context.run, func, *args))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except BaseException:
+            # Таймаут или отмена: выполняющиеся пробы завершаются, остальные сразу получают ошибку
+            bridge.cancel()
+            raise
+
+
+class _ProbeBridge:
+    """Синхронный исполнитель для сборщиков, работающих в рабочем потоке"""
+
+    def __init__(self, engine: AsyncProbeEngine, loop: 'asyncio.AbstractEventLoop'):
+        self.engine = engine
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._pending: Set = set()
+        self._cancelled = False
+
+    def __call__(self, argv: Sequence[str], encoding: Optional[str] = None,
+                 timeout: Optional[float] = None) -> str:
+        with self._lock:
+            if self._cancelled:
+                raise ProbeCancelled(argv[0])
+            future = asyncio.run_coroutine_threadsafe(self.engine.run(argv, timeout, encoding), self.loop)
+            self._pending.add(future)
+        try:
+            return future.result()
+        except Exception as e:
+            if future.cancelled():
+                raise ProbeCancelled(argv[0]) from None
+            raise e
+        finally:
+            with self._lock:
+                self._pending.discard(future)
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            pending = list(self._pending)
+        for future in pending:
+            future.cancel()
+
+
+def async_collector(func: Callable) -> Callable:
+    """Асинхронная версия синхронного сборщика: ``await f(engine=None, timeout=None)``"""
+
+    @functools.wraps(func)
+    async def wrapper(engine: Optional[AsyncProbeEngine] = None, timeout: Optional[float] = None):
+        return await (engine or AsyncProbeEngine()).call(func, timeout=timeout)
+
+    wrapper.__name__ = wrapper.__qualname__ = f"{func.__name__}_async"
+    return wrapper
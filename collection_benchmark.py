@@ -0,0 +1,143 @@
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+from cpu_sampler import get_cpu_sampler
+from probe_replay import TOOLS, FixtureBundle, parse_latency, recording, replaying, tool_sections
+from structured_output import write_record
+
+# Per-section cost of hardware.py / serial.py against recorded fixture bundles:
+#   wall  - time the collector took
+#   probe - time spent waiting for probes (the injected latency during replay) and
+#           for the live CPU load window (cpu_sampler's minimum window)
+#   parse - wall - probe, i.e. our own parsing and formatting
+# `python collection_benchmark.py tests/fixtures/*.json --output bench.ndjson` appends one
+# record per bundle, so collector performance can be tracked over time.
+
+
+def run_sections(session, tools: Sequence[str]) -> List[dict]:
+    """One pass over every section inside ``session`` (recording or replaying)"""
+    rows = []
+    sampler = get_cpu_sampler()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        with session as runner:
+            for tool in tools:
+                for title, func in tool_sections(tool):
+                    spawns, probe_time, misses = runner.counters()
+                    waited = sampler.waited
+                    start = time.perf_counter()
+                    try:
+                        func()
+                        error = None
+                    except Exception as e:
+                        error = f"{type(e).__name__}: {e}"
+                    wall = time.perf_counter() - start
+                    spawns_after, probe_after, misses_after = runner.counters()
+                    rows.append({
+                        "tool": tool,
+                        "section": title,
+                        "wall": wall,
+                        "probe": probe_after - probe_time + sampler.waited - waited,
+                        "spawns": spawns_after - spawns,
+                        "misses": misses_after - misses,
+                        "error": error,
+                    })
+    return rows
+
+
+def summarize(passes: List[List[dict]]) -> List[dict]:
+    """Median over passes, per section"""
+    summary = []
+    for rows in zip(*passes):
+        first = rows[0]
+        wall = statistics.median(r["wall"] for r in rows)
+        probe = statistics.median(r["probe"] for r in rows)
+        summary.append({
+            "tool": first["tool"],
+            "section": first["section"],
+            "wall_ms": wall * 1000,
+            "probe_ms": probe * 1000,
+            "parse_ms": max(0.0, wall - probe) * 1000,
+            "spawns": max(r["spawns"] for r in rows),
+            "misses": max(r["misses"] for r in rows),
+            "error": first["error"],
+        })
+    return summary
+
+
+def benchmark_bundle(bundle: FixtureBundle, tools: Sequence[str], repeat: int = 5,
+                     latency=None) -> List[dict]:
+    passes = [run_sections(replaying(bundle, latency), tools) for _ in range(repeat)]
+    return summarize(passes)
+
+
+def benchmark_live(tools: Sequence[str], repeat: int = 1) -> List[dict]:
+    """Same measurements against the real machine (probes are recorded and discarded)"""
+    passes = [run_sections(recording(FixtureBundle.capture()), tools) for _ in range(repeat)]
+    return summarize(passes)
+
+
+def print_summary(name: str, summary: List[dict]):
+    print(f"\n{name}")
+    print(f"  {'section':<36} {'wall':>9} {'probe':>9} {'parse':>9} {'spawns':>7} {'misses':>7}")
+    totals: Dict[str, List[float]] = {}
+    for row in summary:
+        label = f"{row['tool']}: {row['section']}"
+        print(f"  {label[:36]:<36} {row['wall_ms']:>7.1f}ms {row['probe_ms']:>7.1f}ms "
+              f"{row['parse_ms']:>7.1f}ms {row['spawns']:>7d} {row['misses']:>7d}"
+              + (f"  {row['error']}" if row['error'] else ''))
+        total = totals.setdefault(row['tool'], [0.0, 0.0, 0.0, 0])
+        total[0] += row['wall_ms']
+        total[1] += row['probe_ms']
+        total[2] += row['parse_ms']
+        total[3] += row['spawns']
+    for tool, (wall, probe, parse, spawns) in totals.items():
+        print(f"  {tool + ' total':<36} {wall:>7.1f}ms {probe:>7.1f}ms {parse:>7.1f}ms {spawns:>7d}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Per-section benchmark of hardware.py and serial.py collectors")
+    parser.add_argument('bundles', nargs='*', help="fixture bundles recorded with probe_replay.py record")
+    parser.add_argument('--live', action='store_true', help="also measure against the real machine")
+    parser.add_argument('--tool', choices=TOOLS, action='append', help="entry points to measure (default: all)")
+    parser.add_argument('--repeat', type=int, default=5, help="passes per bundle (median is reported)")
+    parser.add_argument('--latency', help="'recorded' or seconds injected per probe (default: none)")
+    parser.add_argument('--json', action='store_true', help="print NDJSON records instead of tables")
+    parser.add_argument('--output', metavar='FILE', help="append NDJSON records to FILE")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if not args.bundles and not args.live:
+        print("nothing to measure: give fixture bundles and/or --live", file=sys.stderr)
+        return 2
+    tools = args.tool or list(TOOLS)
+    latency = parse_latency(args.latency)
+    runs = [(path, lambda path=path: benchmark_bundle(FixtureBundle.load(path), tools, args.repeat, latency))
+            for path in args.bundles]
+    if args.live:
+        runs.append(("live", lambda: benchmark_live(tools, args.repeat)))
+    output = open(args.output, 'a', encoding='utf-8') if args.output else None
+    try:
+        for name, run in runs:
+            summary = run()
+            record = {"type": "benchmark", "timestamp": time.time(), "source": name,
+                      "latency": latency, "repeat": args.repeat, "sections": summary}
+            if args.json:
+                write_record(record)
+            else:
+                print_summary(name, summary)
+            if output is not None:
+                write_record(record, output)
+    finally:
+        if output is not None:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+
+from lazy_backend import lazy_module
+
+psutil = lazy_module('psutil')
+
+# Поля cpu_times, которые уже входят в user/nice (Linux) и не должны учитываться дважды
+_GUEST_FIELDS = ('guest', 'guest_nice')
+# Поля простоя процессора
+_IDLE_FIELDS = ('idle', 'iowait')
+
+
+def _busy_total(times) -> Tuple[float, float]:
+    """Возвращает (занятое, общее) время для одного набора cpu_times"""
+    values = times._asdict()
+    total = sum(v for k, v in values.items() if k not in _GUEST_FIELDS)
+    idle = sum(values.get(k, 0.0) for k in _IDLE_FIELDS)
+    return total - idle, total
+
+
+def _percent(old: Tuple[float, float], new: Tuple[float, float]) -> float:
+    busy_delta = new[0] - old[0]
+    total_delta = new[1] - old[1]
+    if total_delta <= 0:
+        return 0.0
+    return round(min(max(busy_delta / total_delta * 100, 0.0), 100.0), 1)
+
+
+class CpuSampler:
+    """Фоновый сбор загрузки процессора: ответы без блокирующего ожидания"""
+
+    def __init__(self, interval: float = 0.5, horizon: float = 1.0,
+                 max_horizon: float = 60.0, min_window: float = 0.1):
+        self.interval = interval
+        self.horizon = horizon
+        self.min_window = min_window
+        # Сколько секунд вызовы ждали минимального окна (collection_benchmark относит это к пробам)
+        self.waited = 0.0
+        self._history: deque = deque(maxlen=int(math.ceil(max_horizon / interval)) + 2)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _snapshot():
+        """Снимок (время, суммарные счетчики, счетчики по ядрам)"""
+        total = _busy_total(psutil.cpu_times())
+        per_core = [_busy_total(t) for t in psutil.cpu_times(percpu=True)]
+        return time.monotonic(), total, per_core
+
+    def start(self) -> 'CpuSampler':
+        """Запускает фоновый поток (повторный вызов ничего не делает)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._stop.clear()
+            self._history.append(self._snapshot())
+            self._thread = threading.Thread(target=self._run, name="cpu-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Останавливает фоновый поток"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            snapshot = self._snapshot()
+            with self._lock:
+                self._history.append(snapshot)
+
+    def _window(self, horizon: Optional[float]):
+        """Самый старый снимок в пределах горизонта и текущий снимок"""
+        if self._thread is None:
+            self.start()
+        horizon = self.horizon if horizon is None else horizon
+        now = self._snapshot()
+        with self._lock:
+            history = list(self._history)
+        base = history[-1]
+        for snapshot in history:
+            if now[0] - snapshot[0] <= horizon:
+                base = snapshot
+                break
+        # Сразу после запуска окна еще нет: ждем только минимальное окно, а не целую секунду
+        elapsed = now[0] - base[0]
+        if elapsed < self.min_window:
+            time.sleep(self.min_window - elapsed)
+            with self._lock:
+                self.waited += self.min_window - elapsed
+            now = self._snapshot()
+        return base, now
+
+    def percent(self, horizon: Optional[float] = None) -> float:
+        """Общая загрузка CPU (%) за последние horizon секунд"""
+        base, now = self._window(horizon)
+        return _percent(base[1], now[1])
+
+    def percent_per_core(self, horizon: Optional[float] = None) -> List[float]:
+        """Загрузка каждого ядра (%) за последние horizon секунд"""
+        base, now = self._window(horizon)
+        return [_percent(old, new) for old, new in zip(base[2], now[2])]
+
+
+_cpu_sampler: Optional[CpuSampler] = None
+_cpu_sampler_lock = threading.Lock()
+
+
+def get_cpu_sampler() -> CpuSampler:
+    """Общий фоновый сборщик загрузки CPU (запускается при первом обращении)"""
+    global _cpu_sampler
+    with _cpu_sampler_lock:
+        if _cpu_sampler is None:
+            _cpu_sampler = CpuSampler().start()
+    return _cpu_sampler
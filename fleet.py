@@ -0,0 +1,450 @@
+import argparse
+import json
+import os
+import platform
+import socket
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from lazy_backend import lazy_module
+
+# Loaded on first use so `fleet.py --help` starts without the event loop machinery
+asyncio = lazy_module('asyncio')
+
+# Frame: 4-byte big-endian payload length, 1 flag byte, payload (UTF-8 JSON).
+FRAME_HEADER = struct.Struct('>IB')
+FLAG_COMPRESSED = 0x01
+MAX_FRAME = 64 * 1024 * 1024
+COMPRESS_THRESHOLD = 1024  # smaller payloads are not worth a zlib round trip
+DEFAULT_PORT = 9300
+DEFAULT_OPS = ('inventory', 'serials')
+
+
+class FleetError(Exception):
+    """Protocol violation or broken connection"""
+
+
+class AgentError(FleetError):
+    """An op failed on the agent; the connection itself is still usable"""
+
+
+def encode_frame(message: dict, compress: bool = False) -> bytes:
+    payload = json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    flags = 0
+    if compress and len(payload) >= COMPRESS_THRESHOLD:
+        payload = zlib.compress(payload, 6)
+        flags |= FLAG_COMPRESSED
+    return FRAME_HEADER.pack(len(payload), flags) + payload
+
+
+async def read_frame(reader: 'asyncio.StreamReader') -> Optional[dict]:
+    """Next message from the stream, or None on a clean EOF"""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise FleetError("truncated frame header") from None
+    length, flags = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise FleetError(f"frame of {length} bytes exceeds the {MAX_FRAME} byte limit")
+    try:
+        payload = await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        raise FleetError("truncated frame") from None
+    if flags & FLAG_COMPRESSED:
+        # Bounded output: a small frame must not inflate into gigabytes (zlib bomb)
+        decompressor = zlib.decompressobj()
+        try:
+            payload = decompressor.decompress(payload, MAX_FRAME)
+        except zlib.error as e:
+            raise FleetError(f"corrupt compressed frame: {e}") from None
+        if decompressor.unconsumed_tail:
+            raise FleetError(f"compressed frame expands beyond the {MAX_FRAME} byte limit")
+        if not decompressor.eof:
+            raise FleetError("truncated compressed frame")
+    return json.loads(payload.decode('utf-8'))
+
+
+# --- agent -----------------------------------------------------------------
+
+Backend = Callable[[], Any]
+
+
+def local_backends() -> Dict[str, Backend]:
+    """Real collectors; imported lazily so the agent starts without them"""
+
+    def inventory():
+        import hardware
+        return hardware.structured_report(hardware.collect_all_info(parallel=True))
+
+    def serials():
+        import serial
+        from probe_memo import inventory_run
+        try:
+            with inventory_run():
+                return serial.structured_serials(serial.get_hardware_serial_numbers())
+        finally:
+            serial.close_powershell_worker()
+
+    def sensors():
+        import sensors as sensors_module
+        return sensors_module.structured_readings(_shared_readings(sensors_module), time.time())
+
+    return {'inventory': inventory, 'serials': serials, 'sensors': sensors}
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def _shared_readings(sensors_module) -> dict:
+    """Readings of the agent's one SystemMonitor.
+
+    Backends run in worker threads, and a poll updates the monitor's registry,
+    alert state, history and rollups, so creation and every poll hold the lock.
+    """
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = sensors_module.SystemMonitor()
+        return _monitor.get_sensor_readings()
+
+
+def fake_backends(name: str = 'fake', sensor_count: int = 32, delay: float = 0.0) -> Dict[str, Backend]:
+    """Deterministic stand-ins for local testing of agents and the aggregator"""
+
+    def pause():
+        if delay:
+            time.sleep(delay)
+
+    def inventory():
+        pause()
+        return {
+            "tool": "hardware",
+            "timestamp": time.time(),
+            "sections": {
+                "os": {"system": "FakeOS", "hostname": name},
+                "cpu": {"model": "Fake CPU", "cores": 8, "logical_processors": 16},
+                "memory": {"total_ram": 32 * 1024**3},
+                "disks": {f"physical_disk_{i}": f"FAKE-DISK-{i}" for i in range(4)},
+            },
+        }
+
+    def serials():
+        pause()
+        return {
+            "tool": "serial",
+            "timestamp": time.time(),
+            "devices": [{"key": "system_bios", "device": "Система (BIOS)",
+                         "fields": {"serial_number": f"SN-{name}"}}],
+            "errors": {},
+        }
+
+    def sensors():
+        pause()
+        now = time.time()
+        return {
+            "type": "tick", "tool": "sensors", "timestamp": now, "keyframe": True,
+            "sensors": [{"identifier": f"/fake/{i}/temperature/0", "category": "temperature",
+                         "type": "Temperature", "hardware": name, "name": f"Sensor {i}",
+                         "value": 40.0 + (now + i) % 10, "unit": "celsius"} for i in range(sensor_count)],
+        }
+
+    return {'inventory': inventory, 'serials': serials, 'sensors': sensors}
+
+
+class FleetAgent:
+    """Serves backend snapshots to aggregators over persistent framed connections.
+
+    Requests are ``{"id", "op"[, "token"][, "compress"]}``; responses are
+    ``{"id", "ok", "data"}`` or ``{"id", "ok": false, "error"}``. Backends are
+    plain callables run in worker threads, so a slow collector never stalls
+    other connections.
+    """
+
+    def __init__(self, backends: Dict[str, Backend], host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                 token: Optional[str] = None, name: Optional[str] = None):
+        self.backends = backends
+        self.host = host
+        self.port = port
+        self.token = token
+        self.name = name or socket.gethostname()
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers = set()
+
+    async def start(self) -> 'FleetAgent':
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()  # persistent connections would otherwise outlive the server
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, request: dict) -> dict:
+        request_id = request.get('id')
+        if self.token is not None and request.get('token') != self.token:
+            return {'id': request_id, 'ok': False, 'error': 'unauthorized'}
+        op = request.get('op')
+        if op == 'ping':
+            return {'id': request_id, 'ok': True, 'data': {'name': self.name, 'ops': sorted(self.backends)}}
+        backend = self.backends.get(op)
+        if backend is None:
+            return {'id': request_id, 'ok': False, 'error': f'unknown op {op!r}'}
+        try:
+            data = await asyncio.to_thread(backend)
+        except Exception as e:
+            return {'id': request_id, 'ok': False, 'error': f'{type(e).__name__}: {e}'}
+        return {'id': request_id, 'ok': True, 'data': data}
+
+    async def _serve(self, reader: 'asyncio.StreamReader', writer: 'asyncio.StreamWriter'):
+        self._writers.add(writer)
+        try:
+            while True:
+                request = await read_frame(reader)
+                if request is None:
+                    break
+                self.requests += 1
+                response = await self._handle(request)
+                writer.write(encode_frame(response, compress=bool(request.get('compress'))))
+                await writer.drain()
+        except (FleetError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # a broken client only loses its own connection
+        except asyncio.CancelledError:
+            pass  # server shutdown; the connection is closed below
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+# --- aggregator ------------------------------------------------------------
+
+def parse_host(spec: str, default_port: int = DEFAULT_PORT) -> Tuple[str, int]:
+    """'host', 'host:port' or '[v6]:port' -> (host, port)"""
+    spec = spec.strip()
+    if spec.startswith('['):
+        host, _, rest = spec[1:].partition(']')
+        return host, int(rest.lstrip(':') or default_port)
+    if spec.count(':') == 1:
+        host, port = spec.split(':')
+        return host, int(port)
+    return spec, default_port
+
+
+class _AgentConnection:
+    """One persistent connection; requests on it are serialised"""
+
+    def __init__(self, reader: 'asyncio.StreamReader', writer: 'asyncio.StreamWriter'):
+        self.reader = reader
+        self.writer = writer
+        self.lock = asyncio.Lock()
+        self.next_id = 0
+
+    def close(self):
+        self.writer.close()
+
+
+class FleetAggregator:
+    """Polls many agents concurrently over pooled persistent connections.
+
+    At most ``concurrency`` hosts are polled at once; every host gets
+    ``timeout`` seconds per poll (connect plus all requested ops). Connections
+    are kept between polls and re-established after any failure.
+    """
+
+    def __init__(self, hosts: Iterable[str], concurrency: int = 64, timeout: float = 30.0,
+                 compress: bool = True, token: Optional[str] = None):
+        self.hosts = [parse_host(h) for h in hosts]
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.compress = compress
+        self.token = token
+        self.connects = 0
+        self._pool: Dict[Tuple[str, int], _AgentConnection] = {}
+
+    async def _connection(self, address: Tuple[str, int]) -> _AgentConnection:
+        connection = self._pool.get(address)
+        if connection is None or connection.writer.is_closing():
+            reader, writer = await asyncio.open_connection(*address)
+            connection = self._pool[address] = _AgentConnection(reader, writer)
+            self.connects += 1
+        return connection
+
+    def _drop(self, address: Tuple[str, int]):
+        connection = self._pool.pop(address, None)
+        if connection is not None:
+            connection.close()
+
+    async def request(self, address: Tuple[str, int], op: str) -> Any:
+        """Run one op on one agent and return its data"""
+        connection = await self._connection(address)
+        async with connection.lock:
+            connection.next_id += 1
+            message = {'id': connection.next_id, 'op': op, 'compress': self.compress}
+            if self.token is not None:
+                message['token'] = self.token
+            connection.writer.write(encode_frame(message))
+            await connection.writer.drain()
+            response = await read_frame(connection.reader)
+        if response is None:
+            raise FleetError("agent closed the connection")
+        if response.get('id') != message['id']:
+            raise FleetError("response out of sequence")
+        if not response.get('ok'):
+            raise AgentError(response.get('error', 'agent error'))
+        return response.get('data')
+
+    async def _poll_host(self, address: Tuple[str, int], ops: Iterable[str]) -> dict:
+        started = time.perf_counter()
+        result: Dict[str, Any] = {'host': address[0], 'port': address[1]}
+        try:
+            async def run_ops():
+                for op in ops:
+                    try:
+                        result[op] = await self.request(address, op)
+                    except AgentError as e:
+                        result.setdefault('errors', {})[op] = str(e)
+            await asyncio.wait_for(run_ops(), self.timeout)
+            result['ok'] = 'errors' not in result
+        except asyncio.TimeoutError:
+            self._drop(address)  # the stream may still hold a late response
+            result['ok'] = False
+            result['error'] = f"timeout after {self.timeout:g} s"
+        except (OSError, FleetError, ValueError, zlib.error) as e:
+            self._drop(address)
+            result['ok'] = False
+            result['error'] = f"{type(e).__name__}: {e}"
+        result['elapsed'] = time.perf_counter() - started
+        return result
+
+    async def poll(self, ops: Iterable[str] = DEFAULT_OPS) -> dict:
+        """Poll every host once and return the merged dataset"""
+        ops = list(ops)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(address):
+            async with semaphore:
+                return await self._poll_host(address, ops)
+
+        started = time.time()
+        results = await asyncio.gather(*(bounded(address) for address in self.hosts))
+        return {
+            'collected_at': started,
+            'duration': time.time() - started,
+            'ops': ops,
+            'hosts': {f"{r['host']}:{r['port']}": r for r in results},
+        }
+
+    async def close(self):
+        for address in list(self._pool):
+            connection = self._pool.pop(address)
+            connection.close()
+            try:
+                await connection.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+
+def write_dataset(dataset: dict, path: str):
+    """Write the merged dataset atomically"""
+    import tempfile
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(dataset, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_hosts(path: str) -> List[str]:
+    """Host list file: one host[:port] per line, '#' comments allowed"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.split('#', 1)[0].strip() for line in f if line.split('#', 1)[0].strip()]
+
+
+# --- CLI -------------------------------------------------------------------
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fleet inventory: agent and aggregator")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    agent = sub.add_parser('agent', help="serve local inventory and sensor snapshots")
+    agent.add_argument('--host', default='127.0.0.1', help="address to bind (default 127.0.0.1)")
+    agent.add_argument('--port', type=int, default=DEFAULT_PORT)
+    agent.add_argument('--token', help="shared secret required in every request")
+    agent.add_argument('--fake', action='store_true', help="serve fake data (for local testing)")
+    agent.add_argument('--name', help="agent name reported by ping and used by fake data")
+
+    collect = sub.add_parser('collect', help="poll agents and write one merged dataset")
+    collect.add_argument('hosts', nargs='*', help="host[:port] of agents")
+    collect.add_argument('--hosts-file', help="file with one host[:port] per line")
+    collect.add_argument('--ops', default=','.join(DEFAULT_OPS),
+                         help="comma-separated ops: inventory, serials, sensors")
+    collect.add_argument('--output', '-o', default='fleet.json')
+    collect.add_argument('--concurrency', type=int, default=64)
+    collect.add_argument('--timeout', type=float, default=30.0, help="per-host timeout, seconds")
+    collect.add_argument('--no-compress', action='store_true')
+    collect.add_argument('--token')
+    return parser.parse_args(argv)
+
+
+async def run_agent(args: argparse.Namespace):
+    name = args.name or platform.node()
+    backends = fake_backends(name) if args.fake else local_backends()
+    agent = await FleetAgent(backends, args.host, args.port, token=args.token, name=name).start()
+    print(f"Agent {name} listening on {agent.host}:{agent.port}", file=sys.stderr)
+    await agent.serve_forever()
+
+
+async def run_collect(args: argparse.Namespace) -> dict:
+    hosts = list(args.hosts)
+    if args.hosts_file:
+        hosts.extend(read_hosts(args.hosts_file))
+    aggregator = FleetAggregator(hosts, concurrency=args.concurrency, timeout=args.timeout,
+                                 compress=not args.no_compress, token=args.token)
+    try:
+        dataset = await aggregator.poll([op.strip() for op in args.ops.split(',') if op.strip()])
+    finally:
+        await aggregator.close()
+    write_dataset(dataset, args.output)
+    ok = sum(1 for r in dataset['hosts'].values() if r['ok'])
+    print(f"{ok}/{len(dataset['hosts'])} hosts collected in {dataset['duration']:.2f} s -> {args.output}",
+          file=sys.stderr)
+    return dataset
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    try:
+        if args.command == 'agent':
+            asyncio.run(run_agent(args))
+        else:
+            asyncio.run(run_collect(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,55 @@
 import platform
-import psutil
 import subprocess
 import socket
 import datetime
 import os
 import sys
-from typing import Dict, List, Optional
+import argparse
+import contextlib
+import heapq
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from lazy_backend import lazy_module, optional_module
+from cpu_sampler import get_cpu_sampler
+import linux_backend
+from inventory_cache import STATIC, SEMI_STATIC, cached_section, configure_inventory_cache
+from async_probe import AsyncProbeEngine, ProbeError, active_probe_runner, async_collector
+from probe_memo import inventory_run, memoized, shell_output
+from probe_trace import add_trace_arguments, traced_probe, traced_section, tracing_from_args
+from wmi_planner import get_wmi_planner
+from inventory_fingerprint import add_baseline_arguments, baseline_from_args, fingerprint_sections, fingerprint_summary
+from structured_output import Quantity, Row, gigabytes, megahertz, percent, structured_section, write_record
+
+# Тяжелые модули загружаются при первом обращении: --help и разбор аргументов их не ждут
+psutil = lazy_module('psutil')
+asyncio = lazy_module('asyncio')
 
 def run_command(cmd: str) -> str:
-    """Выполняет команду и возвращает результат"""
+    """Выполняет команду и возвращает результат (в пределах сбора - не более одного раза)"""
     try:
-        result = subprocess.check_output(cmd, shell=True, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL, text=True, encoding='cp866')
-        return result.strip()
-    except:
+        return shell_output(cmd)
+    except Exception:
         return "Не доступно"
 
+@traced_probe('process')
+def _run_process(args: List[str], encoding: str, timeout: Optional[float]) -> str:
+    runner = active_probe_runner()
+    if runner is not None:
+        return runner(args, encoding=encoding, timeout=timeout)
+    result = subprocess.run(args, capture_output=True, stdin=subprocess.DEVNULL, text=True,
+                            encoding=encoding, timeout=timeout)
+    if result.returncode != 0:
+        raise ProbeError(f"{args[0]}: exit status {result.returncode}", result.returncode)
+    return result.stdout
+
+def run_process(args: List[str], encoding: str = 'utf-8', timeout: Optional[float] = None) -> str:
+    """Запускает программу без оболочки и возвращает stdout (пустую строку при ошибке)"""
+    try:
+        return memoized(('process', encoding, *args), lambda: _run_process(args, encoding, timeout))
+    except Exception:
+        return ""
+
+@traced_section
 def get_os_info() -> Dict[str, str]:
     """Информация об операционной системе"""
     print("🔍 Получение информации об ОС...")
@@ -30,27 +65,32 @@ def get_os_info() -> Dict[str, str]:
         
         # Дополнительная информация через WMIC
         if platform.system() == "Windows":
-            info['Производитель ОС'] = run_command('wmic os get caption /value').split('=')[-1]
-            info['Дата установки'] = run_command('wmic os get installdate /value').split('=')[-1][:8]
-            info['Время работы'] = run_command('wmic os get lastbootuptime /value').split('=')[-1]
+            planner = get_wmi_planner()
+            info['Производитель ОС'] = planner.get('os', 'Caption')
+            info['Дата установки'] = planner.get('os', 'InstallDate')[:8]
+            info['Время работы'] = planner.get('os', 'LastBootUpTime')
+        elif platform.system() == "Linux":
+            info.update(linux_backend.os_details())
     except Exception as e:
         info['Ошибка'] = str(e)
     
     return info
 
+@traced_section
 def get_cpu_info() -> Dict[str, str]:
     """Информация о процессоре"""
     print("🔍 Получение информации о процессоре...")
     info = {}
     try:
         if platform.system() == "Windows":
-            # Основная информация
-            cpu_name = run_command('wmic cpu get name /value').split('=')[-1]
-            cpu_cores = run_command('wmic cpu get numberofcores /value').split('=')[-1]
-            cpu_logical = run_command('wmic cpu get numberoflogicalprocessors /value').split('=')[-1]
-            cpu_max_speed = run_command('wmic cpu get maxclockspeed /value').split('=')[-1]
-            cpu_manufacturer = run_command('wmic cpu get manufacturer /value').split('=')[-1]
-            cpu_architecture = run_command('wmic cpu get architecture /value').split('=')[-1]
+            # Основная информация (все свойства cpu приходят одним запросом)
+            planner = get_wmi_planner()
+            cpu_name = planner.get('cpu', 'Name')
+            cpu_cores = planner.get('cpu', 'NumberOfCores')
+            cpu_logical = planner.get('cpu', 'NumberOfLogicalProcessors')
+            cpu_max_speed = planner.get('cpu', 'MaxClockSpeed')
+            cpu_manufacturer = planner.get('cpu', 'Manufacturer')
+            cpu_architecture = planner.get('cpu', 'Architecture')
             
             # Преобразование архитектуры
             arch_map = {'0': 'x86', '1': 'MIPS', '2': 'Alpha', '3': 'PowerPC', '5': 'ARM', '6': 'ia64', '9': 'x64'}
@@ -64,19 +104,133 @@ def get_cpu_info() -> Dict[str, str]:
             info['Макс. частота'] = f"{cpu_max_speed} МГц"
             
             # Дополнительная информация
-            info['L2 кэш'] = run_command('wmic cpu get l2cachesize /value').split('=')[-1] + " KB"
-            info['L3 кэш'] = run_command('wmic cpu get l3cachesize /value').split('=')[-1] + " KB"
-            info['Сокет'] = run_command('wmic cpu get socketdesignation /value').split('=')[-1]
+            info['L2 кэш'] = planner.get('cpu', 'L2CacheSize') + " KB"
+            info['L3 кэш'] = planner.get('cpu', 'L3CacheSize') + " KB"
+            info['Сокет'] = planner.get('cpu', 'SocketDesignation')
             
+        elif platform.system() == "Linux":
+            info.update(linux_backend.cpu_details())
+        
         # Информация через psutil
-        info['Текущая частота'] = f"{psutil.cpu_freq().current if psutil.cpu_freq() else 'N/A'} МГц"
-        info['Загрузка CPU'] = f"{psutil.cpu_percent(interval=1)}%"
+        cpu_freq = psutil.cpu_freq()
+        info['Текущая частота'] = megahertz(cpu_freq.current) if cpu_freq else "N/A МГц"
+        info['Загрузка CPU'] = percent(get_cpu_sampler().percent(), digits=None)
         
     except Exception as e:
         info['Ошибка'] = str(e)
     
     return info
 
+@cached_section('hardware.memory_modules', STATIC)
+@traced_section
+def get_memory_modules_info() -> Dict[str, str]:
+    """Модули оперативной памяти и конфигурация слотов (Windows)"""
+    info = {}
+    try:
+        planner = get_wmi_planner()
+        module_count = 0
+
+        for mem_data in planner.records('memorychip'):
+            # Извлекаем данные
+            capacity_raw = mem_data.get('capacity', '0')
+            try:
+                capacity = int(capacity_raw) if capacity_raw.isdigit() else 0
+                capacity_gb = capacity / (1024**3)
+                # Пропускаем пустые модули (емкость 0)
+                if capacity_gb == 0:
+                    continue
+            except:
+                continue
+
+            speed_raw = mem_data.get('speed', '')
+            speed = f"{speed_raw} МГц" if speed_raw and speed_raw.isdigit() else "Неизвестно"
+
+            manufacturer = mem_data.get('manufacturer', '')
+            if not manufacturer or manufacturer == 'NULL':
+                manufacturer = 'Неизвестно'
+
+            part_number = mem_data.get('partnumber', '')
+            if not part_number or part_number == 'NULL':
+                part_number = 'Неизвестно'
+
+            bank_label = mem_data.get('banklabel', '')
+            device_locator = mem_data.get('devicelocator', '')
+
+            location = bank_label if bank_label else (device_locator if device_locator else f"Слот {module_count+1}")
+
+            info[f'Модуль {module_count+1} ({location})'] = f"{capacity_gb:.1f} ГБ"
+            info[f'  Модуль {module_count+1} Производитель'] = manufacturer
+            info[f'  Модуль {module_count+1} Скорость'] = speed
+            info[f'  Модуль {module_count+1} Модель'] = part_number
+
+            module_count += 1
+
+        # Альтернативный метод через PowerShell (более надежный)
+        if module_count == 0:
+            try:
+                import json
+
+                ps_command = '''
+                Get-WmiObject Win32_PhysicalMemory | Select-Object BankLabel, Capacity, Speed, Manufacturer, PartNumber, SerialNumber, DeviceLocator | ConvertTo-Json
+                '''
+
+                output = run_process(['powershell', '-Command', ps_command])
+
+                if output.strip():
+                    mem_data = json.loads(output)
+                    if not isinstance(mem_data, list):
+                        mem_data = [mem_data]
+
+                    for i, module in enumerate(mem_data):
+                        capacity = module.get('Capacity', 0)
+                        if capacity == 0:
+                            continue
+
+                        capacity_gb = capacity / (1024**3)
+                        speed = module.get('Speed', 0)
+                        manufacturer = module.get('Manufacturer', '').strip()
+                        part_number = module.get('PartNumber', '').strip()
+                        bank_label = module.get('BankLabel', '').strip()
+                        device_locator = module.get('DeviceLocator', '').strip()
+
+                        location = bank_label if bank_label else (device_locator if device_locator else f"Слот {i+1}")
+
+                        info[f'Модуль {i+1} ({location})'] = f"{capacity_gb:.1f} ГБ"
+                        info[f'  Модуль {i+1} Производитель'] = manufacturer if manufacturer else 'Неизвестно'
+                        info[f'  Модуль {i+1} Скорость'] = f"{speed} МГц" if speed else 'Неизвестно'
+                        info[f'  Модуль {i+1} Модель'] = part_number if part_number else 'Неизвестно'
+
+                        module_count += 1
+            except Exception as e:
+                print(f"Ошибка при получении информации о памяти через PowerShell: {e}")
+
+        # Дополнительная информация о конфигурации памяти
+        try:
+            config = planner.view('memphysical')
+
+            max_capacity = config.get('maxcapacity', '0')
+            if max_capacity and max_capacity.isdigit():
+                max_capacity_gb = int(max_capacity) / 1024  # wmic возвращает в МБ
+                info['Максимальный объем ОЗУ'] = f"{max_capacity_gb:.0f} ГБ"
+
+            memory_devices = config.get('memorydevices', '0')
+            if memory_devices and memory_devices.isdigit():
+                info['Всего слотов памяти'] = memory_devices
+
+            # TotalPhysicalMemory принадлежит Win32_ComputerSystem, а не memphysical
+            total_physical = planner.get('computersystem', 'TotalPhysicalMemory', '0')
+            if total_physical and total_physical.isdigit():
+                total_physical_gb = int(total_physical) / (1024**3)
+                info['Установлено ОЗУ (физически)'] = f"{total_physical_gb:.2f} ГБ"
+        except:
+            pass
+
+    except Exception as e:
+        info['Ошибка модулей памяти'] = str(e)
+    
+    return info
+
+@traced_section
 def get_memory_info() -> Dict[str, str]:
     """Информация об оперативной памяти"""
     print("🔍 Получение информации об оперативной памяти...")
@@ -86,175 +240,45 @@ def get_memory_info() -> Dict[str, str]:
         swap_mem = psutil.swap_memory()
         
         # Основная информация об ОЗУ
-        info['Всего ОЗУ'] = f"{virtual_mem.total / (1024**3):.2f} ГБ"
-        info['Используется ОЗУ'] = f"{virtual_mem.used / (1024**3):.2f} ГБ"
-        info['Доступно ОЗУ'] = f"{virtual_mem.available / (1024**3):.2f} ГБ"
-        info['Использование ОЗУ'] = f"{virtual_mem.percent:.1f}%"
-        info['Всего файла подкачки'] = f"{swap_mem.total / (1024**3):.2f} ГБ"
-        info['Используется файла подкачки'] = f"{swap_mem.used / (1024**3):.2f} ГБ"
-        info['Использование файла подкачки'] = f"{swap_mem.percent:.1f}%"
+        info['Всего ОЗУ'] = gigabytes(virtual_mem.total)
+        info['Используется ОЗУ'] = gigabytes(virtual_mem.used)
+        info['Доступно ОЗУ'] = gigabytes(virtual_mem.available)
+        info['Использование ОЗУ'] = percent(virtual_mem.percent)
+        info['Всего файла подкачки'] = gigabytes(swap_mem.total)
+        info['Используется файла подкачки'] = gigabytes(swap_mem.used)
+        info['Использование файла подкачки'] = percent(swap_mem.percent)
         
         # Детальная информация о модулях памяти (Windows)
         if platform.system() == "Windows":
-            try:
-                # Используем CSV формат для более стабильного парсинга
-                mem_output = run_command('wmic memorychip get BankLabel, Capacity, Speed, Manufacturer, PartNumber, SerialNumber, DeviceLocator /format:csv')
-                
-                lines = [line.strip() for line in mem_output.strip().split('\n') if line.strip()]
-                
-                if len(lines) > 1:
-                    headers = lines[0].split(',')
-                    module_count = 0
-                    
-                    for line in lines[1:]:
-                        values = line.split(',')
-                        # Дополняем значения до нужной длины
-                        while len(values) < len(headers):
-                            values.append('')
-                        
-                        mem_data = dict(zip(headers, values))
-                        
-                        # Извлекаем данные
-                        capacity_raw = mem_data.get('Capacity', '0').strip('"').strip()
-                        try:
-                            capacity = int(capacity_raw) if capacity_raw.isdigit() else 0
-                            capacity_gb = capacity / (1024**3)
-                            # Пропускаем пустые модули (емкость 0)
-                            if capacity_gb == 0:
-                                continue
-                        except:
-                            continue
-                        
-                        speed_raw = mem_data.get('Speed', '').strip('"').strip()
-                        speed = f"{speed_raw} МГц" if speed_raw and speed_raw.isdigit() else "Неизвестно"
-                        
-                        manufacturer = mem_data.get('Manufacturer', '').strip('"').strip()
-                        if not manufacturer or manufacturer == 'NULL':
-                            manufacturer = 'Неизвестно'
-                        
-                        part_number = mem_data.get('PartNumber', '').strip('"').strip()
-                        if not part_number or part_number == 'NULL':
-                            part_number = 'Неизвестно'
-                        
-                        bank_label = mem_data.get('BankLabel', '').strip('"').strip()
-                        device_locator = mem_data.get('DeviceLocator', '').strip('"').strip()
-                        
-                        location = bank_label if bank_label else (device_locator if device_locator else f"Слот {module_count+1}")
-                        
-                        info[f'Модуль {module_count+1} ({location})'] = f"{capacity_gb:.1f} ГБ"
-                        info[f'  Модуль {module_count+1} Производитель'] = manufacturer
-                        info[f'  Модуль {module_count+1} Скорость'] = speed
-                        info[f'  Модуль {module_count+1} Модель'] = part_number
-                        
-                        module_count += 1
-                
-                # Альтернативный метод через PowerShell (более надежный)
-                if module_count == 0:
-                    try:
-                        import subprocess
-                        import json
-                        
-                        ps_command = '''
-                        Get-WmiObject Win32_PhysicalMemory | Select-Object BankLabel, Capacity, Speed, Manufacturer, PartNumber, SerialNumber, DeviceLocator | ConvertTo-Json
-                        '''
-                        
-                        result = subprocess.run(['powershell', '-Command', ps_command], 
-                                              capture_output=True, 
-                                              text=True,
-                                              encoding='utf-8')
-                        
-                        if result.returncode == 0 and result.stdout.strip():
-                            mem_data = json.loads(result.stdout) if result.stdout.strip() else []
-                            if not isinstance(mem_data, list):
-                                mem_data = [mem_data]
-                            
-                            for i, module in enumerate(mem_data):
-                                capacity = module.get('Capacity', 0)
-                                if capacity == 0:
-                                    continue
-                                    
-                                capacity_gb = capacity / (1024**3)
-                                speed = module.get('Speed', 0)
-                                manufacturer = module.get('Manufacturer', '').strip()
-                                part_number = module.get('PartNumber', '').strip()
-                                bank_label = module.get('BankLabel', '').strip()
-                                device_locator = module.get('DeviceLocator', '').strip()
-                                
-                                location = bank_label if bank_label else (device_locator if device_locator else f"Слот {i+1}")
-                                
-                                info[f'Модуль {i+1} ({location})'] = f"{capacity_gb:.1f} ГБ"
-                                info[f'  Модуль {i+1} Производитель'] = manufacturer if manufacturer else 'Неизвестно'
-                                info[f'  Модуль {i+1} Скорость'] = f"{speed} МГц" if speed else 'Неизвестно'
-                                info[f'  Модуль {i+1} Модель'] = part_number if part_number else 'Неизвестно'
-                                
-                                module_count += 1
-                    except Exception as e:
-                        print(f"Ошибка при получении информации о памяти через PowerShell: {e}")
-                
-                # Дополнительная информация о конфигурации памяти
-                try:
-                    mem_config = run_command('wmic memphysical get MaxCapacity, MemoryDevices, TotalPhysicalMemory /format:list')
-                    if mem_config:
-                        lines = mem_config.strip().split('\n')
-                        config = {}
-                        for line in lines:
-                            if '=' in line:
-                                key, value = line.split('=', 1)
-                                config[key.strip()] = value.strip()
-                        
-                        max_capacity = config.get('MaxCapacity', '0')
-                        if max_capacity and max_capacity.isdigit():
-                            max_capacity_gb = int(max_capacity) / 1024  # wmic возвращает в МБ
-                            info['Максимальный объем ОЗУ'] = f"{max_capacity_gb:.0f} ГБ"
-                        
-                        memory_devices = config.get('MemoryDevices', '0')
-                        if memory_devices and memory_devices.isdigit():
-                            info['Всего слотов памяти'] = memory_devices
-                        
-                        total_physical = config.get('TotalPhysicalMemory', '0')
-                        if total_physical and total_physical.isdigit():
-                            total_physical_gb = int(total_physical) / (1024**3)
-                            info['Установлено ОЗУ (физически)'] = f"{total_physical_gb:.2f} ГБ"
-                except:
-                    pass
-                        
-            except Exception as e:
-                info['Ошибка модулей памяти'] = str(e)
+            info.update(get_memory_modules_info())
+        
+        # Для Linux - напрямую из sysfs/procfs, без dmidecode и прав root
+        elif platform.system() == 'Linux':
+            info.update(linux_backend.memory_details())
         
-        # Для Linux/Mac используем другую команду
-        elif platform.system() in ['Linux', 'Darwin']:
+        # Для Mac используем другую команду
+        elif platform.system() == 'Darwin':
             try:
-                # Для Linux
-                if platform.system() == 'Linux':
-                    mem_info = run_command('sudo dmidecode --type 17 2>/dev/null || echo "Требуются права root"')
-                    # Парсинг вывода dmidecode...
-                # Для Mac
-                else:
-                    mem_info = run_command('system_profiler SPMemoryDataType')
-                    # Парсинг вывода system_profiler...
+                mem_info = run_command('system_profiler SPMemoryDataType')
+                # Парсинг вывода system_profiler...
             except:
                 pass
         
         # Рассчитываем дополнительную информацию
         try:
-            # Используемая память процессами
+            # Используемая память процессами: один проход process_iter и ограниченная куча
+            # вместо сортировки всех процессов. Таблица процессов (process_table) нужна
+            # только для --watch в taskManager.py: ее первое заполнение читает каждый процесс дважды
             processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'memory_info']):
-                try:
-                    mem = proc.info['memory_info']
-                    if mem:
-                        processes.append((proc.info['pid'], proc.info['name'], mem.rss))
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-            
-            # Сортируем по использованию памяти
-            processes.sort(key=lambda x: x[2], reverse=True)
+            for proc in psutil.process_iter(['name', 'memory_info']):
+                mem = proc.info['memory_info']
+                if mem:
+                    processes.append((proc.pid, proc.info['name'], mem.rss))
             
-            # Топ-5 процессов по использованию памяти
-            info['Топ процессов по использованию ОЗУ:'] = ""
-            for i, (pid, name, rss) in enumerate(processes[:5]):
-                rss_gb = rss / (1024**3)
-                info[f'  {i+1}. {name} (PID: {pid})'] = f"{rss_gb:.2f} ГБ"
+            # Топ-5 процессов по использованию памяти: список строк, в JSON - список объектов
+            info['Топ процессов по использованию ОЗУ'] = [
+                Row(f"{name} (PID: {pid}) - {gigabytes(rss)}", {"name": name, "pid": pid, "rss_bytes": rss})
+                for pid, name, rss in heapq.nlargest(5, processes, key=lambda x: x[2])]
         except:
             pass
         
@@ -263,6 +287,93 @@ def get_memory_info() -> Dict[str, str]:
     
     return info
 
+@cached_section('hardware.physical_disks', STATIC)
+@traced_section
+def get_physical_disks_info() -> Dict[str, str]:
+    """Физические диски: модель, размер, интерфейс (Windows)"""
+    info = {}
+    try:
+        physical_disk_count = 0
+        for disk_data in get_wmi_planner().records('diskdrive'):
+            device_id = disk_data.get('deviceid', '')
+            model = disk_data.get('model', '')
+
+            # Если модель пустая или "Неизвестно", пропускаем
+            if not model or model == 'NULL' or 'Неизвестно' in model:
+                continue
+
+            size_raw = disk_data.get('size', '0')
+            try:
+                size = int(size_raw) if size_raw.isdigit() else 0
+                size_gb = size / (1024**3)
+                size_str = f"{size_gb:.1f} ГБ"
+            except:
+                size_str = "Неизвестно"
+
+            interface = disk_data.get('interfacetype', 'N/A')
+            media_type = disk_data.get('mediatype', 'N/A')
+
+            # Определяем тип диска по модели
+            disk_type = "HDD"
+            if "SSD" in model.upper() or "SOLID" in model.upper():
+                disk_type = "SSD"
+            elif "NVME" in model.upper() or "M.2" in model.upper():
+                disk_type = "NVMe"
+
+            info[f'Физический диск {physical_disk_count}'] = f"{model}"
+            info[f'  Физический диск {physical_disk_count} Устройство'] = f"{device_id}"
+            info[f'  Физический диск {physical_disk_count} Размер'] = f"{size_str}"
+            info[f'  Физический диск {physical_disk_count} Тип'] = f"{disk_type}"
+            if interface and interface != 'N/A' and interface != 'NULL':
+                info[f'  Физический диск {physical_disk_count} Интерфейс'] = f"{interface}"
+            if media_type and media_type != 'N/A' and media_type != 'NULL':
+                info[f'  Физический диск {physical_disk_count} Тип носителя'] = f"{media_type}"
+
+            physical_disk_count += 1
+
+        # Альтернативный метод через PowerShell (более надежный)
+        if physical_disk_count == 0:
+            try:
+                import json
+
+                ps_command = '''
+                Get-WmiObject Win32_DiskDrive | Select-Object DeviceID, Model, Size, InterfaceType, MediaType | ConvertTo-Json
+                '''
+
+                output = run_process(['powershell', '-Command', ps_command])
+
+                if output.strip():
+                    disks_data = json.loads(output)
+                    if not isinstance(disks_data, list):
+                        disks_data = [disks_data]
+
+                    for i, disk in enumerate(disks_data):
+                        model = disk.get('Model', '').strip()
+                        if model:
+                            info[f'Физический диск {i}'] = model
+
+                            size = disk.get('Size', 0)
+                            if size and size > 0:
+                                size_gb = size / (1024**3)
+                                info[f'  Физический диск {i} Размер'] = f"{size_gb:.1f} ГБ"
+
+                            interface = disk.get('InterfaceType', '')
+                            if interface:
+                                info[f'  Физический диск {i} Интерфейс'] = interface
+
+                            media_type = disk.get('MediaType', '')
+                            if media_type:
+                                info[f'  Физический диск {i} Тип носителя'] = media_type
+            except:
+                pass
+
+    except Exception as e:
+        print(f"Ошибка при получении информации о физических дисках: {e}")
+        info['Ошибка физических дисков'] = str(e)
+    
+    return info
+
+@traced_section
 def get_disk_info() -> Dict[str, str]:
     """Информация о дисках"""
     print("🔍 Получение информации о дисках...")
@@ -279,10 +390,10 @@ def get_disk_info() -> Dict[str, str]:
                 usage = psutil.disk_usage(partition.mountpoint)
                 info[f'Диск {i}'] = f"{partition.device} -> {partition.mountpoint}"
                 info[f'  Диск {i} Файловая система'] = f"{partition.fstype if partition.fstype else 'Неизвестно'}"
-                info[f'  Диск {i} Общий размер'] = f"{usage.total / (1024**3):.1f} ГБ"
-                info[f'  Диск {i} Использовано'] = f"{usage.percent:.1f}%"
-                info[f'  Диск {i} Свободно'] = f"{usage.free / (1024**3):.1f} ГБ"
-                info[f'  Диск {i} Использовано (ГБ)'] = f"{(usage.total - usage.free) / (1024**3):.1f} ГБ"
+                info[f'  Диск {i} Общий размер'] = gigabytes(usage.total, 1)
+                info[f'  Диск {i} Использовано'] = percent(usage.percent)
+                info[f'  Диск {i} Свободно'] = gigabytes(usage.free, 1)
+                info[f'  Диск {i} Использовано (ГБ)'] = gigabytes(usage.total - usage.free, 1)
             except (PermissionError, FileNotFoundError):
                 info[f'Диск {i}'] = f"{partition.device} -> {partition.mountpoint}"
                 info[f'  Диск {i} Файловая система'] = f"{partition.fstype if partition.fstype else 'Неизвестно'}"
@@ -293,106 +404,12 @@ def get_disk_info() -> Dict[str, str]:
         
         # Информация о физических дисках (Windows) - улучшенный парсинг
         if platform.system() == "Windows":
-            try:
-                # Используем CSV формат для более стабильного парсинга
-                disk_output = run_command('wmic diskdrive get DeviceID,Model,Size,InterfaceType,MediaType /format:csv')
-                
-                lines = [line.strip() for line in disk_output.strip().split('\n') if line.strip()]
-                
-                if len(lines) > 1:
-                    headers = lines[0].split(',')
-                    
-                    physical_disk_count = 0
-                    for line in lines[1:]:
-                        values = line.split(',')
-                        # Дополняем значения до нужной длины
-                        while len(values) < len(headers):
-                            values.append('')
-                        
-                        disk_data = dict(zip(headers, values))
-                        
-                        device_id = disk_data.get('DeviceID', '').strip('"').strip()
-                        model = disk_data.get('Model', '').strip('"').strip()
-                        
-                        # Если модель пустая или "Неизвестно", пропускаем
-                        if not model or model == 'NULL' or 'Неизвестно' in model:
-                            continue
-                        
-                        size_raw = disk_data.get('Size', '0').strip('"').strip()
-                        try:
-                            size = int(size_raw) if size_raw.isdigit() else 0
-                            size_gb = size / (1024**3)
-                            size_str = f"{size_gb:.1f} ГБ"
-                        except:
-                            size_str = "Неизвестно"
-                        
-                        interface = disk_data.get('InterfaceType', 'N/A').strip('"').strip()
-                        media_type = disk_data.get('MediaType', 'N/A').strip('"').strip()
-                        
-                        # Определяем тип диска по модели
-                        disk_type = "HDD"
-                        if "SSD" in model.upper() or "SOLID" in model.upper():
-                            disk_type = "SSD"
-                        elif "NVME" in model.upper() or "M.2" in model.upper():
-                            disk_type = "NVMe"
-                        
-                        info[f'Физический диск {physical_disk_count}'] = f"{model}"
-                        info[f'  Физический диск {physical_disk_count} Устройство'] = f"{device_id}"
-                        info[f'  Физический диск {physical_disk_count} Размер'] = f"{size_str}"
-                        info[f'  Физический диск {physical_disk_count} Тип'] = f"{disk_type}"
-                        if interface and interface != 'N/A' and interface != 'NULL':
-                            info[f'  Физический диск {physical_disk_count} Интерфейс'] = f"{interface}"
-                        if media_type and media_type != 'N/A' and media_type != 'NULL':
-                            info[f'  Физический диск {physical_disk_count} Тип носителя'] = f"{media_type}"
-                        
-                        physical_disk_count += 1
-                
-                # Альтернативный метод через PowerShell (более надежный)
-                if physical_disk_count == 0:
-                    try:
-                        import subprocess
-                        import json
-                        
-                        ps_command = '''
-                        Get-WmiObject Win32_DiskDrive | Select-Object DeviceID, Model, Size, InterfaceType, MediaType | ConvertTo-Json
-                        '''
-                        
-                        result = subprocess.run(['powershell', '-Command', ps_command], 
-                                              capture_output=True, 
-                                              text=True,
-                                              encoding='utf-8')
-                        
-                        if result.returncode == 0 and result.stdout.strip():
-                            disks_data = json.loads(result.stdout) if result.stdout.strip() else []
-                            if not isinstance(disks_data, list):
-                                disks_data = [disks_data]
-                            
-                            for i, disk in enumerate(disks_data):
-                                model = disk.get('Model', '').strip()
-                                if model:
-                                    info[f'Физический диск {i}'] = model
-                                    
-                                    size = disk.get('Size', 0)
-                                    if size and size > 0:
-                                        size_gb = size / (1024**3)
-                                        info[f'  Физический диск {i} Размер'] = f"{size_gb:.1f} ГБ"
-                                    
-                                    interface = disk.get('InterfaceType', '')
-                                    if interface:
-                                        info[f'  Физический диск {i} Интерфейс'] = interface
-                                    
-                                    media_type = disk.get('MediaType', '')
-                                    if media_type:
-                                        info[f'  Физический диск {i} Тип носителя'] = media_type
-                    except:
-                        pass
-                        
-            except Exception as e:
-                print(f"Ошибка при получении информации о физических дисках: {e}")
-                info['Ошибка физических дисков'] = str(e)
+            info.update(get_physical_disks_info())
+        elif platform.system() == "Linux":
+            info.update(linux_backend.physical_disks_info())
         
-        # Если нет информации о дисках, попробуем получить через df на Linux/Mac
-        if platform.system() != "Windows" and not info:
+        # Если нет информации о дисках, попробуем получить через df на Mac
+        if platform.system() == "Darwin" and not info:
             try:
                 df_output = run_command('df -h')
                 lines = df_output.strip().split('\n')[1:]  # Пропускаем заголовок
@@ -427,68 +444,39 @@ def get_disk_info() -> Dict[str, str]:
     
     return info
 
+@cached_section('hardware.gpu', SEMI_STATIC)
+@traced_section
 def get_gpu_info() -> Dict[str, str]:
     """Информация о графических процессорах"""
     print("🔍 Получение информации о GPU...")
     info = {}
     try:
         if platform.system() == "Windows":
-            # Используем другой формат вывода
-            gpu_info = run_command('wmic path win32_videocontroller get name,adapterram,driverversion /format:csv')
-            
-            # Разделяем строки и удаляем пустые
-            lines = [line.strip() for line in gpu_info.strip().split('\n') if line.strip()]
-            
-            # Первая строка - заголовки
-            if len(lines) > 1:
-                headers = lines[0].split(',')
+            # Имя, память, драйвер и частота обновления приходят одним запросом
+            for i, gpu_data in enumerate(get_wmi_planner().records('path win32_videocontroller')):
+                name = gpu_data.get('name', '')
+                if not name or name == 'NULL':
+                    continue  # Пропускаем пустые записи
                 
-                for i, line in enumerate(lines[1:], 1):
-                    values = line.split(',')
-                    gpu_data = dict(zip(headers, values))
-                    
-                    name = gpu_data.get('Name', '').strip('"')
-                    if not name or name == 'NULL':
-                        continue  # Пропускаем пустые записи
-                    
-                    memory_raw = gpu_data.get('AdapterRAM', '0')
-                    try:
-                        memory = int(memory_raw) / (1024**3)
-                        memory_str = f"{memory:.1f} ГБ"
-                    except:
-                        memory_str = "N/A"
-                    
-                    driver = gpu_data.get('DriverVersion', 'N/A').strip('"')
-                    
-                    info[f'GPU {i-1}'] = name
-                    info[f'  GPU {i-1} Видеопамять'] = memory_str
-                    info[f'  GPU {i-1} Драйвер'] = driver
-            
-            # Дополнительная попытка получить частоту обновления
-            try:
-                refresh_info = run_command('wmic path win32_videocontroller get name,currentrefreshrate /format:csv')
-                refresh_lines = [line.strip() for line in refresh_info.strip().split('\n') if line.strip()]
+                memory_raw = gpu_data.get('adapterram', '0')
+                try:
+                    memory = int(memory_raw) / (1024**3)
+                    memory_str = f"{memory:.1f} ГБ"
+                except:
+                    memory_str = "N/A"
                 
-                if len(refresh_lines) > 1:
-                    refresh_headers = refresh_lines[0].split(',')
-                    for line in refresh_lines[1:]:
-                        values = line.split(',')
-                        if len(values) >= 2:
-                            gpu_name = values[0].strip('"')
-                            refresh_rate = values[1].strip('"') if len(values) > 1 else 'N/A'
-                            
-                            # Находим соответствующий GPU по имени
-                            for key, value in list(info.items()):
-                                if value == gpu_name and key.startswith('GPU '):
-                                    gpu_num = key.split()[1]
-                                    info[f'  GPU {gpu_num} Частота обновления'] = f"{refresh_rate} Гц" if refresh_rate != 'NULL' else "N/A"
-            except:
-                pass  # Если не удалось получить частоту обновления
+                driver = gpu_data.get('driverversion', 'N/A')
+                refresh_rate = gpu_data.get('currentrefreshrate', '')
+                
+                info[f'GPU {i}'] = name
+                info[f'  GPU {i} Видеопамять'] = memory_str
+                info[f'  GPU {i} Драйвер'] = driver
+                if refresh_rate:
+                    info[f'  GPU {i} Частота обновления'] = f"{refresh_rate} Гц" if refresh_rate != 'NULL' else "N/A"
             
             # Альтернативный метод через dxdiag (если предыдущий не сработал)
             if not info:
                 try:
-                    import subprocess
                     import tempfile
                     import os
                     
@@ -496,10 +484,7 @@ def get_gpu_info() -> Dict[str, str]:
                         tmp_path = tmp.name
                     
                     # Запускаем dxdiag и сохраняем в файл
-                    subprocess.run(['dxdiag', '/t', tmp_path], 
-                                 capture_output=True, 
-                                 text=True, 
-                                 timeout=10)
+                    run_process(['dxdiag', '/t', tmp_path], timeout=10)
                     
                     with open(tmp_path, 'r', encoding='utf-16') as f:
                         dxdiag_output = f.read()
@@ -535,12 +520,15 @@ def get_gpu_info() -> Dict[str, str]:
                                 gpu_count += 1
                 except Exception as e:
                     print(f"Ошибка при получении информации через dxdiag: {e}")
+        elif platform.system() == "Linux":
+            info.update(linux_backend.gpu_info())
     
     except Exception as e:
         info['Ошибка'] = str(e)
     
     return info
 
+@traced_section
 def get_network_info() -> Dict[str, str]:
     """Информация о сети"""
     print("🔍 Получение информации о сети...")
@@ -566,41 +554,34 @@ def get_network_info() -> Dict[str, str]:
                 info[f'Интерфейс {interface_name}'] = "Активен"
                 for addr in interface_addresses:
                     if addr.family == socket.AF_INET:
-                        info[f'  IPv4 адрес'] = f"{addr.address}"
-                        info[f'  Маска подсети'] = f"{addr.netmask}"
+                        info[f'  Интерфейс {interface_name} IPv4 адрес'] = f"{addr.address}"
+                        info[f'  Интерфейс {interface_name} Маска подсети'] = f"{addr.netmask}"
                     elif addr.family == socket.AF_INET6:
-                        info[f'  IPv6 адрес'] = f"{addr.address}"
+                        info[f'  Интерфейс {interface_name} IPv6 адрес'] = f"{addr.address}"
                     elif addr.family == psutil.AF_LINK:
-                        info[f'  MAC адрес'] = f"{addr.address}"
+                        info[f'  Интерфейс {interface_name} MAC адрес'] = f"{addr.address}"
         
         # Информация о сетевых адаптерах (Windows)
         if platform.system() == "Windows":
-            adapters = run_command('wmic nic get name,manufacturer,netenabled,macaddress /format:list')
-            adapter_list = adapters.split('\n\n')
-            
-            for i, adapter in enumerate(adapter_list):
-                if adapter.strip():
-                    lines = adapter.strip().split('\n')
-                    adapter_info = {}
-                    for line in lines:
-                        if '=' in line:
-                            key, value = line.split('=', 1)
-                            adapter_info[key.strip()] = value.strip()
-                    
-                    name = adapter_info.get('Name', 'Неизвестно')
-                    manufacturer = adapter_info.get('Manufacturer', 'N/A')
-                    enabled = "Да" if adapter_info.get('NetEnabled') == 'TRUE' else "Нет"
-                    mac = adapter_info.get('MACAddress', 'N/A')
-                    
-                    info[f'Сетевой адаптер {i}'] = f"{manufacturer} - {name}"
-                    info[f'  Включен'] = f"{enabled}"
-                    info[f'  MAC'] = f"{mac}"
+            for i, adapter_info in enumerate(get_wmi_planner().records('nic')):
+                name = adapter_info.get('name', 'Неизвестно')
+                manufacturer = adapter_info.get('manufacturer', 'N/A')
+                enabled = "Да" if adapter_info.get('netenabled') == 'TRUE' else "Нет"
+                mac = adapter_info.get('macaddress', 'N/A')
+                
+                info[f'Сетевой адаптер {i}'] = f"{manufacturer} - {name}"
+                info[f'  Сетевой адаптер {i} Включен'] = f"{enabled}"
+                info[f'  Сетевой адаптер {i} MAC'] = f"{mac}"
+        elif platform.system() == "Linux":
+            info.update(linux_backend.network_details())
         
     except Exception as e:
         info['Ошибка'] = str(e)
     
     return info
 
+@cached_section('hardware.motherboard', STATIC)
+@traced_section
 def get_motherboard_info() -> Dict[str, str]:
     """Информация о материнской плате"""
     print("🔍 Получение информации о материнской плате...")
@@ -608,10 +589,11 @@ def get_motherboard_info() -> Dict[str, str]:
     try:
         if platform.system() == "Windows":
             # Основная информация о материнской плате
-            mb_manufacturer = run_command('wmic baseboard get manufacturer /value').split('=')[-1]
-            mb_product = run_command('wmic baseboard get product /value').split('=')[-1]
-            mb_version = run_command('wmic baseboard get version /value').split('=')[-1]
-            mb_serial = run_command('wmic baseboard get serialnumber /value').split('=')[-1]
+            planner = get_wmi_planner()
+            mb_manufacturer = planner.get('baseboard', 'Manufacturer')
+            mb_product = planner.get('baseboard', 'Product')
+            mb_version = planner.get('baseboard', 'Version')
+            mb_serial = planner.get('baseboard', 'SerialNumber')
             
             info['Производитель'] = mb_manufacturer
             info['Модель'] = mb_product
@@ -619,34 +601,37 @@ def get_motherboard_info() -> Dict[str, str]:
             info['Серийный номер'] = mb_serial
             
             # BIOS
-            bios_manufacturer = run_command('wmic bios get manufacturer /value').split('=')[-1]
-            bios_version = run_command('wmic bios get version /value').split('=')[-1]
-            bios_date = run_command('wmic bios get releasedate /value').split('=')[-1]
+            bios_manufacturer = planner.get('bios', 'Manufacturer')
+            bios_version = planner.get('bios', 'Version')
+            bios_date = planner.get('bios', 'ReleaseDate')
             
             info['BIOS Производитель'] = bios_manufacturer
             info['BIOS Версия'] = bios_version
             info['BIOS Дата'] = bios_date if len(bios_date) == 8 else bios_date
+        elif platform.system() == "Linux":
+            info.update(linux_backend.motherboard_info())
             
     except Exception as e:
         info['Ошибка'] = str(e)
     
     return info
 
-import ctypes
-from ctypes import wintypes
-from typing import Dict, List
-import platform
-
+@traced_section
 def get_monitor_info() -> Dict[str, str]:
     """Информация о мониторах с использованием Windows API"""
     print("🔍 Получение информации о мониторах...")
     info = {}
     
+    if platform.system() == "Linux":
+        return linux_backend.monitor_info()
     if platform.system() != "Windows":
         info['Ошибка'] = "Функция поддерживается только на Windows"
         return info
     
     try:
+        import ctypes
+        from ctypes import wintypes
+
         # Определяем структуры и функции Windows API
         class RECT(ctypes.Structure):
             _fields_ = [
@@ -766,8 +751,8 @@ def get_monitor_info() -> Dict[str, str]:
         if physical_monitors:
             for i, monitor in enumerate(physical_monitors):
                 info[f'Монитор {i+1}'] = monitor['name']
-                info[f'  Разрешение'] = f"{monitor['width']}x{monitor['height']}"
-                info[f'  Устройство'] = monitor['device']
+                info[f'  Монитор {i+1} Разрешение'] = f"{monitor['width']}x{monitor['height']}"
+                info[f'  Монитор {i+1} Устройство'] = monitor['device']
         else:
             info['Информация'] = "Физические мониторы не обнаружены"
             
@@ -787,9 +772,12 @@ def get_monitor_info_wmi() -> Dict[str, str]:
     print("🔍 Получение информации о мониторах через WMI...")
     info = {}
     
+    wmi = optional_module('wmi')
+    if wmi is None:
+        info['Ошибка'] = "Установите библиотеку wmi: pip install wmi"
+        return info
+    
     try:
-        import wmi
-        
         c = wmi.WMI()
         
         # Получаем информацию о мониторах
@@ -818,14 +806,12 @@ def get_monitor_info_wmi() -> Dict[str, str]:
         if physical_monitors:
             for i, monitor in enumerate(physical_monitors):
                 info[f'Монитор {i+1}'] = monitor['name']
-                info[f'  Разрешение'] = f"{monitor['width']}x{monitor['height']}"
+                info[f'  Монитор {i+1} Разрешение'] = f"{monitor['width']}x{monitor['height']}"
         else:
             info['Информация'] = "Физические мониторы не обнаружены"
             
         info['Всего обнаружено'] = f"{len(physical_monitors)} физических мониторов"
         
-    except ImportError:
-        info['Ошибка'] = "Установите библиотеку wmi: pip install wmi"
     except Exception as e:
         info['Ошибка'] = str(e)
     
@@ -838,10 +824,13 @@ def get_monitor_info_simple() -> Dict[str, str]:
     print("🔍 Получение информации о мониторах через screeninfo...")
     info = {}
     
+    screeninfo = optional_module('screeninfo')
+    if screeninfo is None:
+        info['Ошибка'] = "Установите библиотеку screeninfo: pip install screeninfo"
+        return info
+    
     try:
-        from screeninfo import get_monitors
-        
-        monitors = get_monitors()
+        monitors = screeninfo.get_monitors()
         
         if monitors:
             for i, monitor in enumerate(monitors):
@@ -850,14 +839,12 @@ def get_monitor_info_simple() -> Dict[str, str]:
                 else:
                     info[f'Монитор {i+1}'] = monitor.name or f"Монитор {i+1}"
                 
-                info[f'  Разрешение'] = f"{monitor.width}x{monitor.height}"
+                info[f'  Монитор {i+1} Разрешение'] = f"{monitor.width}x{monitor.height}"
                 if monitor.x != 0 or monitor.y != 0:
-                    info[f'  Положение'] = f"({monitor.x}, {monitor.y})"
+                    info[f'  Монитор {i+1} Положение'] = f"({monitor.x}, {monitor.y})"
         else:
             info['Информация'] = "Мониторы не обнаружены"
             
-    except ImportError:
-        info['Ошибка'] = "Установите библиотеку screeninfo: pip install screeninfo"
     except Exception as e:
         info['Ошибка'] = str(e)
     
@@ -871,15 +858,14 @@ def get_monitor_info_fixed() -> Dict[str, str]:
         return get_monitor_info_simple()
     
     # Пробуем разные методы в порядке предпочтения
-    try:
-        from screeninfo import get_monitors
+    if optional_module('screeninfo') is not None:
         return get_monitor_info_simple()
+    try:
+        return get_monitor_info()  # Первый вариант с Windows API
     except:
-        try:
-            return get_monitor_info()  # Первый вариант с Windows API
-        except:
-            return get_monitor_info_wmi()  # Вариант с WMI
+        return get_monitor_info_wmi()  # Вариант с WMI
 
+@traced_section
 def get_battery_info() -> Dict[str, str]:
     """Информация о батарее"""
     print("🔍 Получение информации о батарее...")
@@ -888,12 +874,12 @@ def get_battery_info() -> Dict[str, str]:
         if hasattr(psutil, "sensors_battery"):
             battery = psutil.sensors_battery()
             if battery:
-                info['Заряд'] = f"{battery.percent}%"
+                info['Заряд'] = percent(battery.percent, digits=None)
                 info['Подключено к сети'] = "Да" if battery.power_plugged else "Нет"
                 if battery.secsleft != psutil.POWER_TIME_UNLIMITED and battery.secsleft != psutil.POWER_TIME_UNKNOWN:
                     hours = battery.secsleft // 3600
                     minutes = (battery.secsleft % 3600) // 60
-                    info['Осталось времени'] = f"{hours}ч {minutes}м"
+                    info['Осталось времени'] = Quantity(f"{hours}ч {minutes}м", battery.secsleft, 's')
             else:
                 info['Батарея'] = "Не обнаружена (возможно, стационарный ПК)"
         else:
@@ -911,26 +897,157 @@ def print_section(title: str, data: Dict[str, str]):
     print(f"{'='*60}")
     
     for key, value in data.items():
-        if value and value != "Не доступно":
+        if isinstance(value, list):
+            # Список (топ процессов): заголовок и пронумерованные строки
+            if value:
+                print(f"{key}:")
+                for i, item in enumerate(value, 1):
+                    print(f"  {i}. {item}")
+        elif value and value != "Не доступно":
             print(f"{key:<30} : {value}")
 
-def main():
+# Секции отчета в порядке вывода
+INVENTORY_SECTIONS: List[Tuple[str, Callable[[], Dict[str, str]]]] = [
+    ("Операционная система", get_os_info),
+    ("Процессор (CPU)", get_cpu_info),
+    ("Оперативная память (RAM)", get_memory_info),
+    ("Накопители (Диски)", get_disk_info),
+    ("Графические процессоры (GPU)", get_gpu_info),
+    ("Сеть", get_network_info),
+    ("Материнская плата", get_motherboard_info),
+    ("Мониторы", get_monitor_info),
+    ("Батарея", get_battery_info),
+]
+
+# Стабильные ключи секций для --json
+SECTION_KEYS = {
+    "Операционная система": "os",
+    "Процессор (CPU)": "cpu",
+    "Оперативная память (RAM)": "memory",
+    "Накопители (Диски)": "disks",
+    "Графические процессоры (GPU)": "gpu",
+    "Сеть": "network",
+    "Материнская плата": "motherboard",
+    "Мониторы": "monitors",
+    "Батарея": "battery",
+}
+
+def inventory_fingerprints(all_info: Dict[str, Dict[str, str]]) -> Dict[str, dict]:
+    """Отпечатки секций и компонентов (без меняющихся от запуска к запуску значений)"""
+    return fingerprint_sections({SECTION_KEYS.get(title, title): data for title, data in all_info.items()})
+
+def structured_report(all_info: Dict[str, Dict[str, str]]) -> dict:
+    """Машиночитаемый снимок: стабильные ключи и числа в базовых единицах"""
+    return {
+        "tool": "hardware",
+        "timestamp": time.time(),
+        "sections": {SECTION_KEYS.get(title, title): structured_section(data) for title, data in all_info.items()},
+        "fingerprints": fingerprint_summary(inventory_fingerprints(all_info)),
+    }
+
+def _collect_section(func: Callable[[], Dict[str, str]]) -> Dict[str, str]:
+    """Собирает одну секцию; сбой секции не затрагивает остальные"""
+    try:
+        return func()
+    except Exception as e:
+        return {'Ошибка': str(e)}
+
+def collect_all_info(parallel: bool = False, max_workers: Optional[int] = None) -> Dict[str, Dict[str, str]]:
+    """Собирает все секции последовательно или в пуле потоков, сохраняя порядок секций"""
+    # Одинаковые команды и запросы WMI разных секций выполняются один раз за сбор
+    with inventory_run():
+        if not parallel:
+            return {title: _collect_section(func) for title, func in INVENTORY_SECTIONS}
+        
+        from concurrent.futures import ThreadPoolExecutor
+        workers = max_workers or min(len(INVENTORY_SECTIONS), 8)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inventory") as pool:
+            futures = [(title, pool.submit(_collect_section, func)) for title, func in INVENTORY_SECTIONS]
+            return {title: future.result() for title, future in futures}
+
+# Асинхронные версии сборщиков: await get_os_info_async(engine, timeout)
+get_os_info_async = async_collector(get_os_info)
+get_cpu_info_async = async_collector(get_cpu_info)
+get_memory_modules_info_async = async_collector(get_memory_modules_info)
+get_memory_info_async = async_collector(get_memory_info)
+get_physical_disks_info_async = async_collector(get_physical_disks_info)
+get_disk_info_async = async_collector(get_disk_info)
+get_gpu_info_async = async_collector(get_gpu_info)
+get_network_info_async = async_collector(get_network_info)
+get_motherboard_info_async = async_collector(get_motherboard_info)
+get_monitor_info_async = async_collector(get_monitor_info)
+get_battery_info_async = async_collector(get_battery_info)
+
+async def collect_all_info_async(engine: Optional[AsyncProbeEngine] = None,
+                                 timeout: Optional[float] = None) -> Dict[str, Dict[str, str]]:
+    """Собирает все секции конкурентно, не блокируя цикл событий; timeout - на секцию"""
+    engine = engine or AsyncProbeEngine()
+    
+    async def collect(func):
+        try:
+            return await engine.call(func, timeout=timeout)
+        except Exception as e:
+            return {'Ошибка': str(e) or type(e).__name__}
+    
+    with inventory_run():
+        results = await asyncio.gather(*(collect(func) for _, func in INVENTORY_SECTIONS))
+    return {title: result for (title, _), result in zip(INVENTORY_SECTIONS, results)}
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Разбирает аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Сбор полной информации о системе")
+    parser.add_argument('--parallel', action='store_true',
+                        help="собирать секции параллельно в пуле потоков")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="собирать секции через asyncio-движок (команды без оболочки)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="размер пула потоков для --parallel или число одновременных команд для --async")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="предельное время одной команды для --async, секунд")
+    parser.add_argument('--refresh', action='store_true',
+                        help="не использовать кэш инвентаризации и собрать все заново")
+    parser.add_argument('--json', action='store_true',
+                        help="вывести один JSON-документ в stdout (сообщения о ходе сбора - в stderr)")
+    add_trace_arguments(parser)
+    add_baseline_arguments(parser)
+    return parser.parse_args(argv)
+
+def _collect(args: argparse.Namespace) -> Dict[str, Dict[str, str]]:
+    """Сбор секций выбранным способом (с трассировкой команд при --trace)"""
+    with tracing_from_args(args, 'hardware'):
+        if args.use_async:
+            engine = AsyncProbeEngine(concurrency=args.workers or 4)
+            if args.timeout:
+                engine.timeout = args.timeout
+            return asyncio.run(collect_all_info_async(engine))
+        return collect_all_info(parallel=args.parallel, max_workers=args.workers)
+
+def main(argv: Optional[List[str]] = None, args: Optional[argparse.Namespace] = None):
     """Основная функция"""
+    if args is None:
+        args = parse_args(argv)
+    configure_inventory_cache(refresh=args.refresh)
+    # Загрузка CPU накапливается в фоне, пока собираются остальные секции
+    get_cpu_sampler()
+    
+    if args.diff or args.save_baseline:
+        # Сравнение с базовым снимком: выводятся только изменения
+        with contextlib.redirect_stdout(sys.stderr):
+            all_info = _collect(args)
+        return baseline_from_args(args, 'hardware', inventory_fingerprints(all_info))
+    
+    if args.json:
+        # Сборщики печатают ход работы: в режиме JSON это уходит в stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            all_info = _collect(args)
+        write_record(structured_report(all_info))
+        return
+    
     print("🖥️  СБОР ПОЛНОЙ ИНФОРМАЦИИ О СИСТЕМЕ")
     print("⏳ Пожалуйста, подождите... Это может занять несколько секунд.\n")
     
     # Сбор всей информации
-    all_info = {
-        "Операционная система": get_os_info(),
-        "Процессор (CPU)": get_cpu_info(),
-        "Оперативная память (RAM)": get_memory_info(),
-        "Накопители (Диски)": get_disk_info(),
-        "Графические процессоры (GPU)": get_gpu_info(),
-        "Сеть": get_network_info(),
-        "Материнская плата": get_motherboard_info(),
-        "Мониторы": get_monitor_info(),
-        "Батарея": get_battery_info(),
-    }
+    all_info = _collect(args)
     
     # Вывод всей информации
     for section, data in all_info.items():
@@ -947,5 +1064,8 @@ def main():
     print(f"📋 Всего параметров собрано: {total_items}")
 
 if __name__ == "__main__":
-    main()
-    input("\nНажмите Enter для выхода...")
\ No newline at end of file
+    args = parse_args()
+    status = main(args=args)
+    if not (args.json or args.diff or args.save_baseline):
+        input("\nНажмите Enter для выхода...")
+    sys.exit(status)
\ No newline at end of file
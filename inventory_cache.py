@@ -0,0 +1,218 @@
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+# Классы стабильности данных
+STATIC = 'static'            # меняется только между загрузками (серийные номера, BIOS, модули ОЗУ)
+SEMI_STATIC = 'semi-static'  # меняется редко, хранится ограниченное время (драйверы GPU)
+LIVE = 'live'                # меняется постоянно, никогда не кэшируется
+
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_BYTES = 1024 * 1024
+
+# Неудачные пробы собираемой секции (см. note_probe_failure)
+_probe_failures: contextvars.ContextVar = contextvars.ContextVar('inventory_probe_failures', default=None)
+
+
+def default_cache_dir() -> str:
+    """Каталог кэша инвентаризации для текущего пользователя"""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'hardware_inventory')
+
+
+def current_boot_id() -> str:
+    """Идентификатор текущей загрузки системы (время загрузки в секундах)"""
+    try:
+        import psutil
+        return str(int(psutil.boot_time()))
+    except Exception:
+        return ''
+
+
+class InventoryCache:
+    """Кэш секций инвентаризации на диске с учетом стабильности данных"""
+
+    def __init__(self, directory: Optional[str] = None, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES, refresh: bool = False,
+                 boot_id: Optional[str] = None, store: bool = True):
+        self.directory = directory or default_cache_dir()
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        # store=False: ничего не записывать на диск (замеры и воспроизведение фикстур)
+        self.store = store
+        self.boot_id = boot_id if boot_id is not None else current_boot_id()
+        self._lock = threading.Lock()
+
+    def _entry_path(self, key: str) -> str:
+        import hashlib
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, key: str, stability: str) -> Optional[Any]:
+        """Возвращает сохраненные данные или None, если записи нет или она устарела"""
+        if stability == LIVE or self.refresh:
+            return None
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('key') != key or entry.get('stability') != stability:
+            return None
+        if stability == STATIC:
+            # Статические данные действительны до перезагрузки
+            if not self.boot_id or entry.get('boot_id') != self.boot_id:
+                return None
+        elif stability == SEMI_STATIC:
+            if time.time() - entry.get('created', 0) > self.ttl:
+                return None
+
+        # Время изменения файла служит меткой последнего использования для вытеснения
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get('data')
+
+    def put(self, key: str, stability: str, data: Any):
+        """Атомарно сохраняет данные секции (временный файл + os.replace)"""
+        if stability == LIVE or not self.store:
+            return
+        entry = {
+            'key': key,
+            'stability': stability,
+            'boot_id': self.boot_id,
+            'created': time.time(),
+            'data': data,
+        }
+        import tempfile
+        with self._lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(entry, f, ensure_ascii=False)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, self._entry_path(key))
+                except BaseException:
+                    try:
+                        os.unlink(tmp_path)
+                    except OSError:
+                        pass
+                    raise
+                self._evict()
+            except OSError:
+                # Кэш - лишь ускорение: ошибки записи не должны мешать сбору
+                pass
+
+    def _evict(self):
+        """Удаляет давно не использованные записи, пока кэш больше лимита"""
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+
+    def cached(self, key: str, stability: str, func: Callable[[], Any]) -> Any:
+        """Возвращает данные из кэша или собирает их и сохраняет"""
+        data = self.get(key, stability)
+        if data is not None:
+            return data
+        outer = _probe_failures.get()
+        failures = []
+        token = _probe_failures.set(failures)
+        try:
+            data = func()
+        finally:
+            _probe_failures.reset(token)
+        if failures and outer is not None:
+            outer.extend(failures)
+        if data and not failures and not _has_errors(data):
+            self.put(key, stability, data)
+        return data
+
+
+def note_probe_failure(key: Any):
+    """Отмечает неудачную пробу: секция, при сборе которой она выполнялась, не кэшируется.
+
+    Сбой (таймаут WMI, занятый PowerShell) может быть временным, а секция без
+    соответствующих устройств выглядит как полная - до перезагрузки ее нельзя хранить.
+    """
+    failures = _probe_failures.get()
+    if failures is not None:
+        failures.append(key)
+
+
+def _has_errors(data: Any) -> bool:
+    """Секции с ошибками сбора (ключи 'Ошибка...' на любом уровне) не кэшируются"""
+    if isinstance(data, dict):
+        return any(str(k).startswith('Ошибка') or _has_errors(v) for k, v in data.items())
+    if isinstance(data, list):
+        return any(_has_errors(item) for item in data)
+    return False
+
+
+_inventory_cache: Optional[InventoryCache] = None
+
+
+def get_inventory_cache() -> InventoryCache:
+    """Общий кэш инвентаризации"""
+    global _inventory_cache
+    if _inventory_cache is None:
+        _inventory_cache = InventoryCache()
+    return _inventory_cache
+
+
+def configure_inventory_cache(**kwargs) -> InventoryCache:
+    """Создает общий кэш с заданными параметрами (например, refresh=True для --refresh)"""
+    global _inventory_cache
+    _inventory_cache = InventoryCache(**kwargs)
+    return _inventory_cache
+
+
+@contextlib.contextmanager
+def inventory_cache_bypassed():
+    """Внутри блока секции собираются заново, а результаты не сохраняются"""
+    global _inventory_cache
+    previous = _inventory_cache
+    _inventory_cache = InventoryCache(refresh=True, store=False, boot_id='')
+    try:
+        yield _inventory_cache
+    finally:
+        _inventory_cache = previous
+
+
+def cached_section(key: str, stability: str):
+    """Декоратор: результат функции сбора секции хранится в общем кэше"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper():
+            return get_inventory_cache().cached(key, stability, func)
+        return wrapper
+    return decorator
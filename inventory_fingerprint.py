@@ -0,0 +1,252 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from structured_output import stable_key, structured_value, write_record
+
+# Content fingerprints of hardware.py sections and serial.py devices, and a diff
+# against a stored baseline. A report section is a flat dict of labels; a
+# top-level label followed by indented ones ('Физический диск 1', '  Физический
+# диск 1 Размер', ...) is one component, the remaining top-level labels form the
+# section's own component. Counters that change on every run (free space, load,
+# top processes, uptime) are left out, so an unchanged machine hashes the same.
+#
+# Every component also gets an identity hash over its model/serial/device-like
+# fields only: a cheap probe of those fields is enough to tell that the detailed
+# section need not be collected again.
+#
+# Components are keyed by that identity, not by their position in the report,
+# and the ordinal is dropped from their field keys ('physical_disk_1_size' ->
+# 'physical_disk_size'): removing the first of two disks is one removal, not
+# "disk 1 modified" plus "disk 2 removed".
+
+FORMAT_VERSION = 2
+
+# Stable-key tokens of values that are not properties of the hardware
+VOLATILE_TOKENS = frozenset({
+    'used', 'free', 'available', 'usage', 'load', 'current', 'top', 'pid', 'charge',
+    'left', 'plugged', 'boot', 'percent', 'method',
+})
+IDENTITY_TOKENS = frozenset({
+    'model', 'serial', 'manufacturer', 'device', 'product', 'mac', 'processor', 'name', 'gpu',
+})
+
+
+def digest(value: Any) -> str:
+    """Short stable hash of a JSON-serialisable value"""
+    import hashlib
+    data = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _is_volatile(key: str) -> bool:
+    return not VOLATILE_TOKENS.isdisjoint(key.split('_'))
+
+
+def _is_identity(key: str) -> bool:
+    return not IDENTITY_TOKENS.isdisjoint(key.split('_'))
+
+
+def _component(label: str, fields: Dict[str, Any]) -> dict:
+    identity = {k: v for k, v in fields.items() if _is_identity(k)}
+    return {
+        "label": label,
+        "fingerprint": digest(fields),
+        "identity": digest(identity or fields),
+        "fields": fields,
+    }
+
+
+def _section(components: Dict[str, dict]) -> dict:
+    return {
+        "fingerprint": digest({k: c["fingerprint"] for k, c in components.items()}),
+        "identity": digest({k: c["identity"] for k, c in components.items()}),
+        "components": components,
+    }
+
+
+def _strip_ordinals(key: str) -> str:
+    """'physical_disk_1_size' -> 'physical_disk_size'"""
+    return '_'.join(token for token in key.split('_') if not token.isdigit())
+
+
+def _fields(data: Dict[str, Any], labels: List[str], positional: bool = False) -> Dict[str, Any]:
+    fields = {}
+    for label in labels:
+        key = stable_key(label)
+        if key and not _is_volatile(key):
+            fields[_strip_ordinals(key) if positional else key] = structured_value(data[label], key)
+    return fields
+
+
+def _keyed(components: Dict[str, dict], own: Optional[str] = None) -> Dict[str, dict]:
+    """{label: component} -> {'physical_disk:<identity>': component}; the section's own one keeps ``own``"""
+    keyed = {}
+    for label, component in components.items():
+        if label == own:
+            keyed[own] = component
+            continue
+        base = f"{_strip_ordinals(stable_key(label))}:{component['identity']}"
+        key, n = base, 2
+        while key in keyed:
+            # Identical components (two disks of the same model without serials)
+            key = f"{base}#{n}"
+            n += 1
+        keyed[key] = component
+    return keyed
+
+
+def split_components(section_key: str, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Report section -> {component label: {field key: value}}, volatile fields and ordinals dropped"""
+    groups: List[List[str]] = []
+    for label in data:
+        if label[:1].isspace() and groups:
+            groups[-1].append(label)
+        else:
+            groups.append([label])
+    own = _fields(data, [group[0] for group in groups if len(group) == 1])
+    components = {section_key: own} if own else {}
+    for group in groups:
+        if len(group) > 1:
+            fields = _fields(data, group, positional=True)
+            if fields:
+                components[group[0]] = fields
+    return components
+
+
+def fingerprint_sections(sections: Dict[str, Dict[str, Any]]) -> Dict[str, dict]:
+    """{section key: report section} -> {section key: fingerprint snapshot}"""
+    snapshot = {}
+    for section_key, data in sections.items():
+        if 'Ошибка' in data:
+            snapshot[section_key] = {"error": str(data['Ошибка'])}
+            continue
+        components = {label: _component(label, fields)
+                      for label, fields in split_components(section_key, data).items()}
+        snapshot[section_key] = _section(_keyed(components, own=section_key))
+    return snapshot
+
+
+def fingerprint_devices(devices: Dict[str, Dict[str, Any]]) -> Dict[str, dict]:
+    """serial.py devices -> a single 'devices' section snapshot"""
+    if 'Ошибка' in devices:
+        return {"devices": {"error": str(devices['Ошибка'].get('Сообщение', devices['Ошибка']))}}
+    components = {}
+    for device, info in devices.items():
+        fields = {stable_key(label): value for label, value in info.items()
+                  if stable_key(label) and not _is_volatile(stable_key(label))}
+        components[device] = _component(device, fields)
+    return {"devices": _section(_keyed(components))}
+
+
+def fingerprint_summary(snapshot: Dict[str, dict]) -> Dict[str, dict]:
+    """Hashes only, for --json output"""
+    return {key: ({"error": section["error"]} if "error" in section else {
+        "fingerprint": section["fingerprint"],
+        "components": {k: c["fingerprint"] for k, c in section["components"].items()},
+    }) for key, section in snapshot.items()}
+
+
+def diff_snapshots(baseline: Dict[str, dict], current: Dict[str, dict]) -> List[dict]:
+    """Added, removed and modified components; sections with equal fingerprints are skipped"""
+    changes = []
+    for section_key in list(baseline) + [k for k in current if k not in baseline]:
+        old, new = baseline.get(section_key, {}), current.get(section_key, {})
+        if "error" in old or "error" in new:
+            # A section that failed to collect says nothing about the hardware
+            continue
+        if old.get("fingerprint") == new.get("fingerprint"):
+            continue
+        old_components, new_components = old.get("components", {}), new.get("components", {})
+        for key in list(old_components) + [k for k in new_components if k not in old_components]:
+            before, after = old_components.get(key), new_components.get(key)
+            if before is None:
+                changes.append({"section": section_key, "component": key, "change": "added",
+                                "label": after["label"], "fields": after["fields"]})
+            elif after is None:
+                changes.append({"section": section_key, "component": key, "change": "removed",
+                                "label": before["label"], "fields": before["fields"]})
+            elif before["fingerprint"] != after["fingerprint"]:
+                fields = {name: [before["fields"].get(name), after["fields"].get(name)]
+                          for name in list(before["fields"]) + [n for n in after["fields"] if n not in before["fields"]]
+                          if before["fields"].get(name) != after["fields"].get(name)}
+                changes.append({"section": section_key, "component": key, "change": "modified",
+                                "label": after["label"], "fields": fields})
+    return changes
+
+
+def load_baseline(path: str) -> dict:
+    """Baseline file: {"format", "tools": {tool: {"created", "sections"}}}; empty if missing"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return {"format": FORMAT_VERSION, "tools": {}}
+    if baseline.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported baseline format {baseline.get('format')!r}")
+    return baseline
+
+
+def save_baseline(path: str, tool: str, snapshot: Dict[str, dict]):
+    """Store ``snapshot`` as the baseline of ``tool``, keeping the other tools' entries"""
+    import tempfile
+    baseline = load_baseline(path)
+    baseline["tools"][tool] = {"created": time.time(), "sections": snapshot}
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+_MARKS = {"added": "+", "removed": "-", "modified": "~"}
+
+
+def print_diff(changes: List[dict], created: Optional[float] = None, stream=None):
+    stream = sys.stdout if stream is None else stream
+    since = f" от {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created))}" if created else ""
+    if not changes:
+        print(f"✅ Изменений относительно базового снимка{since} нет", file=stream)
+        return
+    print(f"🔎 Изменения относительно базового снимка{since}: {len(changes)}", file=stream)
+    for change in changes:
+        print(f"  {_MARKS[change['change']]} [{change['section']}] {change['label'].strip()}", file=stream)
+        if change['change'] == 'modified':
+            for name, (before, after) in change['fields'].items():
+                print(f"      {name}: {before} -> {after}", file=stream)
+
+
+def add_baseline_arguments(parser: argparse.ArgumentParser):
+    """--diff / --save-baseline options shared by hardware.py and serial.py"""
+    parser.add_argument('--diff', metavar='FILE',
+                        help="сравнить с базовым снимком FILE и вывести только изменения (код 1, если они есть)")
+    parser.add_argument('--save-baseline', metavar='FILE',
+                        help="сохранить отпечатки текущего сбора как базовый снимок в FILE")
+
+
+def baseline_from_args(args, tool: str, snapshot: Dict[str, dict]) -> int:
+    """Diff against and/or save the baseline as requested; exit status 1 if anything changed"""
+    status = 0
+    if args.diff:
+        entry = load_baseline(args.diff)["tools"].get(tool)
+        if entry is None:
+            print(f"⚠️  В {args.diff} нет базового снимка для {tool}", file=sys.stderr)
+            status = 2
+        else:
+            changes = diff_snapshots(entry["sections"], snapshot)
+            if args.json:
+                write_record({"tool": tool, "type": "inventory_diff", "timestamp": time.time(),
+                              "baseline_created": entry["created"], "changes": changes})
+            else:
+                print_diff(changes, entry["created"])
+            status = 1 if changes else 0
+    if args.save_baseline:
+        save_baseline(args.save_baseline, tool, snapshot)
+        print(f"💾 Базовый снимок сохранен в {args.save_baseline}", file=sys.stderr)
+    return status
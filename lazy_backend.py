@@ -0,0 +1,74 @@
+import contextlib
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Dict, Optional
+
+# Platform backends (pythonnet/LibreHardwareMonitor, WMI, winreg, psutil, asyncio)
+# are loaded on first use, so `--help`, `--json` on Linux and library imports do
+# not pay for - or fail on - backends the chosen code path never touches.
+
+
+class BackendUnavailable(RuntimeError):
+    """A platform backend is missing or failed to load"""
+
+
+def lazy_module(name: str) -> ModuleType:
+    """Module whose real import runs on first attribute access.
+
+    The placeholder is registered in sys.modules, so later lazy_module() calls
+    share it; a plain ``import name`` elsewhere loads it immediately.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+_optional: Dict[str, Optional[ModuleType]] = {}
+
+
+def optional_module(name: str) -> Optional[ModuleType]:
+    """Import ``name`` on first call; None (remembered) if it cannot be imported"""
+    try:
+        return _optional[name]
+    except KeyError:
+        pass
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        module = None
+    _optional[name] = module
+    return module
+
+
+def require_module(name: str, hint: str = '') -> ModuleType:
+    """optional_module() that raises BackendUnavailable with ``hint`` when missing"""
+    module = optional_module(name)
+    if module is None:
+        raise BackendUnavailable(f"{name}: {hint}" if hint else f"{name} is not available")
+    return module
+
+
+@contextlib.contextmanager
+def substitute_module(name: str, module: Optional[ModuleType]):
+    """Make optional_module(name) return ``module`` inside the block (fixture replay)"""
+    missing = object()
+    previous = _optional.get(name, missing)
+    _optional[name] = module
+    try:
+        yield module
+    finally:
+        if previous is missing:
+            _optional.pop(name, None)
+        else:
+            _optional[name] = previous
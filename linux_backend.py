@@ -0,0 +1,246 @@
+import datetime
+import os
+import platform
+from typing import Dict, List
+
+# Сведения об оборудовании Linux напрямую из sysfs/procfs: без подпроцессов и прав root.
+# Функции возвращают те же ключи, что и Windows-ветки hardware.py.
+
+ROOT = '/'
+
+
+def _path(root: str, *parts: str) -> str:
+    return os.path.join(root, *parts)
+
+
+def _read(path: str) -> str:
+    """Читает небольшой файл sysfs/procfs; при ошибке возвращает пустую строку"""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+def _list(path: str) -> List[str]:
+    try:
+        return sorted(os.listdir(path))
+    except OSError:
+        return []
+
+
+def _parse_key_values(text: str, sep: str = ':') -> List[Dict[str, str]]:
+    """Разбирает блоки 'ключ: значение', разделенные пустыми строками (/proc/cpuinfo)"""
+    blocks = []
+    current = {}
+    for line in text.splitlines():
+        if not line.strip():
+            if current:
+                blocks.append(current)
+                current = {}
+            continue
+        if sep in line:
+            key, value = line.split(sep, 1)
+            current[key.strip()] = value.strip()
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def _meminfo(root: str = ROOT) -> Dict[str, int]:
+    """Значения /proc/meminfo в байтах"""
+    result = {}
+    for line in _read(_path(root, 'proc', 'meminfo')).splitlines():
+        parts = line.replace(':', ' ').split()
+        if len(parts) >= 2 and parts[1].isdigit():
+            value = int(parts[1])
+            if len(parts) > 2 and parts[2].lower() == 'kb':
+                value *= 1024
+            result[parts[0]] = value
+    return result
+
+
+def os_details(root: str = ROOT) -> Dict[str, str]:
+    """Дополнение секции ОС: дистрибутив и время загрузки"""
+    info = {}
+    release = {}
+    for line in _read(_path(root, 'etc', 'os-release')).splitlines():
+        if '=' in line:
+            key, value = line.split('=', 1)
+            release[key] = value.strip().strip('"')
+    if release.get('PRETTY_NAME'):
+        info['Производитель ОС'] = release['PRETTY_NAME']
+    for line in _read(_path(root, 'proc', 'stat')).splitlines():
+        if line.startswith('btime '):
+            boot = datetime.datetime.fromtimestamp(int(line.split()[1]))
+            info['Время работы'] = boot.strftime('%Y%m%d%H%M%S')
+            break
+    return info
+
+
+def cpu_details(root: str = ROOT) -> Dict[str, str]:
+    """Дополнение секции CPU из /proc/cpuinfo и /sys/devices/system/cpu"""
+    info = {}
+    processors = [b for b in _parse_key_values(_read(_path(root, 'proc', 'cpuinfo'))) if 'processor' in b]
+    if not processors:
+        return info
+    first = processors[0]
+
+    # Физические ядра: уникальные пары (physical id, core id)
+    cores = {(p.get('physical id', '0'), p.get('core id', p.get('processor'))) for p in processors}
+
+    info['Модель'] = first.get('model name') or first.get('Model') or first.get('cpu model', 'Неизвестно')
+    info['Производитель'] = first.get('vendor_id') or first.get('CPU implementer', 'Неизвестно')
+    info['Архитектура'] = platform.machine()
+    info['Количество ядер'] = str(len(cores))
+    info['Логические процессоры'] = str(len(processors))
+
+    cpu_dir = _path(root, 'sys', 'devices', 'system', 'cpu', 'cpu0')
+    max_freq = _read(_path(cpu_dir, 'cpufreq', 'cpuinfo_max_freq'))
+    if max_freq.isdigit():
+        info['Макс. частота'] = f"{int(max_freq) // 1000} МГц"
+
+    # Размеры кэшей: index*/level и index*/size (например, "1024K")
+    cache_dir = _path(cpu_dir, 'cache')
+    for index in _list(cache_dir):
+        level = _read(_path(cache_dir, index, 'level'))
+        size = _read(_path(cache_dir, index, 'size'))
+        if level in ('2', '3') and size:
+            info[f'L{level} кэш'] = size.replace('K', ' KB').replace('M', ' MB')
+    return info
+
+
+def memory_details(root: str = ROOT) -> Dict[str, str]:
+    """Дополнение секции ОЗУ: физически установленный объем по блокам памяти"""
+    info = {}
+    memory_dir = _path(root, 'sys', 'devices', 'system', 'memory')
+    block_size = _read(_path(memory_dir, 'block_size_bytes'))
+    if block_size:
+        try:
+            size = int(block_size, 16)
+            # Учитываются только блоки в состоянии online: отключенная память не установлена в системе
+            blocks = sum(1 for name in _list(memory_dir)
+                         if name.startswith('memory') and _read(_path(memory_dir, name, 'online')) == '1')
+            if blocks:
+                info['Установлено ОЗУ (физически)'] = f"{size * blocks / (1024**3):.2f} ГБ"
+        except ValueError:
+            pass
+    if 'Установлено ОЗУ (физически)' not in info:
+        total = _meminfo(root).get('MemTotal')
+        if total:
+            info['Установлено ОЗУ (физически)'] = f"{total / (1024**3):.2f} ГБ"
+    return info
+
+
+def physical_disks_info(root: str = ROOT) -> Dict[str, str]:
+    """Физические диски из /sys/block (без loop, ram, zram)"""
+    info = {}
+    block_dir = _path(root, 'sys', 'block')
+    count = 0
+    for name in _list(block_dir):
+        if name.startswith(('loop', 'ram', 'zram', 'dm-', 'md', 'sr', 'fd')):
+            continue
+        device_dir = _path(block_dir, name)
+        sectors = _read(_path(device_dir, 'size'))
+        if not sectors.isdigit() or int(sectors) == 0:
+            continue
+        model = _read(_path(device_dir, 'device', 'model')) or name
+        size_gb = int(sectors) * 512 / (1024**3)
+        if name.startswith('nvme'):
+            disk_type = "NVMe"
+            interface = "NVMe"
+        else:
+            disk_type = "HDD" if _read(_path(device_dir, 'queue', 'rotational')) == '1' else "SSD"
+            interface = "VirtIO" if name.startswith('vd') else "SCSI"
+
+        info[f'Физический диск {count}'] = model
+        info[f'  Физический диск {count} Устройство'] = f"/dev/{name}"
+        info[f'  Физический диск {count} Размер'] = f"{size_gb:.1f} ГБ"
+        info[f'  Физический диск {count} Тип'] = disk_type
+        info[f'  Физический диск {count} Интерфейс'] = interface
+        if _read(_path(device_dir, 'removable')) == '1':
+            info[f'  Физический диск {count} Тип носителя'] = "Removable Media"
+        count += 1
+    return info
+
+
+def gpu_info(root: str = ROOT) -> Dict[str, str]:
+    """Видеоадаптеры из /sys/class/drm (PCI-идентификаторы и драйвер)"""
+    info = {}
+    drm_dir = _path(root, 'sys', 'class', 'drm')
+    count = 0
+    for name in _list(drm_dir):
+        if not name.startswith('card') or '-' in name:
+            continue
+        device_dir = _path(drm_dir, name, 'device')
+        vendor = _read(_path(device_dir, 'vendor'))
+        device = _read(_path(device_dir, 'device'))
+        if not vendor:
+            continue
+        driver = os.path.basename(os.path.realpath(_path(device_dir, 'driver')))
+        info[f'GPU {count}'] = f"PCI {vendor.replace('0x', '')}:{device.replace('0x', '')}"
+        vram = _read(_path(device_dir, 'mem_info_vram_total'))
+        if vram.isdigit():
+            info[f'  GPU {count} Видеопамять'] = f"{int(vram) / (1024**3):.1f} ГБ"
+        info[f'  GPU {count} Драйвер'] = driver or 'N/A'
+        count += 1
+    return info
+
+
+def network_details(root: str = ROOT) -> Dict[str, str]:
+    """Сетевые адаптеры из /sys/class/net (без loopback и виртуальных)"""
+    info = {}
+    net_dir = _path(root, 'sys', 'class', 'net')
+    count = 0
+    for name in _list(net_dir):
+        # Физические адаптеры имеют ссылку device
+        if name == 'lo' or not os.path.exists(_path(net_dir, name, 'device')):
+            continue
+        driver = os.path.basename(os.path.realpath(_path(net_dir, name, 'device', 'driver')))
+        enabled = "Да" if _read(_path(net_dir, name, 'operstate')) == 'up' else "Нет"
+        info[f'Сетевой адаптер {count}'] = f"{driver or 'N/A'} - {name}"
+        info[f'  Сетевой адаптер {count} Включен'] = enabled
+        info[f'  Сетевой адаптер {count} MAC'] = _read(_path(net_dir, name, 'address')) or 'N/A'
+        count += 1
+    return info
+
+
+def motherboard_info(root: str = ROOT) -> Dict[str, str]:
+    """Материнская плата и BIOS из /sys/class/dmi/id (серийный номер доступен только root)"""
+    dmi_dir = _path(root, 'sys', 'class', 'dmi', 'id')
+    fields = [
+        ('Производитель', 'board_vendor'),
+        ('Модель', 'board_name'),
+        ('Версия', 'board_version'),
+        ('Серийный номер', 'board_serial'),
+        ('BIOS Производитель', 'bios_vendor'),
+        ('BIOS Версия', 'bios_version'),
+        ('BIOS Дата', 'bios_date'),
+    ]
+    info = {}
+    for key, name in fields:
+        value = _read(_path(dmi_dir, name))
+        if value:
+            info[key] = value
+    return info
+
+
+def monitor_info(root: str = ROOT) -> Dict[str, str]:
+    """Подключенные мониторы из /sys/class/drm/card*-*"""
+    info = {}
+    drm_dir = _path(root, 'sys', 'class', 'drm')
+    count = 0
+    for name in _list(drm_dir):
+        if '-' not in name or _read(_path(drm_dir, name, 'status')) != 'connected':
+            continue
+        modes = _read(_path(drm_dir, name, 'modes')).splitlines()
+        count += 1
+        info[f'Монитор {count}'] = name.split('-', 1)[1]
+        if modes:
+            info[f'  Монитор {count} Разрешение'] = modes[0]
+        info[f'  Монитор {count} Устройство'] = name
+    if not count:
+        info['Информация'] = "Физические мониторы не обнаружены"
+    info['Всего мониторов'] = f"{count} физических, {count} всего"
+    return info
+
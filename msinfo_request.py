@@ -1,15 +1,59 @@
+import argparse
 import subprocess
 import os
+import sys
+from typing import List, Optional
+from nfo_parser import index_categories, load_index, lookup
+from structured_output import write_record
 
-# Формируем путь для сохранения файла
-output_file = os.path.join(os.getcwd(), "system_report.nfo")
+# Путь по умолчанию для сохранения файла
+DEFAULT_REPORT = os.path.join(os.getcwd(), "system_report.nfo")
 
-# Команда для msinfo32
-command = ['msinfo32', '/nfo', output_file]
+def save_report(output_file: str) -> bool:
+    """Запускает msinfo32 /nfo и сохраняет отчет в output_file"""
+    # Команда для msinfo32
+    command = ['msinfo32', '/nfo', output_file]
+    try:
+        subprocess.run(command, check=True, capture_output=True, text=True)
+        print(f"Отчёт успешно сохранён в: {output_file}")
+        return True
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"Произошла ошибка: {e}")
+        return False
 
-# Запускаем процесс
-try:
-    result = subprocess.run(command, check=True, capture_output=True, text=True)
-    print(f"Отчёт успешно сохранён в: {output_file}")
-except subprocess.CalledProcessError as e:
-    print(f"Произошла ошибка: {e}")
\ No newline at end of file
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Отчет msinfo32 (.nfo) и быстрый поиск по его категориям")
+    parser.add_argument('--report', default=DEFAULT_REPORT,
+                        help="файл отчета (по умолчанию system_report.nfo в текущем каталоге)")
+    parser.add_argument('--category', metavar='PATH', action='append',
+                        help="не запускать msinfo32, а вывести категорию готового отчета "
+                             "(например Components/Display); можно повторять")
+    parser.add_argument('--recursive', action='store_true', help="вместе с подкатегориями")
+    parser.add_argument('--list', action='store_true', help="вывести список категорий отчета")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if not (args.category or args.list):
+        # Запускаем процесс
+        if not save_report(args.report):
+            return 1
+    # Индекс смещений категорий пишется рядом с отчетом при первом разборе
+    # и перестраивается, если размер или время изменения отчета не совпадают
+    try:
+        index = load_index(args.report)
+    except Exception as e:
+        print(f"Не удалось разобрать отчёт {args.report}: {e}", file=sys.stderr)
+        return 1
+    if args.list:
+        for name in index_categories(index):
+            print(name)
+    if args.category:
+        for record in lookup(args.report, args.category, args.recursive, index):
+            write_record(record.as_dict())
+    elif not args.list:
+        print(f"Индекс категорий ({len(index['categories'])}) сохранён в: {args.report}.idx")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
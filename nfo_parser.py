@@ -0,0 +1,402 @@
+import argparse
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from structured_output import write_record
+
+# Streaming reader for msinfo32 /nfo reports (see msinfo_request.py). An .nfo
+# file is UTF-16 XML:
+#
+#   <MsInfo>
+#     <Metadata><Version>8.0</Version><CreationUTC>...</CreationUTC></Metadata>
+#     <Category name="System Summary">
+#       <Data><Item><![CDATA[OS Name]]></Item><Value><![CDATA[...]]></Value></Data>
+#       <Category name="Hardware Resources"> ... nested categories ... </Category>
+#     </Category>
+#   </MsInfo>
+#
+# The tree is walked with iterparse and every finished <Data>/<Category> element
+# is detached from its parent, so memory is bounded by the largest single
+# category, not by the file. Records are yielded per category as soon as its own
+# rows are complete (before its subcategories).
+#
+# The first lookup in a report writes a sidecar index (report.nfo.idx) with the
+# byte range of every category; later lookups seek straight to the requested
+# categories and parse only those bytes. The index is rebuilt when the report's
+# size or modification time no longer match.
+
+SUMMARY_CATEGORY = "System Summary"
+INDEX_SUFFIX = '.idx'
+INDEX_FORMAT = 1
+
+
+class NfoRecord:
+    """Rows of one category; ``path`` is the list of category names from the root"""
+
+    __slots__ = ('path', 'rows')
+
+    def __init__(self, path: Tuple[str, ...], rows: List[Dict[str, str]]):
+        self.path = path
+        self.rows = rows
+
+    @property
+    def category(self) -> str:
+        return '/'.join(self.path)
+
+    def items(self) -> Dict[str, str]:
+        """Item/Value rows (System Summary and friends) as a dict"""
+        return {row['Item']: row.get('Value', '') for row in self.rows if 'Item' in row}
+
+    def as_dict(self) -> dict:
+        return {"category": self.category, "rows": self.rows}
+
+
+def _text(element) -> str:
+    return (element.text or '').strip()
+
+
+def iter_nfo(source, metadata: Optional[Dict[str, str]] = None,
+             prefix: Tuple[str, ...] = ()) -> Iterator[NfoRecord]:
+    """Categories of an .nfo file (path or binary file object) in document order.
+
+    ``metadata``, if given, is filled with the <Metadata> fields when they are seen.
+    ``prefix`` is prepended to every path (parsing a slice of a report).
+    Categories without rows are not yielded.
+    """
+    from xml.etree import ElementTree
+    stack = []  # open elements
+    names: List[str] = list(prefix)  # names of the open categories
+    pending: List[Optional[List[Dict[str, str]]]] = []  # rows per open category, None once yielded
+    for event, element in ElementTree.iterparse(source, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            if tag == 'Category':
+                # Rows of the enclosing category are complete once a subcategory starts
+                if pending and pending[-1]:
+                    yield NfoRecord(tuple(names), pending[-1])
+                if pending:
+                    pending[-1] = None
+                names.append(element.get('name', ''))
+                pending.append([])
+            stack.append(element)
+            continue
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if tag == 'Data' and pending:
+            if pending[-1] is None:
+                # Rows after a subcategory: yielded as a second record of the same category
+                pending[-1] = []
+            pending[-1].append({child.tag: _text(child) for child in element})
+        elif tag == 'Category':
+            rows = pending.pop()
+            if rows:
+                yield NfoRecord(tuple(names), rows)
+            names.pop()
+        elif parent is not None and parent.tag == 'Metadata':
+            if metadata is not None:
+                metadata[tag] = _text(element)
+            continue
+        elif tag != 'Metadata':
+            continue
+        # Finished subtrees are not needed again: detach them so the tree never grows
+        if parent is not None:
+            parent.remove(element)
+
+
+def parse_nfo(path: str) -> dict:
+    """Whole report as one dict (for small files and interactive use)"""
+    metadata: Dict[str, str] = {}
+    categories = [record.as_dict() for record in iter_nfo(path, metadata)]
+    return {"source": path, "metadata": metadata, "categories": categories}
+
+
+def _file_records(path: str, only: Optional[List[str]] = None, recursive: bool = False) -> List[dict]:
+    """Worker: dataset records of one file; a broken file yields a single error record.
+
+    With ``only`` just those categories are read, through the sidecar index.
+    """
+    from xml.etree import ElementTree
+    from xml.parsers import expat
+    start = time.perf_counter()
+    metadata: Dict[str, str] = {}
+    records = []
+    summary: Dict[str, str] = {}
+    try:
+        if only is None:
+            source = iter_nfo(path, metadata)
+        else:
+            index = load_index(path)
+            metadata.update(index.get("metadata", {}))
+            for record in lookup(path, [SUMMARY_CATEGORY], index=index):
+                summary = record.items()
+            source = lookup(path, only, recursive, index)
+        for record in source:
+            if record.category == SUMMARY_CATEGORY:
+                summary = record.items()
+            records.append({"type": "nfo_category", "source": path, **record.as_dict()})
+        error = None
+    except (ElementTree.ParseError, expat.ExpatError, UnicodeDecodeError, OSError) as e:
+        error = f"{type(e).__name__}: {e}"
+    header = {
+        "type": "nfo_file",
+        "source": path,
+        "machine": summary.get('System Name'),
+        "metadata": metadata,
+        "categories": len(records),
+        "rows": sum(len(r["rows"]) for r in records),
+        "seconds": round(time.perf_counter() - start, 4),
+        "error": error,
+    }
+    return [header] + records
+
+
+def _encoding(head: bytes) -> str:
+    """Codec of a report from its byte order mark (msinfo32 writes UTF-16 LE)"""
+    if head.startswith(b'\xff\xfe'):
+        return 'utf-16-le'
+    if head.startswith(b'\xfe\xff'):
+        return 'utf-16-be'
+    return 'utf-8'
+
+
+def build_index(path: str) -> dict:
+    """Byte ranges of every category: one expat pass, no tree is built.
+
+    Each entry is [names, start, rows_end, end]: the category spans
+    [start, end) and its own rows end at rows_end (its first subcategory).
+    """
+    from xml.parsers import expat
+    stat = os.stat(path)
+    categories: List[list] = []
+    metadata: Dict[str, str] = {}
+    with open(path, 'rb') as f:
+        encoding = _encoding(f.read(4))
+        f.seek(0)
+        close_tag = len('</Category>'.encode(encoding))
+        parser = expat.ParserCreate()
+        names: List[str] = []
+        open_entries: List[list] = []
+        in_metadata: List[str] = []  # element stack while inside <Metadata>
+        # Category whose start was the last event: if it ends next, it may be <Category/>
+        last_started: List[Optional[list]] = [None]
+        maybe_empty: List[list] = []
+
+        def start(tag, attrs):
+            last_started[0] = None
+            if tag == 'Metadata' or in_metadata:
+                in_metadata.append(tag)
+                return
+            if tag != 'Category':
+                return
+            offset = parser.CurrentByteIndex
+            if open_entries and open_entries[-1][2] is None:
+                open_entries[-1][2] = offset
+            names.append(attrs.get('name', ''))
+            entry = [list(names), offset, None, None]
+            open_entries.append(entry)
+            categories.append(entry)
+            last_started[0] = entry
+
+        def end(tag):
+            if in_metadata:
+                in_metadata.pop()
+                return
+            if tag != 'Category':
+                return
+            entry = open_entries.pop()
+            offset = parser.CurrentByteIndex
+            entry[3] = offset + close_tag
+            if entry[2] is None:
+                entry[2] = offset
+            if last_started[0] is entry:
+                maybe_empty.append(entry)
+            last_started[0] = None
+            names.pop()
+
+        def text(data):
+            last_started[0] = None
+            if len(in_metadata) == 2:
+                metadata[in_metadata[1]] = (metadata.get(in_metadata[1], '') + data).strip()
+
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = text
+        parser.ParseFile(f)
+        # For <Category/> expat reports the end right after '/>' instead of at a closing tag
+        empty_tag = '/>'.encode(encoding)
+        for entry in maybe_empty:
+            f.seek(entry[2] - len(empty_tag))
+            if f.read(len(empty_tag)) == empty_tag:
+                entry[2], entry[3] = entry[1], entry[3] - close_tag
+    return {"format": INDEX_FORMAT, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            "encoding": encoding, "metadata": metadata, "categories": categories}
+
+
+def _index_is_current(index: dict, path: str) -> bool:
+    stat = os.stat(path)
+    return (index.get("format") == INDEX_FORMAT and index.get("size") == stat.st_size
+            and index.get("mtime_ns") == stat.st_mtime_ns)
+
+
+def load_index(path: str, write: bool = True) -> dict:
+    """Sidecar index of ``path``; built (and saved if ``write``) when missing or stale"""
+    import json
+    sidecar = path + INDEX_SUFFIX
+    try:
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if _index_is_current(index, path):
+            return index
+    except (OSError, ValueError):
+        pass
+    index = build_index(path)
+    if write:
+        import tempfile
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(sidecar)), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+                os.replace(tmp_path, sidecar)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            # Read-only collection directory: the index still serves this process
+            pass
+    return index
+
+
+def index_categories(index: dict) -> Dict[str, list]:
+    """{'System Summary/Components/Display': [names, start, rows_end, end], ...}"""
+    categories: Dict[str, list] = {}
+    for entry in index["categories"]:
+        categories.setdefault('/'.join(entry[0]), entry)
+    return categories
+
+
+def resolve_category(categories: Dict[str, list], name: str) -> Optional[str]:
+    """Full path of ``name``; paths may omit the 'System Summary' root"""
+    name = name.strip('/')
+    for candidate in (name, f"{SUMMARY_CATEGORY}/{name}"):
+        if candidate in categories:
+            return candidate
+    return None
+
+
+def lookup(path: str, names: List[str], recursive: bool = False,
+           index: Optional[dict] = None) -> Iterator[NfoRecord]:
+    """Records of the requested categories, read by seeking to their byte ranges.
+
+    Without ``recursive`` only each category's own rows are parsed; unknown
+    names are skipped.
+    """
+    import io
+    index = load_index(path) if index is None else index
+    categories = index_categories(index)
+    encoding = index["encoding"]
+    with open(path, 'rb') as f:
+        for name in names:
+            key = resolve_category(categories, name)
+            if key is None:
+                continue
+            entry_names, start, rows_end, end = categories[key]
+            stop = end if recursive else rows_end
+            if stop <= start:
+                continue
+            f.seek(start)
+            text = f.read(stop - start).decode(encoding)
+            if not recursive:
+                text += '</Category>'
+            document = io.BytesIO(f"<MsInfo>{text}</MsInfo>".encode('utf-8'))
+            for record in iter_nfo(document, prefix=tuple(entry_names[:-1])):
+                if recursive or record.path == tuple(entry_names):
+                    yield record
+
+
+def find_nfo_files(paths: List[str]) -> List[str]:
+    """.nfo files given directly or found (recursively) under the given directories"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, files in os.walk(path):
+                found.extend(os.path.join(directory, name) for name in files if name.lower().endswith('.nfo'))
+        else:
+            found.append(path)
+    return sorted(found)
+
+
+def parse_batch(paths: List[str], output: str, workers: Optional[int] = None,
+                categories: bool = True, only: Optional[List[str]] = None,
+                recursive: bool = False) -> Dict[str, Any]:
+    """Parse ``paths`` on a process pool and write one NDJSON dataset to ``output``.
+
+    Records are written as files finish; the dataset is renamed into place when
+    complete. With ``categories=False`` only the per-file nfo_file records are kept;
+    with ``only`` just those categories are read (via the sidecar indexes).
+    """
+    import functools
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+    start = time.perf_counter()
+    stats = {"files": len(paths), "failed": 0, "categories": 0, "rows": 0}
+    directory = os.path.dirname(os.path.abspath(output))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunksize = max(1, min(32, len(paths) // ((workers or os.cpu_count() or 1) * 4)))
+                for records in pool.map(functools.partial(_file_records, only=only, recursive=recursive),
+                                        paths, chunksize=chunksize):
+                    header = records[0]
+                    stats["failed"] += header["error"] is not None
+                    stats["categories"] += header["categories"]
+                    stats["rows"] += header["rows"]
+                    for record in (records if categories else records[:1]):
+                        write_record(record, f)
+        os.replace(tmp_path, output)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Parse msinfo32 .nfo reports into NDJSON records")
+    parser.add_argument('paths', nargs='+', help=".nfo files, or directories with --batch")
+    parser.add_argument('--batch', metavar='OUTPUT',
+                        help="parse all files on a process pool into one NDJSON dataset OUTPUT")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes for --batch (default: CPU count)")
+    parser.add_argument('--files-only', action='store_true',
+                        help="keep only the per-file summary records (machine, metadata, counts)")
+    parser.add_argument('--category', metavar='PATH', action='append',
+                        help="read only this category through the sidecar index, e.g. 'Components/Display' "
+                             "(repeatable)")
+    parser.add_argument('--recursive', action='store_true', help="with --category, include subcategories")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.batch:
+        paths = find_nfo_files(args.paths)
+        if not paths:
+            print("no .nfo files found", file=sys.stderr)
+            return 2
+        stats = parse_batch(paths, args.batch, args.workers, not args.files_only, args.category, args.recursive)
+        print(f"{args.batch}: {stats['files']} files ({stats['failed']} failed), {stats['categories']} categories, "
+              f"{stats['rows']} rows in {stats['seconds']:.2f} s", file=sys.stderr)
+        return 1 if stats['failed'] else 0
+    status = 0
+    for path in args.paths:
+        records = _file_records(path, args.category, args.recursive)
+        status |= records[0]["error"] is not None
+        for record in records[:1] if args.files_only else records:
+            write_record(record)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import base64
+import json
+import queue
+import subprocess
+import threading
+from typing import List, Optional
+
+# Цикл обработки запросов внутри долгоживущего процесса PowerShell.
+# Каждый запрос и каждый ответ - одна строка JSON (перевод строки служит рамкой кадра).
+WORKER_SCRIPT = r'''
+[Console]::InputEncoding = [System.Text.Encoding]::UTF8
+[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    if ($line.Trim() -eq '') { continue }
+    $request = $line | ConvertFrom-Json
+    try {
+        $output = (Invoke-Expression $request.script | Out-String)
+        $response = @{ id = $request.id; ok = $true; output = $output }
+    } catch {
+        $response = @{ id = $request.id; ok = $false; output = ''; error = $_.Exception.Message }
+    }
+    [Console]::Out.WriteLine(($response | ConvertTo-Json -Compress))
+    [Console]::Out.Flush()
+}
+'''
+
+
+class PowerShellWorkerError(Exception):
+    """Ошибка выполнения запроса в рабочем процессе PowerShell"""
+
+
+def default_worker_command() -> List[str]:
+    """Команда запуска PowerShell с циклом обработки запросов"""
+    encoded = base64.b64encode(WORKER_SCRIPT.encode('utf-16-le')).decode('ascii')
+    return ['powershell', '-NoProfile', '-NonInteractive', '-NoLogo', '-EncodedCommand', encoded]
+
+
+class PowerShellWorker:
+    """Один долгоживущий процесс PowerShell, принимающий скрипты через stdin"""
+
+    def __init__(self, command: Optional[List[str]] = None, timeout: float = 30.0):
+        self.command = command if command is not None else default_worker_command()
+        self.timeout = timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+        self._responses: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def is_alive(self) -> bool:
+        """Проверяет, что рабочий процесс запущен и не завершился"""
+        return self.process is not None and self.process.poll() is None
+
+    def _start(self):
+        """Запускает рабочий процесс и поток чтения ответов"""
+        if self.process is not None:
+            self.restarts += 1
+        self._responses = queue.Queue()
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            bufsize=1,
+        )
+        reader = threading.Thread(target=self._read_responses,
+                                  args=(self.process, self._responses),
+                                  name="powershell-worker-reader", daemon=True)
+        reader.start()
+
+    @staticmethod
+    def _read_responses(process: subprocess.Popen, responses: "queue.Queue[Optional[dict]]"):
+        """Читает кадры ответов; None в очереди означает завершение процесса"""
+        try:
+            for line in process.stdout:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    responses.put(json.loads(line))
+                except ValueError:
+                    # Посторонний вывод процесса (баннеры, предупреждения) пропускаем
+                    continue
+        except (OSError, ValueError):
+            pass
+        responses.put(None)
+
+    def _kill(self):
+        """Принудительно останавливает рабочий процесс"""
+        if self.process is None:
+            return
+        try:
+            self.process.kill()
+            self.process.wait(timeout=5)
+        except Exception:
+            pass
+
+    def run(self, script: str, timeout: Optional[float] = None) -> str:
+        """Выполняет скрипт в рабочем процессе и возвращает его текстовый вывод"""
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            # Упавший процесс перезапускается при следующем запросе
+            if not self.is_alive():
+                self._start()
+            self._next_id += 1
+            request_id = self._next_id
+            try:
+                self.process.stdin.write(json.dumps({'id': request_id, 'script': script}) + '\n')
+                self.process.stdin.flush()
+            except (OSError, ValueError) as e:
+                self._kill()
+                raise PowerShellWorkerError(f"Рабочий процесс PowerShell недоступен: {e}")
+
+            while True:
+                try:
+                    response = self._responses.get(timeout=timeout)
+                except queue.Empty:
+                    # Зависший процесс нельзя переиспользовать: его ответ придет не к тому запросу
+                    self._kill()
+                    raise PowerShellWorkerError(f"Превышено время ожидания ответа ({timeout} с)")
+                if response is None:
+                    self._kill()
+                    raise PowerShellWorkerError("Рабочий процесс PowerShell завершился во время запроса")
+                if response.get('id') != request_id:
+                    continue
+                if not response.get('ok'):
+                    raise PowerShellWorkerError(response.get('error') or "Ошибка выполнения скрипта")
+                return (response.get('output') or '').strip()
+
+    def close(self, timeout: float = 5.0):
+        """Завершает рабочий процесс: закрывает stdin и ждет выхода"""
+        with self._lock:
+            if self.process is None:
+                return
+            try:
+                if self.process.poll() is None:
+                    self.process.stdin.close()
+                    self.process.wait(timeout=timeout)
+            except Exception:
+                self._kill()
+            finally:
+                try:
+                    self.process.stdout.close()
+                except Exception:
+                    pass
+                self.process = None
@@ -0,0 +1,148 @@
+import contextlib
+import subprocess
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+from async_probe import active_probe_runner, split_command
+from inventory_cache import note_probe_failure
+from probe_trace import memo_hit, memo_key, traced_probe
+
+# Запоминание результатов проб в пределах сбора. Внутри inventory_run() каждая
+# команда (после normalize_command) или WMI-запрос выполняется не более одного
+# раза; кто запросил ключ, который еще выполняется, ждет этого выполнения, а не
+# запускает свое. Ошибки (Exception) тоже запоминаются, чтобы отсутствующая
+# утилита не запускалась повторно; прерывания (KeyboardInterrupt, отмена) не
+# запоминаются. Вне сбора ничего не кэшируется: долгоживущие процессы (агент
+# fleet) не отдают устаревших данных об оборудовании.
+
+
+def normalize_command(cmd: str) -> str:
+    """Ключ без учета пробелов; синтаксис wmic еще и нечувствителен к регистру"""
+    text = ' '.join(cmd.split())
+    return text.lower() if text[:5].lower() == 'wmic ' else text
+
+
+class _Pending:
+    __slots__ = ('done', 'value', 'error', 'abandoned')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[Exception] = None
+        # Выполнение прервано: результата нет, ожидающие выполняют пробу сами
+        self.abandoned = False
+
+
+class ProbeMemo:
+    """Результаты одного сбора, общие для всех потоков"""
+
+    def __init__(self):
+        self._entries: Dict[Hashable, _Pending] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_run(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Значение ``key``; ``func`` выполняется, только если в этом сборе его еще никто не выполнил"""
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._entries[key] = _Pending()
+                self.executions += 1
+            else:
+                self.hits += 1
+        if owner:
+            try:
+                entry.value = func()
+            except Exception as e:
+                entry.error = e
+            except BaseException:
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+                entry.abandoned = True
+                raise
+            finally:
+                entry.done.set()
+        else:
+            entry.done.wait()
+            if entry.abandoned:
+                return self.get_or_run(key, func)
+        if entry.error is not None:
+            raise entry.error
+        return entry.value
+
+
+_memo: Optional[ProbeMemo] = None
+_depth = 0
+_scope_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def inventory_run():
+    """Область одного сбора; вложенные и параллельные сборы используют общую память"""
+    global _memo, _depth
+    with _scope_lock:
+        if _depth == 0:
+            _memo = ProbeMemo()
+        _depth += 1
+        memo = _memo
+    try:
+        yield memo
+    finally:
+        with _scope_lock:
+            _depth -= 1
+            if _depth == 0:
+                _memo = None
+
+
+def current_memo() -> Optional[ProbeMemo]:
+    return _memo
+
+
+def memoized(key: Hashable, func: Callable[[], Any]) -> Any:
+    """``func()`` не более одного раза за сбор для ``key`` (вне сбора - всегда)"""
+    memo = _memo
+    try:
+        if memo is None:
+            return func()
+        ran = False
+
+        def run():
+            nonlocal ran
+            ran = True
+            with memo_key(key):
+                return func()
+        result = memo.get_or_run(key, run)
+        if not ran:
+            # Трассировка: вывод получила еще одна секция (см. ProbeTracer.reuse)
+            memo_hit(key)
+        return result
+    except Exception:
+        # Запомненная ошибка отмечается в каждой секции, которая ее получила
+        note_probe_failure(key)
+        raise
+
+
+@traced_probe('cmd')
+def _shell(cmd: str, encoding: str) -> str:
+    runner = active_probe_runner()
+    if runner is not None:
+        # В асинхронном движке (или при воспроизведении фикстур) команда выполняется без оболочки
+        return runner(split_command(cmd), encoding=encoding).strip()
+    return subprocess.check_output(cmd, shell=True, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL,
+                                   text=True, encoding=encoding).strip()
+
+
+def shell_key(cmd: str, encoding: str = 'cp866') -> tuple:
+    """Ключ вывода консольной команды в памяти сбора"""
+    # Кодировка входит в ключ: тот же вывод, декодированный иначе, - другой результат
+    return ('cmd', normalize_command(cmd), encoding)
+
+
+def shell_output(cmd: str, encoding: str = 'cp866') -> str:
+    """Вывод консольной команды без пробелов по краям, один раз за сбор; при ошибке - исключение"""
+    return memoized(shell_key(cmd, encoding), lambda: _shell(cmd, encoding))
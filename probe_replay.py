@@ -0,0 +1,417 @@
+import argparse
+import contextlib
+import gzip
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from async_probe import ProbeError, ProbeTimeout, use_probe_runner
+from inventory_cache import inventory_cache_bypassed
+from lazy_backend import optional_module, substitute_module
+from probe_memo import inventory_run
+
+# Fixture bundles: the text output of every probe a collection made (run_command,
+# run_command_powershell, dxdiag and the wmi module), with exit status and wall
+# time, plus the platform it was recorded on. Replaying a bundle on any OS runs
+# the same parsing code without a single process spawn; psutil readings stay live.
+
+FORMAT_VERSION = 1
+
+CMD = 'cmd'
+POWERSHELL = 'powershell'
+DXDIAG = 'dxdiag'
+WMI = 'wmi'
+
+PLATFORM_FIELDS = ('system', 'release', 'version', 'machine', 'node', 'processor', 'platform', 'architecture')
+
+
+def probe_key(argv: Sequence[str]) -> str:
+    """Fixture key of a command line"""
+    program = os.path.basename(argv[0]).lower()
+    if program in ('dxdiag', 'dxdiag.exe'):
+        return 'dxdiag /t'  # the report goes to a fresh temporary file on every run
+    return ' '.join(argv)
+
+
+def wmi_key(wmi_class: str, args: tuple, kwargs: dict) -> str:
+    """Fixture key of a wmi query such as ``c.Win32_DesktopMonitor()``"""
+    arguments = [repr(a) for a in args] + [f"{k}={v!r}" for k, v in sorted(kwargs.items())]
+    return f"{wmi_class}({', '.join(arguments)})"
+
+
+def _is_dxdiag(argv: Sequence[str]) -> bool:
+    return probe_key(argv) == 'dxdiag /t' and len(argv) >= 3
+
+
+def _plain(value: Any) -> Any:
+    """JSON-compatible copy of a wmi property value"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return str(value)
+
+
+class FixtureBundle:
+    """Recorded probe outputs keyed by kind and command"""
+
+    def __init__(self, probes: Optional[Dict[str, dict]] = None, platform_info: Optional[dict] = None,
+                 recorded: Optional[float] = None):
+        self.probes = probes if probes is not None else {}
+        self.platform = platform_info if platform_info is not None else {}
+        self.recorded = recorded
+        self._lock = threading.Lock()
+
+    @classmethod
+    def capture(cls) -> 'FixtureBundle':
+        """Empty bundle stamped with the current platform"""
+        info = {field: getattr(platform, field)() for field in PLATFORM_FIELDS}
+        return cls(platform_info=info, recorded=time.time())
+
+    def __len__(self) -> int:
+        return len(self.probes)
+
+    def add(self, kind: str, key: str, output: Any, status: int = 0, elapsed: float = 0.0):
+        with self._lock:
+            self.probes[f"{kind}:{key}"] = {'output': output, 'status': status, 'elapsed': elapsed}
+
+    def get(self, kind: str, key: str) -> Optional[dict]:
+        return self.probes.get(f"{kind}:{key}")
+
+    def has_kind(self, kind: str) -> bool:
+        prefix = f"{kind}:"
+        return any(key.startswith(prefix) for key in self.probes)
+
+    @classmethod
+    def load(cls, path: str) -> 'FixtureBundle':
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('format') != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported fixture format {data.get('format')!r}")
+        return cls(data.get('probes', {}), data.get('platform', {}), data.get('recorded'))
+
+    def save(self, path: str):
+        opener = gzip.open if path.endswith('.gz') else open
+        data = {'format': FORMAT_VERSION, 'recorded': self.recorded, 'platform': self.platform,
+                'probes': self.probes}
+        with opener(path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+class _FixtureRunner:
+    """Probe runner (see async_probe.use_probe_runner) with spawn and probe-time counters"""
+
+    def __init__(self, bundle: FixtureBundle):
+        self.bundle = bundle
+        self.spawns = 0
+        self.probe_time = 0.0
+        self.misses: List[str] = []
+        self._powershell_started = False
+        self._lock = threading.Lock()
+
+    def counters(self) -> Tuple[int, float, int]:
+        """(spawns, seconds spent in probes, missing fixtures) so far"""
+        with self._lock:
+            return self.spawns, self.probe_time, len(self.misses)
+
+    def _account(self, elapsed: float, spawns: int = 1):
+        with self._lock:
+            self.spawns += spawns
+            self.probe_time += elapsed
+
+    def _powershell_spawns(self) -> int:
+        """One spawn for the shared PowerShell worker, as in a real run"""
+        with self._lock:
+            started, self._powershell_started = self._powershell_started, True
+        return 0 if started else 1
+
+    def close(self):
+        pass
+
+
+class RecordingRunner(_FixtureRunner):
+    """Runs probes for real and stores their output in the bundle"""
+
+    def __init__(self, bundle: FixtureBundle):
+        super().__init__(bundle)
+        self._worker = None
+
+    def __call__(self, argv: Sequence[str], encoding: Optional[str] = None,
+                 timeout: Optional[float] = None) -> str:
+        argv = list(argv)
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(argv, capture_output=True, stdin=subprocess.DEVNULL, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            elapsed = time.perf_counter() - start
+            self._account(elapsed)
+            self.bundle.add(CMD, probe_key(argv), '', -1, elapsed)
+            raise ProbeTimeout(f"{argv[0]}: no result within {timeout:g} s") from None
+        except OSError as e:
+            self.bundle.add(CMD, probe_key(argv), '', 127, 0.0)
+            raise ProbeError(f"{argv[0]}: {e}") from e
+        elapsed = time.perf_counter() - start
+        self._account(elapsed)
+        if _is_dxdiag(argv):
+            try:
+                with open(argv[2], 'r', encoding='utf-16') as f:
+                    report = f.read()
+            except (OSError, UnicodeError):
+                report = ''
+            self.bundle.add(DXDIAG, probe_key(argv), report, result.returncode, elapsed)
+        output = result.stdout.decode(encoding or 'utf-8', errors='replace')
+        self.bundle.add(CMD, probe_key(argv), output, result.returncode, elapsed)
+        if result.returncode != 0:
+            raise ProbeError(f"{argv[0]}: exit status {result.returncode}", result.returncode)
+        return output
+
+    def powershell(self, script: str, timeout: Optional[float] = None) -> str:
+        from powershell_worker import PowerShellWorker, PowerShellWorkerError
+        if self._worker is None:
+            self._worker = PowerShellWorker()
+        start = time.perf_counter()
+        try:
+            output = self._worker.run(script, timeout=timeout)
+            status = 0
+        except (PowerShellWorkerError, OSError) as e:
+            output, status = '', 1
+            error = e
+        elapsed = time.perf_counter() - start
+        self._account(elapsed, self._powershell_spawns())
+        self.bundle.add(POWERSHELL, script, output, status, elapsed)
+        if status:
+            raise ProbeError(f"powershell: {error}")
+        return output
+
+    def close(self):
+        if self._worker is not None:
+            self._worker.close()
+            self._worker = None
+
+
+class ReplayRunner(_FixtureRunner):
+    """Answers probes from the bundle.
+
+    ``latency`` is None (answer at once), ``'recorded'`` (sleep for the recorded
+    wall time) or a number of seconds per probe. Probes missing from the bundle
+    fail like a command that is not installed and are listed in ``misses``.
+    """
+
+    def __init__(self, bundle: FixtureBundle, latency: Union[None, str, float] = None):
+        super().__init__(bundle)
+        if latency not in (None, 'recorded') and not isinstance(latency, (int, float)):
+            raise ValueError(f"latency must be None, 'recorded' or seconds, not {latency!r}")
+        self.latency = latency
+
+    def lookup(self, kind: str, key: str, timeout: Optional[float] = None, spawns: int = 1) -> Any:
+        entry = self.bundle.get(kind, key)
+        if entry is None:
+            with self._lock:
+                self.misses.append(f"{kind}:{key}")
+            raise ProbeError(f"no fixture for {kind}:{key}")
+        if self.latency == 'recorded':
+            delay = entry['elapsed']
+        else:
+            delay = self.latency or 0.0
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            self._account(timeout, spawns)
+            raise ProbeTimeout(f"{key}: no result within {timeout:g} s")
+        if delay:
+            time.sleep(delay)
+        self._account(delay, spawns)
+        if entry['status'] != 0:
+            raise ProbeError(f"{key}: exit status {entry['status']}", entry['status'])
+        return entry['output']
+
+    def __call__(self, argv: Sequence[str], encoding: Optional[str] = None,
+                 timeout: Optional[float] = None) -> str:
+        argv = list(argv)
+        if _is_dxdiag(argv):
+            report = self.lookup(DXDIAG, probe_key(argv), timeout)
+            with open(argv[2], 'w', encoding='utf-16') as f:
+                f.write(report)
+            return ''
+        return self.lookup(CMD, probe_key(argv), timeout)
+
+    def powershell(self, script: str, timeout: Optional[float] = None) -> str:
+        return self.lookup(POWERSHELL, script, timeout, self._powershell_spawns())
+
+
+class _RecordingWmi:
+    """Stands in for the wmi module while recording: queries are stored as property dicts"""
+
+    def __init__(self, module, runner: RecordingRunner):
+        self._module = module
+        self._runner = runner
+
+    def WMI(self, *args, **kwargs):
+        return _RecordingWmiConnection(self._module.WMI(*args, **kwargs), self._runner)
+
+
+class _RecordingWmiConnection:
+    def __init__(self, connection, runner: RecordingRunner):
+        self._connection = connection
+        self._runner = runner
+
+    def __getattr__(self, name: str) -> Callable:
+        method = getattr(self._connection, name)
+
+        def query(*args, **kwargs):
+            start = time.perf_counter()
+            objects = method(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+            rows = [{prop: _plain(getattr(obj, prop, None)) for prop in getattr(obj, 'properties', {})}
+                    for obj in objects]
+            self._runner._account(elapsed, 0)
+            self._runner.bundle.add(WMI, wmi_key(name, args, kwargs), rows, 0, elapsed)
+            return objects
+        return query
+
+
+class _ReplayWmi:
+    """Stands in for the wmi module during replay: objects are rebuilt from the bundle"""
+
+    def __init__(self, runner: ReplayRunner):
+        self._runner = runner
+
+    def WMI(self, *args, **kwargs):
+        return _ReplayWmiConnection(self._runner)
+
+
+class _ReplayWmiConnection:
+    def __init__(self, runner: ReplayRunner):
+        self._runner = runner
+
+    def __getattr__(self, name: str) -> Callable:
+        def query(*args, **kwargs):
+            rows = self._runner.lookup(WMI, wmi_key(name, args, kwargs), spawns=0)
+            return [SimpleNamespace(properties=dict.fromkeys(row), **row) for row in rows]
+        return query
+
+
+@contextlib.contextmanager
+def _platform_as(info: dict):
+    """Make the platform module report the recorded machine (process-wide)"""
+    saved = {}
+    try:
+        for field in PLATFORM_FIELDS:
+            if field in info:
+                value = info[field]
+                if isinstance(value, list):
+                    value = tuple(value)
+                saved[field] = getattr(platform, field)
+                setattr(platform, field, lambda *args, _value=value, **kwargs: _value)
+        yield
+    finally:
+        for field, func in saved.items():
+            setattr(platform, field, func)
+
+
+@contextlib.contextmanager
+def recording(bundle: FixtureBundle):
+    """Run the collectors for real inside the block and store every probe in ``bundle``"""
+    runner = RecordingRunner(bundle)
+    wmi = optional_module('wmi')
+    with contextlib.ExitStack() as stack:
+        stack.callback(runner.close)
+        stack.enter_context(inventory_run())
+        stack.enter_context(inventory_cache_bypassed())
+        stack.enter_context(use_probe_runner(runner))
+        if wmi is not None:
+            stack.enter_context(substitute_module('wmi', _RecordingWmi(wmi, runner)))
+        yield runner
+
+
+@contextlib.contextmanager
+def replaying(bundle: FixtureBundle, latency: Union[None, str, float] = None):
+    """Answer every probe made inside the block from ``bundle``"""
+    runner = ReplayRunner(bundle, latency)
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(_platform_as(bundle.platform))
+        stack.enter_context(inventory_run())
+        stack.enter_context(inventory_cache_bypassed())
+        stack.enter_context(use_probe_runner(runner))
+        stack.enter_context(substitute_module('wmi', _ReplayWmi(runner) if bundle.has_kind(WMI) else None))
+        yield runner
+
+
+TOOLS = ('hardware', 'serial')
+
+
+def tool_sections(tool: str) -> List[Tuple[str, Callable[[], Any]]]:
+    """(title, collector) pairs of one entry point, in report order"""
+    if tool == 'hardware':
+        import hardware
+        return list(hardware.INVENTORY_SECTIONS)
+    if tool == 'serial':
+        import serial
+        return [("Серийные номера", serial.get_hardware_serial_numbers)]
+    raise ValueError(f"unknown tool {tool!r}")
+
+
+def parse_latency(text: Optional[str]) -> Union[None, str, float]:
+    if text is None or text == 'recorded':
+        return text
+    return float(text)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Record and replay hardware probe fixtures")
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record', help="run the collectors here and save every probe")
+    record.add_argument('bundle', help="output file (.json or .json.gz)")
+    record.add_argument('--tool', choices=TOOLS, action='append', help="entry points to record (default: all)")
+    replay = commands.add_parser('replay', help="run the collectors against a bundle and print the result")
+    replay.add_argument('bundle')
+    replay.add_argument('--tool', choices=TOOLS, action='append')
+    replay.add_argument('--latency', help="'recorded' or seconds per probe (default: none)")
+    show = commands.add_parser('show', help="list the probes in a bundle")
+    show.add_argument('bundle')
+    return parser.parse_args(argv)
+
+
+def _collect(tools: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    result = {}
+    with contextlib.redirect_stdout(sys.stderr):
+        for tool in tools:
+            result[tool] = {title: func() for title, func in tool_sections(tool)}
+    return result
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if args.command == 'show':
+        bundle = FixtureBundle.load(args.bundle)
+        print(f"{args.bundle}: {len(bundle)} probes, recorded on {bundle.platform.get('node')} "
+              f"({bundle.platform.get('system')} {bundle.platform.get('release')})")
+        for key, entry in sorted(bundle.probes.items()):
+            size = len(json.dumps(entry['output'], ensure_ascii=False))
+            print(f"  {entry['elapsed'] * 1000:8.1f} ms {size:8d} B  status {entry['status']:<4} {key[:100]}")
+        return
+    tools = args.tool or list(TOOLS)
+    if args.command == 'record':
+        bundle = FixtureBundle.capture()
+        with recording(bundle) as runner:
+            _collect(tools)
+        bundle.save(args.bundle)
+        print(f"{args.bundle}: {len(bundle)} probes, {runner.spawns} processes, "
+              f"{runner.probe_time:.2f} s in probes")
+        return
+    bundle = FixtureBundle.load(args.bundle)
+    with replaying(bundle, parse_latency(args.latency)) as runner:
+        result = _collect(tools)
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2, default=str)
+    print()
+    for key in runner.misses:
+        print(f"missing fixture: {key}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
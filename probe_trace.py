@@ -0,0 +1,368 @@
+import bisect
+import contextlib
+import contextvars
+import functools
+import json
+import re
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from async_probe import ProbeTimeout
+
+# Трассировка каждого запуска функций run_command из hardware.py и serial.py.
+# Пока трассировщик не установлен, traced_probe/traced_section стоят одного
+# обращения к глобальной переменной; с трассировщиком каждый запуск становится
+# ProbeRecord с секцией, временем, кодом завершения, размером вывода и отметкой,
+# попал ли вывод в результат секции.
+
+# Верхние границы интервалов гистограммы, миллисекунды
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+DEFAULT_SLOW_SECONDS = 1.0
+
+_tracer: Optional['ProbeTracer'] = None
+_section: contextvars.ContextVar = contextvars.ContextVar('probe_section', default=None)
+# Ключ probe_memo выполняемой пробы: ее вывод могут получить и другие секции
+_memo_key: contextvars.ContextVar = contextvars.ContextVar('probe_memo_key', default=None)
+
+_TOKEN = re.compile(r'[^\w.\-]+')
+
+
+class ProbeRecord:
+    """Один трассированный запуск"""
+
+    __slots__ = ('section', 'kind', 'command', 'started', 'wall', 'status', 'error',
+                 'output_bytes', 'used', 'key', 'consumers', '_tokens', '_waiting')
+
+    def __init__(self, section: str, kind: str, command: str, key: Any = None):
+        self.section = section
+        self.kind = kind
+        self.command = command
+        self.started = time.time()
+        self.wall = 0.0
+        self.status: Optional[int] = None  # код завершения; None, если запуск не завершился
+        self.error: Optional[str] = None
+        self.output_bytes = 0
+        self.used: Optional[bool] = None  # None: результат секции еще не проверен
+        self.key = key
+        # Другие секции, получившие тот же вывод из probe_memo без запуска
+        self.consumers: List[str] = []
+        self._tokens: Optional[Set[str]] = None
+        self._waiting: Set[str] = {section}  # секции, результат которых еще не проверен
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 0 and self.error is None
+
+    def as_dict(self) -> dict:
+        return {
+            "section": self.section,
+            "kind": self.kind,
+            "command": self.command,
+            "started": self.started,
+            "wall": self.wall,
+            "status": self.status,
+            "error": self.error,
+            "output_bytes": self.output_bytes,
+            "used": self.used,
+            "consumers": self.consumers,
+        }
+
+
+class LatencyHistogram:
+    """Число запусков по длительности в фиксированных логарифмических интервалах"""
+
+    __slots__ = ('counts', 'total', 'maximum', 'samples')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total = 0.0
+        self.maximum = 0.0
+        self.samples: List[float] = []
+
+    def add(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+        bisect.insort(self.samples, seconds)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        return self.samples[min(len(self.samples) - 1, int(q * len(self.samples)))]
+
+    def buckets(self) -> List[Tuple[str, int]]:
+        labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return list(zip(labels, self.counts))
+
+
+def _status_of(error: BaseException) -> Tuple[Optional[int], str]:
+    """(код завершения, краткая ошибка) для исключения, выброшенного пробой"""
+    returncode = getattr(error, 'returncode', None)
+    if isinstance(error, (subprocess.TimeoutExpired, ProbeTimeout)):
+        return None, 'timeout'
+    if isinstance(error, FileNotFoundError):
+        return None, 'not found'
+    if returncode is not None:
+        return returncode, f"exit status {returncode}"
+    return None, f"{type(error).__name__}: {error}"[:200]
+
+
+def _tokens(value: Any, into: Optional[Set[str]] = None) -> Set[str]:
+    """Слова не короче трех символов в строке или (вложенном) результате секции"""
+    tokens = set() if into is None else into
+    if isinstance(value, str):
+        tokens.update(t for t in _TOKEN.split(value.lower()) if len(t) >= 3)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _tokens(item, tokens)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _tokens(item, tokens)
+    elif value is not None:
+        _tokens(str(value), tokens)
+    return tokens
+
+
+class ProbeTracer:
+    """Собирает ProbeRecord из всех потоков, пока установлен"""
+
+    def __init__(self, slow_seconds: float = DEFAULT_SLOW_SECONDS):
+        self.slow_seconds = slow_seconds
+        self.records: List[ProbeRecord] = []
+        self._lock = threading.Lock()
+
+    def call(self, kind: str, func: Callable, command, args: tuple, kwargs: dict):
+        text = command if isinstance(command, str) else ' '.join(map(str, command))
+        record = ProbeRecord(_section.get() or '-', kind, ' '.join(text.split()), _memo_key.get())
+        start = time.perf_counter()
+        try:
+            result = func(command, *args, **kwargs)
+        except BaseException as e:
+            record.status, record.error = _status_of(e)
+            raise
+        finally:
+            record.wall = time.perf_counter() - start
+            with self._lock:
+                self.records.append(record)
+        if isinstance(result, str):
+            record.output_bytes = len(result.encode('utf-8', errors='replace'))
+            if record.status is None and record.error is None:
+                record.status = 0
+            if not record.ok:
+                record.used = False
+            elif result:
+                record._tokens = _tokens(result)
+            # пустой успешный вывод (dxdiag пишет в файл) остается неизвестным
+        return result
+
+    def reuse(self, key: Any):
+        """Текущая секция получила запомненный вывод пробы ``key``, не запуская ее"""
+        section = _section.get() or '-'
+        with self._lock:
+            for record in self.records:
+                if record.key == key and section != record.section and section not in record.consumers:
+                    record.consumers.append(section)
+                    if record.used is not True and record._tokens is not None:
+                        record._waiting.add(section)
+
+    def finish_section(self, name: str, result: Any):
+        """Отмечает запуски как использованные, если их вывод есть в ``result``.
+
+        Вывод, общий для нескольких секций, использован, если он есть в результате
+        хотя бы одной из них.
+        """
+        with self._lock:
+            pending = [r for r in self.records if name in r._waiting and r._tokens is not None]
+            for record in pending:
+                record._waiting.discard(name)
+        if not pending:
+            return
+        found = _tokens(result)
+        for record in pending:
+            if not record._tokens.isdisjoint(found):
+                record.used = True
+                record._tokens = None
+            else:
+                record.used = False  # пока другая секция не покажет обратное
+
+    # Отчеты
+
+    def by_command(self) -> Dict[Tuple[str, str], LatencyHistogram]:
+        histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        for record in self.records:
+            histograms.setdefault((record.kind, record.command), LatencyHistogram()).add(record.wall)
+        return histograms
+
+    def by_section(self) -> Dict[str, LatencyHistogram]:
+        histograms: Dict[str, LatencyHistogram] = {}
+        for record in self.records:
+            histograms.setdefault(record.section, LatencyHistogram()).add(record.wall)
+        return histograms
+
+    def slow(self) -> List[ProbeRecord]:
+        return sorted((r for r in self.records if r.wall >= self.slow_seconds), key=lambda r: -r.wall)
+
+    def summary(self) -> dict:
+        overall = LatencyHistogram()
+        for record in self.records:
+            overall.add(record.wall)
+        commands = []
+        for (kind, command), histogram in sorted(self.by_command().items(), key=lambda item: -item[1].total):
+            records = [r for r in self.records if r.kind == kind and r.command == command]
+            commands.append({
+                "kind": kind,
+                "command": command,
+                "sections": sorted({section for r in records for section in (r.section, *r.consumers)}),
+                "count": len(histogram),
+                "total": histogram.total,
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+                "max": histogram.maximum,
+                "failures": sum(1 for r in records if not r.ok),
+                "unused": sum(1 for r in records if r.used is False),
+                "output_bytes": sum(r.output_bytes for r in records),
+            })
+        return {
+            "type": "probe_trace",
+            "probes": len(self.records),
+            "total": overall.total,
+            "histogram": dict(overall.buckets()),
+            "sections": {name: {"count": len(h), "total": h.total, "max": h.maximum}
+                         for name, h in self.by_section().items()},
+            "commands": commands,
+            "slow": [r.as_dict() for r in self.slow()],
+        }
+
+    def print_report(self, stream=None, top: int = 15):
+        """Гистограмма задержек, итоги по секциям и самые долгие команды"""
+        stream = sys.stderr if stream is None else stream
+        summary = self.summary()
+        print(f"\n⏱️  Трассировка команд: {summary['probes']} запусков, {summary['total']:.2f} с", file=stream)
+        peak = max(summary['histogram'].values(), default=0) or 1
+        for label, count in summary['histogram'].items():
+            if count:
+                print(f"   {label:>10} {count:5d} {'█' * max(1, round(30 * count / peak))}", file=stream)
+        print("   По секциям:", file=stream)
+        for name, data in sorted(summary['sections'].items(), key=lambda item: -item[1]['total']):
+            print(f"   {data['total'] * 1000:9.1f} мс {data['count']:4d} x  {name}", file=stream)
+        print(f"   Самые долгие команды (p50 / p95 / max, мс):", file=stream)
+        for c in summary['commands'][:top]:
+            flags = []
+            if c['failures']:
+                flags.append(f"ошибок {c['failures']}")
+            if c['unused']:
+                flags.append(f"не использовано {c['unused']}")
+            print(f"   {c['p50'] * 1000:8.1f} {c['p95'] * 1000:8.1f} {c['max'] * 1000:8.1f}  "
+                  f"{c['count']:3d} x {c['command'][:70]}" + (f"  [{', '.join(flags)}]" if flags else ''),
+                  file=stream)
+        slow = summary['slow']
+        if slow:
+            print(f"   Медленные запуски (>= {self.slow_seconds:g} с): {len(slow)}", file=stream)
+            for r in slow[:top]:
+                state = 'ok' if r['status'] == 0 and r['error'] is None else (r['error'] or r['status'])
+                print(f"   {r['wall']:7.2f} с  {r['section']:<28} {state}  {r['command'][:60]}", file=stream)
+
+    def write_records(self, path: str, extra: Optional[dict] = None):
+        """Дописывает все запуски и сводку в формате NDJSON"""
+        with open(path, 'a', encoding='utf-8') as f:
+            for record in self.records:
+                f.write(json.dumps(dict(record.as_dict(), type="probe", **(extra or {})), ensure_ascii=False) + '\n')
+            f.write(json.dumps(dict(self.summary(), **(extra or {})), ensure_ascii=False) + '\n')
+
+
+def install_tracer(tracer: Optional[ProbeTracer]) -> Optional[ProbeTracer]:
+    """Начинает трассировку в ``tracer`` (None ее останавливает); возвращает предыдущий трассировщик"""
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    return previous
+
+
+def active_tracer() -> Optional[ProbeTracer]:
+    return _tracer
+
+
+@contextlib.contextmanager
+def memo_key(key: Any):
+    """Пробы внутри блока выполняются для записи ``key`` probe_memo"""
+    if _tracer is None:
+        yield
+        return
+    token = _memo_key.set(key)
+    try:
+        yield
+    finally:
+        _memo_key.reset(token)
+
+
+def memo_hit(key: Any):
+    """Секция получила из probe_memo результат ``key``, не запуская пробу"""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.reuse(key)
+
+
+def traced_probe(kind: str) -> Callable:
+    """Декоратор функций запуска, принимающих команду первым аргументом"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(command, *args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(command, *args, **kwargs)
+            return tracer.call(kind, func, command, args, kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_section(func: Callable) -> Callable:
+    """Декоратор сборщиков: запуски внутри относятся к секции ``func``"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        tracer = _tracer
+        if tracer is None:
+            return func(*args, **kwargs)
+        token = _section.set(name)
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            _section.reset(token)
+        tracer.finish_section(name, result)
+        return result
+    return wrapper
+
+
+def add_trace_arguments(parser):
+    """Общие для точек входа параметры --trace / --trace-file / --slow-probe"""
+    parser.add_argument('--trace', action='store_true',
+                        help="трассировать запуски команд и вывести отчет о задержках в stderr")
+    parser.add_argument('--trace-file', metavar='FILE',
+                        help="дописывать записи трассировки в FILE (NDJSON)")
+    parser.add_argument('--slow-probe', type=float, default=DEFAULT_SLOW_SECONDS, metavar='SECONDS',
+                        help=f"порог медленного запуска для отчета (по умолчанию {DEFAULT_SLOW_SECONDS:g} с)")
+
+
+@contextlib.contextmanager
+def tracing_from_args(args, tool: str):
+    """Трассирует блок, если задан --trace или --trace-file; по завершении выводит отчет"""
+    if not (args.trace or args.trace_file):
+        yield None
+        return
+    import platform
+    tracer = ProbeTracer(args.slow_probe)
+    previous = install_tracer(tracer)
+    try:
+        yield tracer
+    finally:
+        install_tracer(previous)
+        if args.trace:
+            tracer.print_report()
+        if args.trace_file:
+            tracer.write_records(args.trace_file, {"tool": tool, "node": platform.node(),
+                                                   "system": platform.system()})
@@ -0,0 +1,174 @@
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from lazy_backend import lazy_module
+
+psutil = lazy_module('psutil')
+
+# Persistent PID-keyed table of psutil.Process objects for top-style monitors.
+# A refresh lists the PIDs once, drops the exited ones and creates objects (and
+# reads the static name/create time) only for the new ones; for the rest it
+# re-reads the counters under oneshot() and turns them into per-tick deltas.
+# Top-N queries use a bounded heap instead of sorting the whole table.
+
+SORT_KEYS = ('cpu', 'rss', 'io')
+
+
+class ProcessEntry:
+    """One tracked process and its latest counters"""
+
+    __slots__ = ('pid', 'process', 'name', 'create_time', 'cpu_time', 'cpu_percent',
+                 'rss', 'io_bytes', 'io_rate', 'io_denied')
+
+    def __init__(self, process, name: str, create_time: float):
+        self.pid = process.pid
+        self.process = process
+        self.name = name
+        self.create_time = create_time
+        self.cpu_time: Optional[float] = None
+        self.cpu_percent = 0.0
+        self.rss = 0
+        self.io_bytes: Optional[int] = None
+        self.io_rate = 0.0
+        # io_counters() of other users' processes raises AccessDenied: asked once, not every tick
+        self.io_denied = False
+
+    def as_dict(self) -> dict:
+        return {
+            "pid": self.pid,
+            "name": self.name,
+            "cpu_percent": round(self.cpu_percent, 1),
+            "rss": self.rss,
+            "io_rate": round(self.io_rate),
+        }
+
+
+class ProcessTable:
+    """Process table kept between ticks; refresh cost follows process churn"""
+
+    def __init__(self):
+        self._entries: Dict[int, ProcessEntry] = {}
+        self._lock = threading.Lock()
+        self.refreshed_at: Optional[float] = None
+        self.refresh_seconds = 0.0
+        self.added = 0
+        self.removed = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _track(pid: int) -> Optional[ProcessEntry]:
+        try:
+            process = psutil.Process(pid)
+            with process.oneshot():
+                return ProcessEntry(process, process.name(), process.create_time())
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+
+    @staticmethod
+    def _current_create_time(process) -> float:
+        """Creation time of whatever process has the PID now.
+
+        Process.create_time() returns the value cached when the object was made,
+        so it cannot reveal PID reuse. The platform implementation re-reads it;
+        inside oneshot() that comes from the same read as the counters.
+        """
+        implementation = getattr(process, '_proc', None)
+        if implementation is not None:
+            return implementation.create_time()
+        return psutil.Process(process.pid).create_time()
+
+    @classmethod
+    def _sample(cls, entry: ProcessEntry, elapsed: Optional[float]) -> bool:
+        """Re-read the counters of ``entry``; False if the PID is gone or was reused"""
+        process = entry.process
+        try:
+            with process.oneshot():
+                if cls._current_create_time(process) != entry.create_time:
+                    return False
+                times = process.cpu_times()
+                entry.rss = process.memory_info().rss
+                io_bytes = None
+                if not entry.io_denied:
+                    try:
+                        io = process.io_counters()
+                        io_bytes = io.read_bytes + io.write_bytes
+                    except (psutil.AccessDenied, AttributeError):
+                        # AttributeError: no io_counters() on macOS
+                        entry.io_denied = True
+        except (psutil.AccessDenied, psutil.ZombieProcess):
+            # Zombies stay until reaped; their PID leaves psutil.pids() then
+            return True
+        except psutil.NoSuchProcess:
+            return False
+        cpu_time = times.user + times.system
+        if elapsed and entry.cpu_time is not None:
+            entry.cpu_percent = max(cpu_time - entry.cpu_time, 0.0) / elapsed * 100
+            if io_bytes is not None and entry.io_bytes is not None:
+                entry.io_rate = max(io_bytes - entry.io_bytes, 0) / elapsed
+        entry.cpu_time = cpu_time
+        entry.io_bytes = io_bytes
+        return True
+
+    def refresh(self) -> Tuple[int, int]:
+        """Bring the table up to date; returns (new PIDs, exited PIDs)"""
+        with self._lock:
+            start = time.perf_counter()
+            now = time.monotonic()
+            elapsed = None if self.refreshed_at is None else now - self.refreshed_at
+            pids = set(psutil.pids())
+            entries = self._entries
+            gone = [pid for pid in entries if pid not in pids]
+            for pid in gone:
+                del entries[pid]
+            added = 0
+            for pid in pids:
+                if pid not in entries:
+                    entry = self._track(pid)
+                    if entry is not None:
+                        entries[pid] = entry
+                        added += 1
+            for pid, entry in list(entries.items()):
+                if not self._sample(entry, elapsed):
+                    # The PID exited between the listing and the read, or belongs to a new process now
+                    del entries[pid]
+                    gone.append(pid)
+                    replacement = self._track(pid)
+                    if replacement is not None:
+                        entries[pid] = replacement
+                        self._sample(replacement, None)
+                        added += 1
+            self.refreshed_at = now
+            self.added, self.removed = added, len(gone)
+            self.refresh_seconds = time.perf_counter() - start
+            return self.added, self.removed
+
+    def top(self, n: int = 10, key: str = 'cpu', max_age: Optional[float] = None) -> List[ProcessEntry]:
+        """``n`` largest processes by ``key`` (bounded heap, the table is not sorted).
+
+        With ``max_age`` the table is refreshed first if it is older than that.
+        """
+        if key not in SORT_KEYS:
+            raise ValueError(f"unknown sort key {key!r}, expected one of {SORT_KEYS}")
+        if max_age is not None and (self.refreshed_at is None
+                                    or time.monotonic() - self.refreshed_at > max_age):
+            self.refresh()
+        attr = {'cpu': 'cpu_percent', 'rss': 'rss', 'io': 'io_rate'}[key]
+        with self._lock:
+            return heapq.nlargest(n, self._entries.values(), key=lambda e: getattr(e, attr))
+
+
+_process_table: Optional[ProcessTable] = None
+_process_table_lock = threading.Lock()
+
+
+def get_process_table() -> ProcessTable:
+    """Shared process table (filled on the first refresh)"""
+    global _process_table
+    with _process_table_lock:
+        if _process_table is None:
+            _process_table = ProcessTable()
+    return _process_table
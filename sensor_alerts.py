@@ -0,0 +1,228 @@
+import json
+import math
+import time
+from fnmatch import fnmatchcase
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+SEVERITY_ORDER = {"info": 0, "warning": 1, "critical": 2}
+
+FIRING = "firing"
+CLEARED = "cleared"
+
+
+class AlertRule:
+    """Declarative alert rule.
+
+    Sensors are selected by ``sensor`` (an identifier or a glob over identifiers,
+    e.g. ``/amdcpu/*/temperature/*``) and/or ``category``. Exactly one condition
+    is set: ``above``, ``below`` or ``rate_above`` (absolute change per second).
+    The condition must hold for ``for_seconds`` before the alert fires, and the
+    alert clears only once the value is ``hysteresis`` units back on the safe side.
+    """
+
+    __slots__ = ('name', 'sensor', 'category', 'above', 'below', 'rate_above',
+                 'for_seconds', 'hysteresis', 'severity')
+
+    def __init__(self, name: str, sensor: Optional[str] = None, category: Optional[str] = None,
+                 above: Optional[float] = None, below: Optional[float] = None,
+                 rate_above: Optional[float] = None, for_seconds: float = 0.0,
+                 hysteresis: float = 0.0, severity: str = "warning"):
+        if sum(x is not None for x in (above, below, rate_above)) != 1:
+            raise ValueError(f"rule {name!r}: set exactly one of above, below, rate_above")
+        if severity not in SEVERITY_ORDER:
+            raise ValueError(f"rule {name!r}: unknown severity {severity!r}")
+        self.name = name
+        self.sensor = sensor
+        self.category = category
+        self.above = above
+        self.below = below
+        self.rate_above = rate_above
+        self.for_seconds = for_seconds
+        self.hysteresis = hysteresis
+        self.severity = severity
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'AlertRule':
+        return cls(**data)
+
+    def matches(self, record) -> bool:
+        if self.category is not None and record.category != self.category:
+            return False
+        if self.sensor is not None and not fnmatchcase(record.identifier, self.sensor):
+            return False
+        return True
+
+
+def _check_unique_names(rules: Iterable[AlertRule]):
+    """Alert state and events are keyed by rule name, so names must be unique"""
+    seen = set()
+    for rule in rules:
+        if rule.name in seen:
+            raise ValueError(f"duplicate alert rule name {rule.name!r}")
+        seen.add(rule.name)
+
+
+def load_rules(path: str) -> List[AlertRule]:
+    """Read a JSON list of rule definitions (AlertRule keyword arguments)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [AlertRule.from_dict(item) for item in json.load(f)]
+
+
+# Replaces the former hard-coded 70/80 °C checks in the console report
+DEFAULT_RULES = (
+    AlertRule("temperature-high", category="temperature", above=70.0, hysteresis=2.0, severity="warning"),
+    AlertRule("temperature-critical", category="temperature", above=80.0, hysteresis=2.0, severity="critical"),
+)
+
+
+class AlertEvent:
+    """A rule firing or clearing for one sensor"""
+
+    __slots__ = ('rule', 'state', 'identifier', 'name', 'hardware', 'unit', 'value', 'timestamp')
+
+    def __init__(self, rule: AlertRule, state: str, record, value: float, timestamp: float):
+        self.rule = rule
+        self.state = state
+        self.identifier = record.identifier
+        self.name = record.name
+        self.hardware = record.hardware
+        self.unit = record.unit
+        self.value = value
+        self.timestamp = timestamp
+
+    @property
+    def severity(self) -> str:
+        return self.rule.severity
+
+    def as_dict(self) -> dict:
+        return {
+            "rule": self.rule.name,
+            "severity": self.rule.severity,
+            "state": self.state,
+            "identifier": self.identifier,
+            "name": self.name,
+            "hardware": self.hardware,
+            "unit": self.unit,
+            "value": self.value,
+            "timestamp": self.timestamp,
+        }
+
+
+class _Binding:
+    """One rule bound to one sensor, with its incremental state"""
+
+    __slots__ = ('rule', 'record', 'index', 'kind', 'limit', 'clear', 'for_seconds',
+                 'pending_since', 'active', 'last_value', 'last_time')
+
+    def __init__(self, rule: AlertRule, record):
+        self.rule = rule
+        self.record = record
+        self.index = record.index
+        if rule.above is not None:
+            self.kind, self.limit, self.clear = 'above', rule.above, rule.above - rule.hysteresis
+        elif rule.below is not None:
+            self.kind, self.limit, self.clear = 'below', rule.below, rule.below + rule.hysteresis
+        else:
+            self.kind, self.limit, self.clear = 'rate', rule.rate_above, rule.rate_above - rule.hysteresis
+        self.for_seconds = rule.for_seconds
+        self.pending_since = None
+        self.active = None  # firing AlertEvent while the alert is active
+        self.last_value = math.nan
+        self.last_time = math.nan
+
+
+class AlertEngine:
+    """Evaluates rules incrementally against SensorRegistry values.
+
+    ``compile(records)`` binds every rule to its matching sensors once;
+    ``evaluate(values, timestamp)`` then reads only the bound slots of the
+    flat values array. Events go to every sink (any callable taking an AlertEvent).
+    """
+
+    def __init__(self, rules: Iterable[AlertRule] = DEFAULT_RULES,
+                 sinks: Iterable[Callable[[AlertEvent], None]] = ()):
+        self.rules = list(rules)
+        _check_unique_names(self.rules)
+        self.sinks = list(sinks)
+        self._bindings: List[_Binding] = []
+
+    def add_sink(self, sink: Callable[[AlertEvent], None]):
+        self.sinks.append(sink)
+        return sink
+
+    def compile(self, records: Sequence):
+        """Bind rules to sensors (registry records); state of surviving bindings is kept"""
+        _check_unique_names(self.rules)
+        previous = {(b.rule.name, b.record.identifier): b for b in self._bindings}
+        bindings = []
+        for rule in self.rules:
+            for record in records:
+                if rule.matches(record):
+                    old = previous.get((rule.name, record.identifier))
+                    binding = _Binding(rule, record)
+                    if old is not None:
+                        binding.pending_since, binding.active = old.pending_since, old.active
+                        binding.last_value, binding.last_time = old.last_value, old.last_time
+                    bindings.append(binding)
+        self._bindings = bindings
+
+    def _emit(self, event: AlertEvent):
+        for sink in self.sinks:
+            sink(event)
+
+    def evaluate(self, values: Sequence[float], timestamp: Optional[float] = None) -> List[AlertEvent]:
+        """Advance all bindings by one tick; returns the events emitted"""
+        now = time.time() if timestamp is None else timestamp
+        events = []
+        for b in self._bindings:
+            value = values[b.index]
+            if value != value:  # NaN: no reading this tick, keep state
+                continue
+            kind = b.kind
+            if kind == 'above':
+                triggered = value > b.limit
+                released = value <= b.clear
+            elif kind == 'below':
+                triggered = value < b.limit
+                released = value >= b.clear
+            else:
+                previous, previous_time = b.last_value, b.last_time
+                b.last_value, b.last_time = value, now
+                if previous != previous or now <= previous_time:
+                    continue
+                measure = abs(value - previous) / (now - previous_time)
+                triggered = measure > b.limit
+                released = measure <= b.clear
+            if b.active is None:
+                if not triggered:
+                    b.pending_since = None
+                    continue
+                if b.pending_since is None:
+                    b.pending_since = now
+                if now - b.pending_since < b.for_seconds:
+                    continue
+                b.active = AlertEvent(b.rule, FIRING, b.record, value, now)
+                events.append(b.active)
+            elif released:
+                b.active = None
+                b.pending_since = None
+                events.append(AlertEvent(b.rule, CLEARED, b.record, value, now))
+        for event in events:
+            self._emit(event)
+        return events
+
+    def active(self, severity: Optional[str] = None) -> List[AlertEvent]:
+        """Currently firing alerts, optionally of one severity"""
+        return [b.active for b in self._bindings
+                if b.active is not None and (severity is None or b.rule.severity == severity)]
+
+    def severities(self) -> Dict[str, str]:
+        """identifier -> highest firing severity, for every sensor with an active alert"""
+        worst: Dict[str, str] = {}
+        for b in self._bindings:
+            if b.active is not None:
+                identifier = b.record.identifier
+                current = worst.get(identifier)
+                if current is None or SEVERITY_ORDER[b.rule.severity] > SEVERITY_ORDER[current]:
+                    worst[identifier] = b.rule.severity
+        return worst
@@ -0,0 +1,85 @@
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class Deadband:
+    """Minimum change that counts as a new value: absolute units and/or a fraction
+    of the last emitted value. With neither set, any change is emitted."""
+
+    __slots__ = ('absolute', 'relative')
+
+    def __init__(self, absolute: Optional[float] = None, relative: Optional[float] = None):
+        self.absolute = absolute
+        self.relative = relative
+
+    def exceeded(self, previous: float, current: float) -> bool:
+        diff = abs(current - previous)
+        if self.absolute is None and self.relative is None:
+            return diff > 0
+        if self.absolute is not None and diff > self.absolute:
+            return True
+        if self.relative is not None and diff > self.relative * abs(previous):
+            return True
+        return False
+
+
+# Per-category deadbands for typical idle-machine noise
+DEFAULT_DEADBANDS = {
+    "temperature": Deadband(absolute=0.5),
+    "load": Deadband(absolute=2.0),
+    "clock": Deadband(absolute=50.0),
+    "voltage": Deadband(absolute=0.01),
+    "power": Deadband(absolute=0.5),
+    "fan": Deadband(absolute=50.0),
+    "throughput": Deadband(relative=0.05),
+    "data": Deadband(relative=0.01),
+}
+
+
+class DeltaEmitter:
+    """Filters categorised readings down to sensors that moved beyond their deadband.
+
+    Values are compared with the last *emitted* value, so slow drift is still
+    reported once it adds up. Every ``keyframe_interval`` seconds a full set is
+    emitted so late subscribers can resynchronise.
+    """
+
+    def __init__(self, deadbands: Optional[Dict[str, Deadband]] = None,
+                 keyframe_interval: float = 60.0):
+        self.deadbands = dict(DEFAULT_DEADBANDS)
+        if deadbands:
+            self.deadbands.update(deadbands)
+        self.keyframe_interval = keyframe_interval
+        self._last_emitted: Dict[str, float] = {}
+        self._last_keyframe: Optional[float] = None
+        self._default = Deadband()
+
+    def request_keyframe(self):
+        """Force a full emission on the next call (e.g. when a subscriber joins)"""
+        self._last_keyframe = None
+
+    def process(self, readings: Dict[str, List[dict]],
+                now: Optional[float] = None) -> Tuple[bool, Dict[str, List[dict]]]:
+        """Return (is_keyframe, readings to emit) in the get_sensor_readings format"""
+        now = time.monotonic() if now is None else now
+        keyframe = self._last_keyframe is None or now - self._last_keyframe >= self.keyframe_interval
+        last = self._last_emitted
+        emitted = {}
+        for category, sensors in readings.items():
+            deadband = self.deadbands.get(category, self._default)
+            changed = []
+            for sensor in sensors:
+                identifier = sensor["identifier"]
+                previous = last.get(identifier)
+                if keyframe or previous is None or deadband.exceeded(previous, sensor["value"]):
+                    last[identifier] = sensor["value"]
+                    changed.append(sensor)
+            emitted[category] = changed
+        if keyframe:
+            self._last_keyframe = now
+            # Sensors that vanished are forgotten so they are re-sent if they return
+            present = {s["identifier"] for sensors in readings.values() for s in sensors}
+            for identifier in list(last):
+                if identifier not in present:
+                    del last[identifier]
+        return keyframe, emitted
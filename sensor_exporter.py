@@ -0,0 +1,178 @@
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    """Sample value; non-finite numbers use the exposition spellings, not Python's inf/nan"""
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+
+def render_openmetrics(readings: Dict[str, List[dict]]) -> str:
+    """Render get_sensor_readings() output as one gauge family labelled by
+    hardware, sensor name, category, unit and identifier"""
+    lines = [
+        '# HELP hardware_sensor_value Current value of a hardware sensor.',
+        '# TYPE hardware_sensor_value gauge',
+    ]
+    for category, sensors in readings.items():
+        for sensor in sensors:
+            labels = (
+                f'hardware="{_escape_label(sensor["hardware"])}",'
+                f'sensor="{_escape_label(sensor["name"])}",'
+                f'category="{_escape_label(category)}",'
+                f'unit="{_escape_label(sensor["unit"])}",'
+                f'identifier="{_escape_label(sensor["identifier"])}"'
+            )
+            lines.append(f'hardware_sensor_value{{{labels}}} {_format_value(sensor["value"])}')
+    return '\n'.join(lines) + '\n'
+
+
+class SensorExporter:
+    """HTTP exporter serving SystemMonitor readings as OpenMetrics or Prometheus text.
+
+    A collector thread polls ``source.get_sensor_readings()`` every ``interval``
+    seconds and pre-renders the body; scrapes only return the latest snapshot,
+    so any number of concurrent scrapes cause no extra hardware polls.
+    ``source`` can be any object with a get_sensor_readings() method.
+    """
+
+    def __init__(self, source, interval: float = 5.0, host: str = '0.0.0.0', port: int = 9182):
+        self.source = source
+        self.interval = interval
+        self.host = host
+        self.port = port
+        self._snapshot = ''
+        self._stats_lock = threading.Lock()
+        self.collections = 0
+        self.collect_errors = 0
+        self.last_collect_duration = 0.0
+        self.last_collect_timestamp = 0.0
+        self.scrapes = 0
+        self.scrape_duration_sum = 0.0
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._collector: Optional[threading.Thread] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._server_thread: Optional[threading.Thread] = None
+
+    def collect_once(self):
+        """Poll the source once and replace the snapshot"""
+        start = time.perf_counter()
+        try:
+            body = render_openmetrics(self.source.get_sensor_readings())
+        except Exception:
+            with self._stats_lock:
+                self.collect_errors += 1
+            return
+        duration = time.perf_counter() - start
+        # Swapping one reference is atomic: scrapes see either the old or the new body
+        self._snapshot = body
+        with self._stats_lock:
+            self.collections += 1
+            self.last_collect_duration = duration
+            self.last_collect_timestamp = time.time()
+        self._ready.set()
+
+    def _collect_loop(self):
+        while not self._stop.is_set():
+            self.collect_once()
+            self._stop.wait(self.interval)
+
+    def render(self, openmetrics: bool = True) -> str:
+        """Latest snapshot plus the exporter's own metrics in the negotiated format.
+
+        OpenMetrics names a counter family without the ``_total`` suffix and ends
+        the exposition with ``# EOF``; the Prometheus 0.0.4 text format declares
+        the sample name itself and has no terminator.
+        """
+        def counter(name: str, help_text: str, value: int) -> str:
+            family = name if openmetrics else f'{name}_total'
+            return (f'# HELP {family} {help_text}\n'
+                    f'# TYPE {family} counter\n'
+                    f'{name}_total {value}\n')
+
+        with self._stats_lock:
+            own = (
+                counter('sensor_exporter_collections', 'Hardware polls performed by the collector.',
+                        self.collections)
+                + counter('sensor_exporter_collect_errors', 'Hardware polls that failed.', self.collect_errors)
+                + '# HELP sensor_exporter_collect_duration_seconds Duration of the last hardware poll.\n'
+                '# TYPE sensor_exporter_collect_duration_seconds gauge\n'
+                f'sensor_exporter_collect_duration_seconds {_format_value(self.last_collect_duration)}\n'
+                '# HELP sensor_exporter_last_collect_timestamp_seconds Time of the last successful poll.\n'
+                '# TYPE sensor_exporter_last_collect_timestamp_seconds gauge\n'
+                f'sensor_exporter_last_collect_timestamp_seconds {_format_value(self.last_collect_timestamp)}\n'
+                '# HELP sensor_exporter_scrape_duration_seconds Time spent serving previous scrapes.\n'
+                '# TYPE sensor_exporter_scrape_duration_seconds summary\n'
+                f'sensor_exporter_scrape_duration_seconds_count {self.scrapes}\n'
+                f'sensor_exporter_scrape_duration_seconds_sum {_format_value(self.scrape_duration_sum)}\n'
+            )
+        return self._snapshot + own + ('# EOF\n' if openmetrics else '')
+
+    def _record_scrape(self, duration: float):
+        with self._stats_lock:
+            self.scrapes += 1
+            self.scrape_duration_sum += duration
+
+    def _make_handler(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                start = time.perf_counter()
+                if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                openmetrics = 'openmetrics' in self.headers.get('Accept', '')
+                body = exporter.render(openmetrics).encode('utf-8')
+                content_type = OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                exporter._record_scrape(time.perf_counter() - start)
+
+            def log_message(self, format, *args):
+                pass  # scrapes are too frequent for per-request logging
+
+        return Handler
+
+    def start(self, wait_first: float = 10.0):
+        """Start the collector and the HTTP server in background threads"""
+        self._stop.clear()
+        self._collector = threading.Thread(target=self._collect_loop, name="sensor-collector", daemon=True)
+        self._collector.start()
+        self._ready.wait(wait_first)
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._server_thread = threading.Thread(target=self._server.serve_forever, name="sensor-exporter", daemon=True)
+        self._server_thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and collecting"""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._collector is not None:
+            self._collector.join(timeout=self.interval + 1)
+            self._collector = None
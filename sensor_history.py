@@ -0,0 +1,111 @@
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_CAPACITY = 3600  # one hour at 1 Hz per sensor
+
+
+class SensorRingBuffer:
+    """Fixed-capacity history of (timestamp, value) samples for one sensor.
+
+    Every sample is written twice, at ``i`` and ``i + capacity``, so any run of
+    up to ``capacity`` consecutive samples is contiguous in memory and can be
+    returned as a zero-copy memoryview slice.
+    """
+
+    __slots__ = ('capacity', '_timestamps', '_values', '_next', '_count')
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._timestamps = array('d', bytes(16 * capacity))
+        self._values = array('d', bytes(16 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, value: float):
+        """Add a sample, overwriting the oldest one when full"""
+        i = self._next
+        self._timestamps[i] = self._timestamps[i + self.capacity] = timestamp
+        self._values[i] = self._values[i + self.capacity] = value
+        self._next = (i + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def _span(self) -> Tuple[int, int]:
+        """Start/end offsets of the whole history in the mirrored arrays"""
+        if self._count < self.capacity:
+            return 0, self._count
+        return self._next, self._next + self.capacity
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        """Most recent (timestamp, value) or None"""
+        if not self._count:
+            return None
+        _, end = self._span()
+        return self._timestamps[end - 1], self._values[end - 1]
+
+    def last(self, n: int) -> Tuple[memoryview, memoryview]:
+        """Views of the last ``n`` timestamps and values, oldest first (no copy)"""
+        start, end = self._span()
+        start = max(start, end - max(n, 0))
+        return memoryview(self._timestamps)[start:end], memoryview(self._values)[start:end]
+
+    def window(self, start_time: float, end_time: Optional[float] = None) -> Tuple[memoryview, memoryview]:
+        """Views of samples with start_time <= timestamp <= end_time (no copy)"""
+        start, end = self._span()
+        timestamps = memoryview(self._timestamps)[start:end]
+        lo = bisect_left(timestamps, start_time)
+        hi = len(timestamps) if end_time is None else bisect_right(timestamps, end_time)
+        return timestamps[lo:hi], memoryview(self._values)[start + lo:start + hi]
+
+
+class SensorHistory:
+    """Per-identifier ring buffers for readings from SystemMonitor"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._buffers: Dict[str, SensorRingBuffer] = {}
+
+    def __contains__(self, identifier: str) -> bool:
+        return identifier in self._buffers
+
+    def identifiers(self) -> List[str]:
+        return list(self._buffers)
+
+    def buffer(self, identifier: str) -> Optional[SensorRingBuffer]:
+        return self._buffers.get(identifier)
+
+    def record_value(self, identifier: str, timestamp: float, value: float):
+        """Append one sample for a sensor"""
+        buffer = self._buffers.get(identifier)
+        if buffer is None:
+            buffer = self._buffers[identifier] = SensorRingBuffer(self.capacity)
+        buffer.append(timestamp, value)
+
+    def record(self, readings: Dict[str, Iterable[dict]], timestamp: Optional[float] = None):
+        """Append a categorised reading set as returned by get_sensor_readings"""
+        timestamp = time.time() if timestamp is None else timestamp
+        for sensors in readings.values():
+            for sensor in sensors:
+                self.record_value(sensor["identifier"], timestamp, sensor["value"])
+
+    def last(self, identifier: str, n: int) -> Tuple[memoryview, memoryview]:
+        """Last ``n`` samples of a sensor as (timestamps, values) views"""
+        buffer = self._buffers.get(identifier)
+        if buffer is None:
+            return memoryview(array('d')), memoryview(array('d'))
+        return buffer.last(n)
+
+    def window(self, identifier: str, start_time: float,
+               end_time: Optional[float] = None) -> Tuple[memoryview, memoryview]:
+        """Samples of a sensor inside a time window as (timestamps, values) views"""
+        buffer = self._buffers.get(identifier)
+        if buffer is None:
+            return memoryview(array('d')), memoryview(array('d'))
+        return buffer.window(start_time, end_time)
@@ -0,0 +1,345 @@
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Segment layout (little-endian, every field 8 bytes wide so the file casts to 'd'):
+#   header   64 bytes: magic, version, row capacity, column count, rows written
+#   times    capacity x float64 timestamps
+#   column i capacity x float64 values (NaN = no reading), one block per sensor
+# Only the first "rows written" entries of a block are meaningful: the writer
+# stores every column of each row it appends (NaN for sensors missing from the
+# tick) and nothing is written ahead. A segment is created by truncating an empty
+# file to its full size. On Linux that leaves a sparse file; NTFS reserves the
+# whole length unless the file is marked sparse, which is done on Windows, and
+# where that fails the size is still bounded by MAX_SEGMENT_BYTES (fewer rows per
+# segment when there are many sensors). New sensors append column blocks to the
+# end of the current segment, so the file only ever grows.
+MAGIC = b'SLOGSEG1'
+HEADER = struct.Struct('<8sQQQQ24x')
+HEADER_WORDS = HEADER.size // 8
+INDEX_FILE = 'index.json'
+DEFAULT_SEGMENT_ROWS = 86400  # one day at 1 Hz
+MAX_SEGMENT_BYTES = 64 * 1024 * 1024
+
+
+def segment_rows_for(columns: int, rows: int = DEFAULT_SEGMENT_ROWS) -> int:
+    """Row capacity of a new segment: ``rows``, fewer if the file would exceed MAX_SEGMENT_BYTES"""
+    return max(1, min(rows, (MAX_SEGMENT_BYTES - HEADER.size) // ((1 + columns) * 8)))
+
+
+def _set_sparse(f):
+    """Mark a new file sparse on NTFS (FSCTL_SET_SPARSE), so truncating it allocates nothing"""
+    if os.name != 'nt':
+        return
+    try:
+        import ctypes
+        import msvcrt
+        from ctypes import wintypes
+        returned = wintypes.DWORD()
+        ctypes.windll.kernel32.DeviceIoControl(
+            wintypes.HANDLE(msvcrt.get_osfhandle(f.fileno())), 0x000900C4, None, 0, None, 0,
+            ctypes.byref(returned), None)
+    except (OSError, AttributeError):
+        pass  # FAT/exFAT: no sparse files, the size cap still applies
+
+
+def _write_index(directory: str, index: dict):
+    """Atomically replace the header index"""
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(directory, INDEX_FILE))
+
+
+def _read_index(directory: str) -> dict:
+    path = os.path.join(directory, INDEX_FILE)
+    if not os.path.exists(path):
+        return {'version': 1, 'columns': [], 'segments': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class _Segment:
+    """Memory-mapped segment file"""
+
+    def __init__(self, path: str, capacity: int = 0, columns: int = 0, create: bool = False, writable: bool = False):
+        self.path = path
+        if create:
+            size = HEADER.size + (1 + columns) * capacity * 8
+            with open(path, 'wb') as f:
+                _set_sparse(f)
+                f.truncate(size)
+        self._file = open(path, 'r+b' if writable else 'rb')
+        access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+        self._map = mmap.mmap(self._file.fileno(), 0, access=access)
+        if create:
+            HEADER.pack_into(self._map, 0, MAGIC, 1, capacity, columns, 0)
+        magic, _, self.capacity, self.columns, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a sensor log segment")
+        self.words = memoryview(self._map).cast('d')
+
+    @property
+    def rows(self) -> int:
+        return HEADER.unpack_from(self._map, 0)[4]
+
+    def set_rows(self, rows: int):
+        HEADER.pack_into(self._map, 0, MAGIC, 1, self.capacity, self.columns, rows)
+
+    def add_columns(self, columns: int):
+        """Grow a writable segment to ``columns`` blocks; written rows read NaN in the new ones"""
+        rows = self.rows
+        self.words.release()
+        self._map.close()
+        try:
+            self._file.truncate(HEADER.size + (1 + columns) * self.capacity * 8)
+        finally:
+            # On Windows the file cannot grow while a reader has it mapped: keep the old mapping then
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE)
+            self.words = memoryview(self._map).cast('d')
+        if rows:
+            nan_block = memoryview(bytearray(struct.pack('<d', math.nan) * rows)).cast('d')
+            for column in range(self.columns, columns):
+                start = self._column_start(column)
+                self.words[start:start + rows] = nan_block
+        # The column count is published after the blocks are filled
+        self.columns = columns
+        self.set_rows(rows)
+
+    def _column_start(self, column: int) -> int:
+        return HEADER_WORDS + (1 + column) * self.capacity
+
+    def timestamps(self, rows: Optional[int] = None) -> memoryview:
+        rows = self.rows if rows is None else rows
+        return self.words[HEADER_WORDS:HEADER_WORDS + rows]
+
+    def column(self, column: int, rows: Optional[int] = None) -> memoryview:
+        rows = self.rows if rows is None else rows
+        start = self._column_start(column)
+        return self.words[start:start + rows]
+
+    def close(self):
+        try:
+            self.words.release()
+            self._map.close()
+        except BufferError:
+            pass  # a caller still holds a view; the mapping is freed with it
+        self._file.close()
+
+
+class SensorLogWriter:
+    """Append-only columnar log of sensor readings.
+
+    Rows are buffered and written ``batch_size`` at a time. A new segment is
+    started when the current one is full; a sensor that appears mid-segment gets
+    a column appended to the current one. With ``retention`` (seconds) set, whole
+    segments older than that are deleted when a new one starts; keep a
+    SensorRollups recorder alongside for the long-term trend.
+    """
+
+    def __init__(self, directory: str, segment_rows: int = DEFAULT_SEGMENT_ROWS, batch_size: int = 60,
+                 retention: Optional[float] = None):
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self.batch_size = batch_size
+        self.retention = retention
+        os.makedirs(directory, exist_ok=True)
+        self.index = _read_index(directory)
+        self._columns: Dict[str, int] = {c['id']: i for i, c in enumerate(self.index['columns'])}
+        self._pending: List[Tuple[float, Dict[int, float]]] = []
+        self._segment: Optional[_Segment] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _column_for(self, sensor: dict, category: str) -> int:
+        identifier = sensor['identifier']
+        column = self._columns.get(identifier)
+        if column is None:
+            column = self._columns[identifier] = len(self.index['columns'])
+            self.index['columns'].append({
+                'id': identifier,
+                'name': sensor.get('name', ''),
+                'hardware': sensor.get('hardware', ''),
+                'category': category,
+                'unit': sensor.get('unit', ''),
+            })
+        return column
+
+    def record(self, readings: Dict[str, List[dict]], timestamp: Optional[float] = None):
+        """Buffer one tick of categorised readings (get_sensor_readings format)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        row = {}
+        for category, sensors in readings.items():
+            for sensor in sensors:
+                row[self._column_for(sensor, category)] = sensor['value']
+        self._pending.append((timestamp, row))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def _open_segment(self, columns: int, timestamp: float):
+        """Finish the current segment and create a new one with room for ``columns``"""
+        self._close_segment()
+        if self.retention is not None:
+            self.prune(timestamp - self.retention)
+        number = self.index.get('next_segment', len(self.index['segments']))
+        self.index['next_segment'] = number + 1
+        name = f"segment-{number:06d}.dat"
+        self._segment = _Segment(os.path.join(self.directory, name), segment_rows_for(columns, self.segment_rows),
+                                 columns, create=True, writable=True)
+        self.index['segments'].append({'file': name, 'columns': columns, 'start': None, 'end': None, 'rows': 0})
+
+    def prune(self, before: float) -> int:
+        """Delete finished segments whose newest row is older than ``before``.
+
+        A segment that cannot be deleted yet (on Windows: mapped by a reader) is
+        kept in the index and tried again on the next prune.
+        """
+        current = self.index['segments'][-1] if self._segment is not None else None
+        kept = []
+        removed = 0
+        for meta in self.index['segments']:
+            if meta is not current and meta['end'] is not None and meta['end'] < before:
+                try:
+                    os.remove(os.path.join(self.directory, meta['file']))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"sensor_log: {meta['file']} not pruned yet: {e}", file=sys.stderr)
+                    kept.append(meta)
+                    continue
+                removed += 1
+            else:
+                kept.append(meta)
+        if removed:
+            self.index['segments'] = kept
+            _write_index(self.directory, self.index)
+        return removed
+
+    def _close_segment(self):
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def _resume_segment(self):
+        """Reopen the last segment after a restart if it still has room"""
+        if self._segment is not None or not self.index['segments']:
+            return
+        segment = _Segment(os.path.join(self.directory, self.index['segments'][-1]['file']), writable=True)
+        if segment.rows < segment.capacity:
+            self._segment = segment
+        else:
+            segment.close()
+
+    def flush(self):
+        """Write buffered rows to the current segment and update the index"""
+        if not self._pending:
+            return
+        columns = len(self.index['columns'])
+        self._resume_segment()
+        for timestamp, row in self._pending:
+            segment = self._segment
+            if segment is None or segment.rows >= segment.capacity:
+                self._open_segment(columns, timestamp)
+                segment = self._segment
+            elif segment.columns < columns:
+                try:
+                    segment.add_columns(columns)
+                    self.index['segments'][-1]['columns'] = columns
+                except OSError:
+                    # The segment cannot grow (mapped by a reader on Windows): start a new one
+                    self._open_segment(columns, timestamp)
+                    segment = self._segment
+            position = segment.rows
+            words = segment.words
+            words[HEADER_WORDS + position] = timestamp
+            # Every column is written: the zero pages under a fresh row would read as 0.0
+            base = HEADER_WORDS + segment.capacity + position
+            for column in range(segment.columns):
+                words[base + column * segment.capacity] = row.get(column, math.nan)
+            # Row count is published after the data so readers never see half a row
+            segment.set_rows(position + 1)
+            meta = self.index['segments'][-1]
+            meta['rows'] = position + 1
+            meta['start'] = timestamp if meta['start'] is None else meta['start']
+            meta['end'] = timestamp
+        self._pending.clear()
+        self._segment._map.flush()
+        _write_index(self.directory, self.index)
+
+    def close(self):
+        self.flush()
+        self._close_segment()
+
+
+class SensorLogReader:
+    """Zero-copy reader: each sensor column is a memoryview into a mapped segment"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index = _read_index(directory)
+        self._columns = {c['id']: i for i, c in enumerate(self.index['columns'])}
+        self._segments: Dict[str, _Segment] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def sensors(self) -> List[dict]:
+        """Column metadata from the header index"""
+        return list(self.index['columns'])
+
+    def _segment(self, name: str) -> _Segment:
+        segment = self._segments.get(name)
+        if segment is None:
+            segment = self._segments[name] = _Segment(os.path.join(self.directory, name))
+        return segment
+
+    def scan(self, identifier: str, start: Optional[float] = None,
+             end: Optional[float] = None) -> Iterator[Tuple[memoryview, memoryview]]:
+        """Yield (timestamps, values) views per segment for one sensor.
+
+        Only the timestamp block and the sensor's own column are touched; segments
+        outside [start, end] or without the column are skipped via the index.
+        """
+        column = self._columns.get(identifier)
+        if column is None:
+            return
+        for meta in self.index['segments']:
+            if column >= meta['columns'] or not meta['rows']:
+                continue
+            if start is not None and meta['end'] is not None and meta['end'] < start:
+                continue
+            if end is not None and meta['start'] is not None and meta['start'] > end:
+                continue
+            try:
+                segment = self._segment(meta['file'])
+            except FileNotFoundError:
+                continue  # pruned by the writer after this reader loaded the index
+            if column >= segment.columns:
+                continue  # mapped before the writer appended this column
+            rows = segment.rows
+            timestamps = segment.timestamps(rows)
+            values = segment.column(column, rows)
+            lo = 0 if start is None else bisect_left(timestamps, start)
+            hi = rows if end is None else bisect_right(timestamps, end)
+            yield timestamps[lo:hi], values[lo:hi]
+
+    def close(self):
+        for segment in self._segments.values():
+            segment.close()
+        self._segments.clear()
@@ -0,0 +1,153 @@
+import math
+import time
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class SensorRecord:
+    """Pre-resolved description of one sensor; only the value changes per tick"""
+
+    __slots__ = ('sensor', 'node', 'index', 'identifier', 'name', 'hardware',
+                 'hardware_type', 'type', 'category', 'unit')
+
+    def __init__(self, sensor, node, index, identifier, name, hardware, hardware_type, sensor_type, category, unit):
+        self.sensor = sensor
+        self.node = node
+        self.index = index
+        self.identifier = identifier
+        self.name = name
+        self.hardware = hardware
+        self.hardware_type = hardware_type
+        self.type = sensor_type
+        self.category = category
+        self.unit = unit
+
+    def as_dict(self, value: float) -> dict:
+        """Reading in the format returned by SystemMonitor.get_sensor_readings"""
+        return {
+            "name": self.name,
+            "value": value,
+            "hardware": self.hardware,
+            "type": self.type,
+            "unit": self.unit,
+            "identifier": self.identifier,
+        }
+
+
+class SensorSubscription:
+    """Interest in sensor categories and/or hardware types (None matches everything)"""
+
+    __slots__ = ('categories', 'hardware_types')
+
+    def __init__(self, categories: Optional[Iterable[str]] = None,
+                 hardware_types: Optional[Iterable[str]] = None):
+        self.categories = frozenset(categories) if categories is not None else None
+        self.hardware_types = frozenset(t.lower() for t in hardware_types) if hardware_types is not None else None
+
+    def matches(self, record: SensorRecord) -> bool:
+        if self.categories is not None and record.category not in self.categories:
+            return False
+        if self.hardware_types is not None and record.hardware_type.lower() not in self.hardware_types:
+            return False
+        return True
+
+
+class SensorRegistry:
+    """Sensor table compiled once from the hardware tree.
+
+    ``categories`` and ``units`` map sensor type objects to category names and
+    units. Sensors of a type without a category are skipped, as before.
+    ``fetch()`` only reads ``sensor.Value`` into the flat ``values`` array;
+    NaN marks a sensor without a value on this tick.
+    """
+
+    def __init__(self, computer, categories: Dict[Any, str], units: Dict[Any, str]):
+        self.computer = computer
+        self.categories = categories
+        self.units = units
+        self.records: List[SensorRecord] = []
+        self.values = array('d')
+        self.nodes: List[Any] = []
+        self._dirty = True
+        self._signature = None
+        self.builds = 0
+
+    def invalidate(self, *args):
+        """Mark the registry for rebuild (hooked to HardwareAdded/HardwareRemoved)"""
+        self._dirty = True
+
+    def _tree_signature(self):
+        """Cheap identity of the hardware tree: node identifiers and their sensor counts.
+
+        Identifiers are compared rather than ``id()`` because pythonnet may hand out
+        a new wrapper object for the same .NET node on every access.
+        """
+        return tuple((str(node.Identifier), len(node.Sensors)) for node in self._walk_nodes())
+
+    def _walk_nodes(self):
+        for hardware in self.computer.Hardware:
+            yield hardware
+
+    def build(self):
+        """Resolve identifiers, names, categories and units for every sensor"""
+        records = []
+        nodes = []
+        for node in self._walk_nodes():
+            nodes.append(node)
+            hardware_name = node.Name or "Unknown Hardware"
+            hardware_type = str(node.HardwareType)
+            for sensor in node.Sensors:
+                category = self.categories.get(sensor.SensorType)
+                if category is None:
+                    continue
+                records.append(SensorRecord(
+                    sensor, node, len(records),
+                    str(sensor.Identifier),
+                    sensor.Name or "Unnamed",
+                    hardware_name,
+                    hardware_type,
+                    str(sensor.SensorType),
+                    category,
+                    self.units.get(sensor.SensorType, ""),
+                ))
+        self.records = records
+        self.nodes = nodes
+        self.values = array('d', [math.nan]) * len(records)
+        self._signature = self._tree_signature()
+        self._dirty = False
+        self.builds += 1
+
+    def ensure_current(self):
+        """Rebuild only if the hardware tree changed since the last build"""
+        if self._dirty or self._tree_signature() != self._signature:
+            self.build()
+
+    def select(self, subscriptions: Iterable[SensorSubscription]) -> Tuple[List[SensorRecord], List[Any]]:
+        """Records matching any subscription and the hardware nodes that own them"""
+        subscriptions = list(subscriptions)
+        records = [r for r in self.records if any(sub.matches(r) for sub in subscriptions)]
+        nodes = []
+        seen = set()
+        for record in records:
+            if id(record.node) not in seen:  # records of one build share node wrappers
+                seen.add(id(record.node))
+                nodes.append(record.node)
+        return records, nodes
+
+    def fetch(self, records: Optional[List[SensorRecord]] = None) -> array:
+        """Read current sensor values into ``values`` (one Value access per sensor)"""
+        values = self.values
+        nan = math.nan
+        for record in self.records if records is None else records:
+            value = record.sensor.Value
+            values[record.index] = nan if value is None else float(value)
+        return values
+
+
+def benchmark(read_tick: Callable[[], Any], ticks: int = 200) -> float:
+    """Average wall time of one call to read_tick, in microseconds"""
+    read_tick()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        read_tick()
+    return (time.perf_counter() - start) / ticks * 1e6
@@ -0,0 +1,146 @@
+import math
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# (resolution, retention) in seconds, finest first
+DEFAULT_TIERS = (
+    (60, 24 * 3600),          # 1 min for a day
+    (15 * 60, 7 * 24 * 3600),  # 15 min for a week
+    (3600, 30 * 24 * 3600),    # 1 h for 30 days
+)
+
+# Per-bucket fields stored side by side in the tier array
+_START, _MIN, _MAX, _SUM, _COUNT, _LAST = range(6)
+_FIELDS = 6
+
+
+class RollupSeries:
+    """Buckets of one sensor at one resolution.
+
+    Bucket ``b`` (covering ``b * resolution`` .. ``(b + 1) * resolution``) lives in
+    slot ``b % capacity``, so a sample updates exactly one slot and buckets older
+    than the retention are overwritten in place - no batch recompute or purge.
+    """
+
+    __slots__ = ('resolution', 'capacity', '_data')
+
+    def __init__(self, resolution: float, retention: float):
+        self.resolution = resolution
+        self.capacity = max(1, int(math.ceil(retention / resolution)))
+        self._data = array('d', [math.nan]) * (_FIELDS * self.capacity)
+
+    def add(self, timestamp: float, value: float):
+        """Fold one sample into its bucket"""
+        bucket = math.floor(timestamp / self.resolution)
+        start = bucket * self.resolution
+        data = self._data
+        base = (bucket % self.capacity) * _FIELDS
+        current = data[base + _START]
+        if current == start:
+            if value < data[base + _MIN]:
+                data[base + _MIN] = value
+            if value > data[base + _MAX]:
+                data[base + _MAX] = value
+            data[base + _SUM] += value
+            data[base + _COUNT] += 1
+            data[base + _LAST] = value
+        elif not current > start:  # empty slot (NaN) or an expired bucket
+            data[base + _START] = start
+            data[base + _MIN] = data[base + _MAX] = data[base + _SUM] = data[base + _LAST] = value
+            data[base + _COUNT] = 1
+        # else: a late sample for a bucket that has already been overwritten
+
+    def buckets(self, start_time: float, end_time: float) -> List[Tuple[float, float, float, float, float]]:
+        """(start, min, max, mean, last) for buckets overlapping [start_time, end_time], oldest first"""
+        resolution = self.resolution
+        first = math.floor(start_time / resolution)
+        last = math.floor(end_time / resolution)
+        first = max(first, last - self.capacity + 1)
+        data = self._data
+        rows = []
+        for bucket in range(first, last + 1):
+            base = (bucket % self.capacity) * _FIELDS
+            start = bucket * resolution
+            if data[base + _START] != start:
+                continue  # no samples in this bucket (or it has expired)
+            rows.append((start, data[base + _MIN], data[base + _MAX],
+                         data[base + _SUM] / data[base + _COUNT], data[base + _LAST]))
+        return rows
+
+
+class SensorRollups:
+    """Incremental min/max/mean/last rollups of SystemMonitor readings.
+
+    ``tiers`` is a sequence of (resolution, retention) pairs in seconds. ``raw``
+    is an optional SensorHistory; queries finer than the finest tier are served
+    from it. Works as a SystemMonitor recorder (``record(readings, timestamp)``).
+    """
+
+    def __init__(self, tiers: Sequence[Tuple[float, float]] = DEFAULT_TIERS, raw=None):
+        self.tiers = sorted((float(r), float(keep)) for r, keep in tiers)
+        self.raw = raw
+        self._series: Dict[str, List[RollupSeries]] = {}
+        self._newest = -math.inf
+
+    def __contains__(self, identifier: str) -> bool:
+        return identifier in self._series
+
+    def identifiers(self) -> List[str]:
+        return list(self._series)
+
+    def record_value(self, identifier: str, timestamp: float, value: float):
+        """Update every tier with one sample (O(1) per tier)"""
+        series = self._series.get(identifier)
+        if series is None:
+            series = self._series[identifier] = [RollupSeries(r, keep) for r, keep in self.tiers]
+        if timestamp > self._newest:
+            self._newest = timestamp
+        for tier in series:
+            tier.add(timestamp, value)
+
+    def record(self, readings: Dict[str, Iterable[dict]], timestamp: Optional[float] = None):
+        """Fold a categorised reading set as returned by get_sensor_readings"""
+        timestamp = time.time() if timestamp is None else timestamp
+        for sensors in readings.values():
+            for sensor in sensors:
+                self.record_value(sensor["identifier"], timestamp, sensor["value"])
+
+    def choose_resolution(self, resolution: float, start_time: Optional[float] = None,
+                          end_time: Optional[float] = None) -> float:
+        """Finest tier at least as coarse as ``resolution`` that still holds ``start_time``; 0 means raw samples.
+
+        A tier holds the last ``retention`` seconds before ``end_time`` (or before the
+        newest sample, if later - older buckets have been overwritten). When no such
+        tier retains ``start_time`` the one with the longest retention is used.
+        """
+        if (resolution <= 0 and self.raw is not None) or not self.tiers:
+            return 0.0
+        candidates = [tier for tier in self.tiers if tier[0] >= resolution] or [self.tiers[-1]]
+        if start_time is not None:
+            newest = self._newest if end_time is None else max(end_time, self._newest)
+            for tier_resolution, retention in candidates:
+                capacity = max(1, int(math.ceil(retention / tier_resolution)))
+                if math.floor(start_time / tier_resolution) > math.floor(newest / tier_resolution) - capacity:
+                    return tier_resolution
+            return max(candidates, key=lambda tier: tier[1])[0]
+        return candidates[0][0]
+
+    def query(self, identifier: str, start_time: float, end_time: Optional[float] = None,
+              resolution: float = 0) -> Tuple[float, List[Tuple[float, float, float, float, float]]]:
+        """Return (resolution used, rows of (start, min, max, mean, last)).
+
+        Raw samples come back as rows with min == max == mean == last.
+        """
+        end_time = time.time() if end_time is None else end_time
+        chosen = self.choose_resolution(resolution, start_time, end_time)
+        if not chosen:
+            timestamps, values = self.raw.window(identifier, start_time, end_time)
+            return 0.0, [(t, v, v, v, v) for t, v in zip(timestamps, values)]
+        series = self._series.get(identifier)
+        if series is None:
+            return chosen, []
+        for tier in series:
+            if tier.resolution == chosen:
+                return chosen, tier.buckets(start_time, end_time)
+        return chosen, []
@@ -1,28 +1,131 @@
 import time
 import os
 import sys
-import clr
 import platform
+import argparse
+import contextlib
+from lazy_backend import BackendUnavailable
+from sensor_history import DEFAULT_CAPACITY, SensorHistory
+from sensor_registry import SensorRegistry, SensorSubscription, benchmark
+from sensor_delta import DeltaEmitter
+from sensor_rollup import DEFAULT_TIERS, SensorRollups
+from sensor_alerts import CLEARED, DEFAULT_RULES, AlertEngine, load_rules
+from structured_output import write_record
 
-# Add LibreHardwareMonitor DLLs to the path
+# LibreHardwareMonitor DLLs are looked up here
 libre_hardware_monitor_path = os.path.join(os.path.dirname(__file__), "LibreHardwareMonitorLib")
-if os.path.exists(libre_hardware_monitor_path):
-    sys.path.append(libre_hardware_monitor_path)
 
-try:
-    # Try to load LibreHardwareMonitor
-    clr.AddReference("LibreHardwareMonitorLib")
-    from LibreHardwareMonitor.Hardware import Computer, SensorType # type: ignore
-    print("✅ LibreHardwareMonitor loaded successfully")
-except Exception as e:
-    print(f"❌ LibreHardwareMonitor loading error: {e}")
-    print("Please download from: https://github.com/LibreHardwareMonitor/LibreHardwareMonitor")
-    print("And place LibreHardwareMonitorLib.dll in a folder named 'LibreHardwareMonitorLib'")
-    sys.exit(1)
+# Set by load_hardware_monitor(): pythonnet and the LHM assembly are loaded on first
+# use, so --help and importing this module work without them
+Computer = None
+SensorType = None
+
+# Sensor categories reported by get_sensor_readings (dict order is the report order),
+# keyed by SensorType member name
+SENSOR_CATEGORY_NAMES = {
+    "Temperature": "temperature",
+    "Load": "load",
+    "Clock": "clock",
+    "Voltage": "voltage",
+    "Power": "power",
+    "Fan": "fan",
+    "Throughput": "throughput",
+    "Data": "data",
+}
+
+SENSOR_UNIT_NAMES = {
+    "Temperature": "°C",
+    "Load": "%",
+    "Clock": "MHz",
+    "Voltage": "V",
+    "Power": "W",
+    "Fan": "RPM",
+    "Flow": "L/h",
+    "Throughput": "MB/s",
+    "Level": "%",
+    "Factor": "",
+    "Data": "",
+    "SmallData": "",
+    "Frequency": "Hz"
+}
+
+# The same tables keyed by SensorType, filled in by load_hardware_monitor()
+SENSOR_CATEGORIES = {}
+SENSOR_UNITS = {}
+
+def load_hardware_monitor():
+    """Load LibreHardwareMonitor through pythonnet once; raises BackendUnavailable"""
+    global Computer, SensorType
+    if Computer is not None:
+        return
+    if os.path.exists(libre_hardware_monitor_path) and libre_hardware_monitor_path not in sys.path:
+        sys.path.append(libre_hardware_monitor_path)
+    try:
+        import clr
+        clr.AddReference("LibreHardwareMonitorLib")
+        from LibreHardwareMonitor.Hardware import Computer as computer_class, SensorType as sensor_type # type: ignore
+    except Exception as e:
+        raise BackendUnavailable(f"LibreHardwareMonitor loading error: {e}") from e
+    SENSOR_CATEGORIES.update((getattr(sensor_type, name), category)
+                             for name, category in SENSOR_CATEGORY_NAMES.items())
+    SENSOR_UNITS.update((getattr(sensor_type, name), unit)
+                        for name, unit in SENSOR_UNIT_NAMES.items() if hasattr(sensor_type, name))
+    Computer, SensorType = computer_class, sensor_type
+    print("✅ LibreHardwareMonitor loaded successfully", file=sys.stderr)
+
+def print_backend_error(error):
+    """Explain how to install LibreHardwareMonitor (on stderr)"""
+    print(f"❌ {error}", file=sys.stderr)
+    print("Please download from: https://github.com/LibreHardwareMonitor/LibreHardwareMonitor", file=sys.stderr)
+    print("And place LibreHardwareMonitorLib.dll in a folder named 'LibreHardwareMonitorLib'", file=sys.stderr)
+
+# Base units for --json output: category -> (unit, factor applied to the LHM value)
+SENSOR_BASE_UNITS = {
+    "temperature": ("celsius", 1),
+    "load": ("percent", 1),
+    "clock": ("hertz", 1e6),           # LHM reports MHz
+    "voltage": ("volt", 1),
+    "power": ("watt", 1),
+    "fan": ("rpm", 1),
+    "throughput": ("bytes_per_second", 1),  # LHM throughput values are already B/s
+    "data": ("bytes", 1024**3),        # LHM reports GB
+}
+
+def structured_readings(data, timestamp, keyframe=True):
+    """One NDJSON tick: a flat sensor list with values in base units"""
+    sensors = []
+    for category, readings in data.items():
+        unit, factor = SENSOR_BASE_UNITS.get(category, ("", 1))
+        for sensor in readings:
+            sensors.append({
+                "identifier": sensor["identifier"],
+                "category": category,
+                "type": sensor["type"],
+                "hardware": sensor["hardware"],
+                "name": sensor["name"],
+                "value": sensor["value"] * factor,
+                "unit": unit,
+            })
+    return {"type": "tick", "tool": "sensors", "timestamp": timestamp, "keyframe": keyframe, "sensors": sensors}
+
+ALERT_ICONS = {"critical": "🔥", "warning": "⚠️ ", "info": "ℹ️ "}
+
+def print_alert_event(event):
+    """Alert sink for the console: one line per firing/clearing"""
+    icon = "✅" if event.state == CLEARED else ALERT_ICONS.get(event.severity, "🚨")
+    state = "снято" if event.state == CLEARED else "сработало"
+    print(f"   {icon} [{event.rule.name}] {state}: {event.name} | {event.hardware} | {event.value:.1f}{event.unit}")
 
 class SystemMonitor:
-    def __init__(self):
+    def __init__(self, history_capacity=DEFAULT_CAPACITY, rollup_tiers=DEFAULT_TIERS, alert_rules=DEFAULT_RULES):
+        load_hardware_monitor()
         self.computer = Computer()
+        # Bounded per-sensor history of every reading (see sensor_history)
+        self.history = SensorHistory(history_capacity)
+        # 1 min / 15 min / 1 h min-max-mean-last beyond the raw history horizon
+        self.rollups = SensorRollups(rollup_tiers, raw=self.history)
+        # Every tick is passed to each recorder's record(readings, timestamp)
+        self.recorders = [self.history, self.rollups]
         
         # Enable all hardware monitoring
         self.computer.IsCpuEnabled = True
@@ -39,10 +142,67 @@ class SystemMonitor:
             print("✅ Hardware monitoring initialized")
         except Exception as e:
             print(f"❌ Error initializing hardware monitoring: {e}")
+        
+        # Sensor metadata is resolved once; ticks only fetch values
+        self.registry = SensorRegistry(self.computer, SENSOR_CATEGORIES, SENSOR_UNITS)
+        try:
+            self.computer.HardwareAdded += self.registry.invalidate
+            self.computer.HardwareRemoved += self.registry.invalidate
+        except Exception:
+            pass  # the per-tick tree signature check still catches changes
+        
+        # Selective updates: with no subscriptions every node is updated as before
+        self._subscriptions = []
+        self._plan_key = None
+        self._active_records = None
+        self._active_nodes = None
+        
+        # Alert rules are bound to the records read on each tick (see sensor_alerts)
+        self.alerts = AlertEngine(alert_rules)
+        self._alerts_key = None
+    
+    def subscribe(self, categories=None, hardware_types=None):
+        """Subscribe to sensor categories ("temperature", "fan", ...) and/or hardware
+        types ("Cpu", "GpuNvidia", ...). Once any subscription exists, only hardware
+        owning subscribed sensors is updated and read on each tick."""
+        subscription = SensorSubscription(categories, hardware_types)
+        self._subscriptions.append(subscription)
+        self._plan_key = None
+        return subscription
+    
+    def add_recorder(self, recorder):
+        """Also record every tick into ``recorder`` (e.g. a sensor_log.SensorLogWriter)"""
+        self.recorders.append(recorder)
+        return recorder
+    
+    def query_history(self, identifier, start_time, end_time=None, resolution=0):
+        """(resolution used, [(start, min, max, mean, last), ...]) from the finest
+        rollup tier of at least ``resolution`` seconds that still retains
+        ``start_time`` (0 = raw samples)"""
+        return self.rollups.query(identifier, start_time, end_time, resolution)
+    
+    def unsubscribe(self, subscription):
+        """Remove a subscription returned by subscribe()"""
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+            self._plan_key = None
+    
+    def _refresh_update_plan(self):
+        """Recompute subscribed records/nodes after a registry rebuild or subscription change"""
+        plan_key = (self.registry.builds, len(self._subscriptions))
+        if plan_key == self._plan_key:
+            return
+        if self._subscriptions and self.registry.builds:
+            self._active_records, self._active_nodes = self.registry.select(self._subscriptions)
+        else:
+            self._active_records, self._active_nodes = None, None
+        self._plan_key = plan_key
     
     def update_all_hardware(self):
         """Update all hardware components without using visitor pattern"""
-        for hardware in self.computer.Hardware:
+        self._refresh_update_plan()
+        nodes = self.computer.Hardware if self._active_nodes is None else self._active_nodes
+        for hardware in nodes:
             hardware.Update()
             # Update sub-hardware if any
             for sub_hardware in hardware.SubHardware:
@@ -52,75 +212,72 @@ class SystemMonitor:
         """Get all sensor readings"""
         self.update_all_hardware()
         
-        sensor_data = {
-            "temperature": [],
-            "load": [],
-            "clock": [],
-            "voltage": [],
-            "power": [],
-            "fan": [],
-            "throughput": [],
-            "data": []
-        }
+        registry = self.registry
+        registry.ensure_current()
+        self._refresh_update_plan()
+        records = registry.records if self._active_records is None else self._active_records
+        values = registry.fetch(records)
+        timestamp = time.time()
+        
+        alerts_key = (registry.builds, self._plan_key)
+        if alerts_key != self._alerts_key:
+            self.alerts.compile(records)
+            self._alerts_key = alerts_key
+        self.alerts.evaluate(values, timestamp)
         
+        sensor_data = {category: [] for category in SENSOR_CATEGORIES.values()}
+        for record in records:
+            value = values[record.index]
+            if value == value:  # NaN means the sensor has no value this tick
+                sensor_data[record.category].append(record.as_dict(value))
+        
+        for recorder in self.recorders:
+            recorder.record(sensor_data, timestamp)
+        return sensor_data
+    
+    def _walk_sensor_readings(self):
+        """Per-tick tree walk used before the registry (kept for benchmark_registry)"""
+        sensor_data = {category: [] for category in SENSOR_CATEGORIES.values()}
         for hardware in self.computer.Hardware:
             for sensor in hardware.Sensors:
                 if sensor.Value is not None:
-                    # Get sensor unit
-                    unit = self.get_sensor_unit(sensor.SensorType)
-                    
-                    sensor_info = {
+                    category = SENSOR_CATEGORIES.get(sensor.SensorType)
+                    if category is None:
+                        continue
+                    sensor_data[category].append({
                         "name": sensor.Name or "Unnamed",
                         "value": float(sensor.Value),
                         "hardware": hardware.Name or "Unknown Hardware",
                         "type": str(sensor.SensorType),
-                        "unit": unit,
+                        "unit": self.get_sensor_unit(sensor.SensorType),
                         "identifier": str(sensor.Identifier)
-                    }
-                    
-                    # Categorize sensors
-                    if sensor.SensorType == SensorType.Temperature:
-                        sensor_data["temperature"].append(sensor_info)
-                    elif sensor.SensorType == SensorType.Load:
-                        sensor_data["load"].append(sensor_info)
-                    elif sensor.SensorType == SensorType.Clock:
-                        sensor_data["clock"].append(sensor_info)
-                    elif sensor.SensorType == SensorType.Voltage:
-                        sensor_data["voltage"].append(sensor_info)
-                    elif sensor.SensorType == SensorType.Power:
-                        sensor_data["power"].append(sensor_info)
-                    elif sensor.SensorType == SensorType.Fan:
-                        sensor_data["fan"].append(sensor_info)
-                    elif sensor.SensorType == SensorType.Throughput:
-                        sensor_data["throughput"].append(sensor_info)
-                    elif sensor.SensorType == SensorType.Data:
-                        sensor_data["data"].append(sensor_info)
-        
+                    })
         return sensor_data
     
+    def benchmark_registry(self, ticks=200):
+        """Compare per-tick read cost (without hardware Update) before and after the registry"""
+        self.update_all_hardware()
+        self.registry.ensure_current()
+        
+        def registry_tick():
+            self.registry.ensure_current()
+            self.registry.fetch()
+        
+        return {
+            "sensors": len(self.registry.records),
+            "tree_walk_us": benchmark(self._walk_sensor_readings, ticks),
+            "registry_fetch_us": benchmark(registry_tick, ticks),
+        }
+    
     def get_sensor_unit(self, sensor_type):
         """Get the appropriate unit for sensor type"""
-        units = {
-            SensorType.Temperature: "°C",
-            SensorType.Load: "%",
-            SensorType.Clock: "MHz",
-            SensorType.Voltage: "V",
-            SensorType.Power: "W",
-            SensorType.Fan: "RPM",
-            SensorType.Flow: "L/h",
-            SensorType.Throughput: "MB/s",
-            SensorType.Level: "%",
-            SensorType.Factor: "",
-            SensorType.Data: "",
-            SensorType.SmallData: "",
-            SensorType.Frequency: "Hz"
-        }
-        return units.get(sensor_type, "")
+        return SENSOR_UNITS.get(sensor_type, "")
     
-    def print_comprehensive_report(self):
+    def print_comprehensive_report(self, data=None):
         """Print comprehensive hardware report"""
         try:
-            data = self.get_sensor_readings()
+            if data is None:
+                data = self.get_sensor_readings()
             
             print("\n" + "="*80)
             print(f"🏢 ПОЛНЫЙ ОТЧЕТ О СОСТОЯНИИ СИСТЕМЫ - {time.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -130,8 +287,9 @@ class SystemMonitor:
             if data["temperature"]:
                 print(f"\n🌡️  ТЕМПЕРАТУРЫ ({len(data['temperature'])} датчиков):")
                 print("-" * 60)
+                severities = self.alerts.severities()
                 for sensor in sorted(data["temperature"], key=lambda x: x["name"]):
-                    status = "🔥" if sensor["value"] > 80 else "⚠️ " if sensor["value"] > 70 else "✅"
+                    status = ALERT_ICONS.get(severities.get(sensor["identifier"]), "✅")
                     print(f"   {status} {sensor['name']:25} | {sensor['hardware']:20} | {sensor['value']:6.1f}{sensor['unit']}")
             
             # Load section
@@ -176,18 +334,35 @@ class SystemMonitor:
             total_sensors = sum(len(sensors) for sensors in data.values())
             print(f"\n📊 ИТОГО: {total_sensors} датчиков обнаружено")
             
-            # Critical temperatures warning
-            high_temps = [s for s in data["temperature"] if s["value"] > 80]
-            if high_temps:
-                print(f"\n🚨 ВНИМАНИЕ: {len(high_temps)} датчиков с температурой выше 80°C!")
-                for sensor in high_temps:
-                    print(f"   🔥 {sensor['name']}: {sensor['value']:.1f}°C")
+            # Active critical alerts (tracked incrementally by the rule engine)
+            critical = self.alerts.active("critical")
+            if critical:
+                print(f"\n🚨 ВНИМАНИЕ: {len(critical)} критических предупреждений!")
+                for event in critical:
+                    print(f"   🔥 {event.name} ({event.rule.name}): {event.value:.1f}{event.unit}")
             
             print("="*80)
             
         except Exception as e:
             print(f"❌ Ошибка при получении данных: {e}")
     
+    def print_delta_report(self, emitter):
+        """Print only sensors that moved beyond their deadband; full report on keyframes"""
+        try:
+            data = self.get_sensor_readings()
+            keyframe, changed = emitter.process(data)
+            if keyframe:
+                self.print_comprehensive_report(data)
+                return
+            
+            total_changed = sum(len(sensors) for sensors in changed.values())
+            print(f"\n🔄 ИЗМЕНЕНИЯ - {time.strftime('%Y-%m-%d %H:%M:%S')} ({total_changed} датчиков)")
+            for category, sensors in changed.items():
+                for sensor in sorted(sensors, key=lambda x: x["name"]):
+                    print(f"   {category:12} | {sensor['name']:25} | {sensor['hardware']:20} | {sensor['value']:8.2f}{sensor['unit']}")
+        except Exception as e:
+            print(f"❌ Ошибка при получении данных: {e}")
+    
     def get_hardware_summary(self):
         """Get basic hardware information"""
         try:
@@ -230,7 +405,91 @@ def print_system_info():
     print(f"   Архитектура: {platform.architecture()[0]}")
     print(f"   Версия Python: {platform.python_version()}")
 
-def main():
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Комплексный мониторинг датчиков системы")
+    parser.add_argument('--benchmark-registry', action='store_true',
+                        help="измерить стоимость одного опроса датчиков до и после реестра и выйти")
+    parser.add_argument('--delta', action='store_true',
+                        help="выводить только изменившиеся датчики (с порогами нечувствительности)")
+    parser.add_argument('--keyframe-interval', type=float, default=60.0,
+                        help="интервал полного отчета в режиме --delta, секунд (по умолчанию 60)")
+    parser.add_argument('--exporter', action='store_true',
+                        help="запустить HTTP-экспортер метрик OpenMetrics/Prometheus вместо вывода в консоль")
+    parser.add_argument('--port', type=int, default=9182,
+                        help="порт экспортера (по умолчанию 9182)")
+    parser.add_argument('--interval', type=float, default=5.0,
+                        help="интервал опроса датчиков, секунд (по умолчанию 5)")
+    parser.add_argument('--json', action='store_true',
+                        help="писать каждый опрос строкой NDJSON в stdout (сообщения - в stderr)")
+    parser.add_argument('--alert-rules', metavar='FILE',
+                        help="JSON-файл с правилами оповещений вместо встроенных порогов 70/80°C")
+    parser.add_argument('--log', metavar='DIR',
+                        help="записывать все показания в столбцовый журнал в каталоге DIR (см. sensor_log)")
+    parser.add_argument('--log-retention', type=float, metavar='HOURS',
+                        help="удалять из журнала --log сегменты старше HOURS часов")
+    return parser.parse_args(argv)
+
+def run_registry_benchmark():
+    """Print the sensor registry micro-benchmark"""
+    monitor = SystemMonitor()
+    try:
+        result = monitor.benchmark_registry()
+        print(f"\n⏱️  Датчиков: {result['sensors']}")
+        print(f"   Обход дерева на тик:   {result['tree_walk_us']:10.1f} мкс")
+        print(f"   Реестр (fetch) на тик: {result['registry_fetch_us']:10.1f} мкс")
+    finally:
+        monitor.close()
+
+def open_sensor_log(monitor, args):
+    """Attach the --log recorder if requested"""
+    if not args.log:
+        return None
+    from sensor_log import SensorLogWriter
+    retention = args.log_retention * 3600 if args.log_retention else None
+    return monitor.add_recorder(SensorLogWriter(args.log, retention=retention))
+
+def run_json_stream(args):
+    """--json: one NDJSON record per tick (and per alert transition) on stdout"""
+    monitor = None
+    sensor_log = None
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            monitor = SystemMonitor(alert_rules=load_rules(args.alert_rules) if args.alert_rules else DEFAULT_RULES)
+        monitor.alerts.add_sink(lambda event: write_record(dict(event.as_dict(), type="alert", tool="sensors")))
+        sensor_log = open_sensor_log(monitor, args)
+        emitter = DeltaEmitter(keyframe_interval=args.keyframe_interval) if args.delta else None
+        while True:
+            data = monitor.get_sensor_readings()
+            timestamp = time.time()
+            keyframe = True
+            if emitter is not None:
+                keyframe, data = emitter.process(data)
+            write_record(structured_readings(data, timestamp, keyframe))
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        with contextlib.redirect_stdout(sys.stderr):
+            if sensor_log is not None:
+                sensor_log.close()
+            if monitor:
+                monitor.close()
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        load_hardware_monitor()
+    except BackendUnavailable as e:
+        print_backend_error(e)
+        sys.exit(1)
+    if args.benchmark_registry:
+        run_registry_benchmark()
+        return
+    if args.json:
+        run_json_stream(args)
+        return
+    
     print("🚀 Запуск комплексного мониторинга системы...")
     print_system_info()
     
@@ -247,8 +506,14 @@ def main():
             return
     
     monitor = None
+    sensor_log = None
     try:
-        monitor = SystemMonitor()
+        monitor = SystemMonitor(alert_rules=load_rules(args.alert_rules) if args.alert_rules else DEFAULT_RULES)
+        if args.delta:
+            monitor.alerts.add_sink(print_alert_event)
+        sensor_log = open_sensor_log(monitor, args)
+        if sensor_log is not None:
+            print(f"💾 Показания записываются в журнал: {args.log}")
         
         # Print hardware summary
         hardware_info = monitor.get_hardware_summary()
@@ -257,15 +522,30 @@ def main():
             for hw_type, count in hardware_info.items():
                 print(f"   {hw_type}: {count} устройств")
         
+        if args.exporter:
+            from sensor_exporter import SensorExporter
+            exporter = SensorExporter(monitor, interval=args.interval, port=args.port).start()
+            print(f"\n📡 Экспортер метрик запущен: http://{exporter.host}:{exporter.port}/metrics")
+            print(f"📊 Датчики опрашиваются каждые {args.interval:g} с. Для остановки нажмите Ctrl+C")
+            try:
+                while True:
+                    time.sleep(1)
+            finally:
+                exporter.stop()
+        
         print("\n🔄 Мониторинг запущен. Для остановки нажмите Ctrl+C")
-        print("📊 Данные будут обновляться каждые 5 секунд...")
+        print(f"📊 Данные будут обновляться каждые {args.interval:g} секунд...")
         
+        emitter = DeltaEmitter(keyframe_interval=args.keyframe_interval) if args.delta else None
         update_count = 0
         while True:
-            monitor.print_comprehensive_report()
+            if emitter is not None:
+                monitor.print_delta_report(emitter)
+            else:
+                monitor.print_comprehensive_report()
             update_count += 1
-            print(f"\n🔄 Обновление #{update_count}. Следующее обновление через 5 секунд...")
-            time.sleep(5)
+            print(f"\n🔄 Обновление #{update_count}. Следующее обновление через {args.interval:g} секунд...")
+            time.sleep(args.interval)
             
     except KeyboardInterrupt:
         print("\n\n🛑 Мониторинг остановлен пользователем")
@@ -274,6 +554,8 @@ def main():
         import traceback
         traceback.print_exc()
     finally:
+        if sensor_log is not None:
+            sensor_log.close()
         if monitor:
             monitor.close()
 
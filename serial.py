@@ -1,45 +1,68 @@
 import platform
-import psutil
-import subprocess
-import socket
 import datetime
 import os
 import sys
 import re
 import json
-import winreg
-import ctypes
-import tempfile
+import argparse
+import contextlib
+import time
 from typing import Dict, List, Optional
+from powershell_worker import PowerShellWorker
+from inventory_cache import STATIC, cached_section, configure_inventory_cache
+from async_probe import active_probe_runner, async_collector
+from probe_memo import inventory_run, memoized, normalize_command, shell_output
+from probe_trace import add_trace_arguments, traced_probe, traced_section, tracing_from_args
+from wmi_planner import get_wmi_planner
+from inventory_fingerprint import add_baseline_arguments, baseline_from_args, fingerprint_devices, fingerprint_summary
+from structured_output import stable_key, structured_section, write_record
 
 def run_command(cmd: str) -> str:
-    """Выполняет команду и возвращает результат"""
+    """Выполняет команду и возвращает результат (в пределах сбора - не более одного раза)"""
     try:
-        result = subprocess.check_output(cmd, shell=True, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL, text=True, encoding='cp866')
-        return result.strip()
-    except:
+        return shell_output(cmd)
+    except Exception:
         return ""
 
-def run_command_powershell(cmd: str) -> str:
-    """Выполняет PowerShell команду"""
+# Один процесс PowerShell на запуск: интерпретатор стартует только при первом запросе
+_powershell_worker: Optional[PowerShellWorker] = None
+
+def get_powershell_worker() -> PowerShellWorker:
+    """Возвращает общий рабочий процесс PowerShell"""
+    global _powershell_worker
+    if _powershell_worker is None:
+        _powershell_worker = PowerShellWorker()
+    return _powershell_worker
+
+def close_powershell_worker():
+    """Завершает общий рабочий процесс PowerShell"""
+    global _powershell_worker
+    if _powershell_worker is not None:
+        _powershell_worker.close()
+        _powershell_worker = None
+
+@traced_probe('powershell')
+def _run_powershell(cmd: str, timeout: Optional[float]) -> str:
+    # Запись и воспроизведение фикстур (probe_replay) подменяют рабочий процесс
+    powershell = getattr(active_probe_runner(), 'powershell', None)
+    if powershell is not None:
+        return powershell(cmd, timeout=timeout)
+    return get_powershell_worker().run(cmd, timeout=timeout)
+
+def run_command_powershell(cmd: str, timeout: Optional[float] = None) -> str:
+    """Выполняет PowerShell команду в общем рабочем процессе (в пределах сбора - не более одного раза)"""
     try:
-        ps_command = f'powershell -Command "{cmd}"'
-        result = subprocess.check_output(ps_command, shell=True, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL, text=True, encoding='utf-8')
-        return result.strip()
-    except:
+        return memoized(('powershell', normalize_command(cmd)), lambda: _run_powershell(cmd, timeout))
+    except Exception:
         return ""
 
+@traced_section
 def get_windows_serial_number() -> str:
     """Получает серийный номер Windows (системы)"""
     serial = ""
     try:
-        # Способ 1: через wmic
-        output = run_command('wmic bios get serialnumber /value')
-        if output and 'SerialNumber' in output:
-            for line in output.split('\n'):
-                if 'SerialNumber' in line:
-                    serial = line.split('=')[-1].strip()
-                    break
+        # Способ 1: через wmic (общий с hardware.py запрос к классу bios)
+        serial = get_wmi_planner().get('bios', 'SerialNumber', '')
         
         # Способ 2: через PowerShell (более надежный)
         if not serial or serial == '0' or 'OEM' in serial.upper():
@@ -57,6 +80,7 @@ def get_windows_serial_number() -> str:
         # Способ 3: через реестр (для OEM систем)
         if not serial or serial == '0' or len(serial) < 3:
             try:
+                import winreg
                 key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\OEMInformation")
                 serial = winreg.QueryValueEx(key, "SerialNumber")[0]
                 winreg.CloseKey(key)
@@ -65,15 +89,20 @@ def get_windows_serial_number() -> str:
         
         # Способ 4: через systeminfo
         if not serial or serial == '0':
-            output = run_command('systeminfo | findstr /C:"System Serial Number"')
-            if output:
-                serial = output.split(':')[-1].strip()
+            # Строка фильтруется здесь, а не через findstr: команде не нужна оболочка
+            output = run_command('systeminfo')
+            for line in output.splitlines():
+                if 'System Serial Number' in line:
+                    serial = line.split(':')[-1].strip()
+                    break
     except Exception as e:
         print(f"Ошибка получения серийного номера Windows: {e}")
     
     return serial if serial and serial != '0' and 'OEM' not in serial.upper() else "Не доступен"
 
 
+@cached_section('serial.hardware_serial_numbers', STATIC)
+@traced_section
 def get_hardware_serial_numbers() -> Dict[str, Dict[str, str]]:
     """Получает серийные номера всех аппаратных компонентов"""
     print("🔍 Поиск серийных номеров устройств...")
@@ -93,15 +122,11 @@ def get_hardware_serial_numbers() -> Dict[str, Dict[str, str]]:
         
         # 2. Процессор
         try:
-            cpu_info = run_command('wmic cpu get processorid,serialnumber /value')
-            cpu_serial = ""
-            for line in cpu_info.split('\n'):
-                if 'SerialNumber' in line and '=' in line:
-                    cpu_serial = line.split('=')[-1].strip()
-                    if cpu_serial and cpu_serial != '0' and cpu_serial != 'N/A':
-                        break
-                elif 'ProcessorId' in line and '=' in line and not cpu_serial:
-                    cpu_serial = line.split('=')[-1].strip()
+            # Общий с hardware.py запрос к классу cpu; ProcessorId - если серийного номера нет
+            planner = get_wmi_planner()
+            cpu_serial = planner.get('cpu', 'SerialNumber', '')
+            if not cpu_serial or cpu_serial == '0' or cpu_serial == 'N/A':
+                cpu_serial = planner.get('cpu', 'ProcessorId', '')
             
             if cpu_serial and cpu_serial != '0' and cpu_serial != 'N/A':
                 serials['Процессор'] = {
@@ -113,14 +138,9 @@ def get_hardware_serial_numbers() -> Dict[str, Dict[str, str]]:
         
         # 3. Материнская плата
         try:
-            mb_info = run_command('wmic baseboard get serialnumber,product /value')
-            mb_serial = ""
-            mb_model = ""
-            for line in mb_info.split('\n'):
-                if 'SerialNumber' in line and '=' in line:
-                    mb_serial = line.split('=')[-1].strip()
-                elif 'Product' in line and '=' in line:
-                    mb_model = line.split('=')[-1].strip()
+            planner = get_wmi_planner()
+            mb_serial = planner.get('baseboard', 'SerialNumber', '')
+            mb_model = planner.get('baseboard', 'Product', '')
             
             if mb_serial and mb_serial != '0' and mb_serial != 'N/A' and 'OEM' not in mb_serial.upper():
                 serials['Материнская плата'] = {
@@ -242,6 +262,9 @@ def get_hardware_serial_numbers() -> Dict[str, Dict[str, str]]:
                     if not isinstance(gpus, list):
                         gpus = [gpus]
                     
+                    # Запасной ID из wmic один для всех видеокарт: вычисляется один раз, а не в цикле
+                    fallback_id = None
+                    
                     for i, gpu in enumerate(gpus):
                         pnp_id = gpu.get('PNPDeviceID', '')
                         serial_num = ""
@@ -259,13 +282,11 @@ def get_hardware_serial_numbers() -> Dict[str, Dict[str, str]]:
                         
                         # Альтернативный метод через SMBIOS
                         if not serial_num:
-                            smbios_output = run_command('wmic path win32_videocontroller get pnpdeviceid /value')
-                            for line in smbios_output.split('\n'):
-                                if 'PNPDeviceID' in line and '=' in line:
-                                    pnp_full = line.split('=')[-1].strip()
-                                    if 'VEN_' in pnp_full and 'DEV_' in pnp_full:
-                                        serial_num = pnp_full
-                                        break
+                            if fallback_id is None:
+                                fallback_id = next(
+                                    (r['pnpdeviceid'] for r in get_wmi_planner().records('path win32_videocontroller')
+                                     if 'VEN_' in r.get('pnpdeviceid', '') and 'DEV_' in r.get('pnpdeviceid', '')), '')
+                            serial_num = fallback_id
                         
                         name = gpu.get('Name', f'Видеокарта {i+1}').strip()
                         if serial_num:
@@ -358,24 +379,16 @@ def get_hardware_serial_numbers() -> Dict[str, Dict[str, str]]:
         
         # 10. Через SMBIOS (дополнительный метод)
         try:
-            smbios_output = run_command_powershell('Get-WmiObject -Class Win32_SystemEnclosure | Select-Object SerialNumber,SMBIOSAssetTag | ConvertTo-Json')
-            if smbios_output:
-                try:
-                    smbios_data = json.loads(smbios_output) if smbios_output.strip() else {}
-                    if isinstance(smbios_data, list) and len(smbios_data) > 0:
-                        smbios_data = smbios_data[0]
-                    
-                    smbios_serial = smbios_data.get('SerialNumber', '').strip()
-                    asset_tag = smbios_data.get('SMBIOSAssetTag', '').strip()
-                    
-                    if smbios_serial and smbios_serial != '0' and smbios_serial != system_serial:
-                        serials['Система (SMBIOS)'] = {
-                            'Серийный номер': smbios_serial,
-                            'Asset Tag': asset_tag if asset_tag else 'Не указан',
-                            'Метод получения': 'SMBIOS SystemEnclosure'
-                        }
-                except:
-                    pass
+            enclosure = get_wmi_planner().view('systemenclosure')
+            smbios_serial = enclosure.get('serialnumber', '').strip()
+            asset_tag = enclosure.get('smbiosassettag', '').strip()
+            
+            if smbios_serial and smbios_serial != '0' and smbios_serial != system_serial:
+                serials['Система (SMBIOS)'] = {
+                    'Серийный номер': smbios_serial,
+                    'Asset Tag': asset_tag if asset_tag else 'Не указан',
+                    'Метод получения': 'SMBIOS SystemEnclosure'
+                }
         except Exception as e:
             print(f"Ошибка получения SMBIOS информации: {e}")
     
@@ -384,6 +397,9 @@ def get_hardware_serial_numbers() -> Dict[str, Dict[str, str]]:
     
     return serials
 
+# Асинхронная версия для встраивания в asyncio-сервисы: await get_hardware_serial_numbers_async(engine, timeout)
+get_hardware_serial_numbers_async = async_collector(get_hardware_serial_numbers)
+
 def print_serial_numbers(serials: Dict[str, Dict[str, str]]):
     """Выводит серийные номера в удобном формате"""
     print(f"\n{'='*80}")
@@ -435,6 +451,22 @@ def print_serial_numbers(serials: Dict[str, Dict[str, str]]):
         print(f"   ⚠️  Ошибок: {error_count}")
     print(f"{'='*80}")
 
+def structured_serials(serials: Dict[str, Dict[str, str]]) -> dict:
+    """Машиночитаемый снимок: серийные номера остаются строками как есть"""
+    devices = []
+    errors = {}
+    for device, info in serials.items():
+        if device == 'Ошибка':
+            errors = structured_section(info, convert=False) if isinstance(info, dict) else {'error': str(info)}
+            continue
+        devices.append({
+            "key": stable_key(device),
+            "device": device,
+            "fields": structured_section(info, convert=False),
+        })
+    return {"tool": "serial", "timestamp": time.time(), "devices": devices, "errors": errors,
+            "fingerprints": fingerprint_summary(fingerprint_devices(serials))}
+
 def save_serial_numbers_to_file(serials: Dict[str, Dict[str, str]], filename: str = "serial_numbers.txt"):
     """Сохраняет серийные номера в файл"""
     try:
@@ -474,27 +506,56 @@ def save_serial_numbers_to_file(serials: Dict[str, Dict[str, str]], filename: st
         print(f"❌ Ошибка сохранения в файл: {e}")
         return False
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Разбирает аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Сбор серийных номеров устройств")
+    parser.add_argument('--refresh', action='store_true',
+                        help="не использовать кэш инвентаризации и собрать все заново")
+    parser.add_argument('--json', action='store_true',
+                        help="вывести один JSON-документ в stdout без сохранения в файл")
+    add_trace_arguments(parser)
+    add_baseline_arguments(parser)
+    return parser.parse_args(argv)
 
+def main(argv: Optional[List[str]] = None, args: Optional[argparse.Namespace] = None):
+    if args is None:
+        args = parse_args(argv)
+    configure_inventory_cache(refresh=args.refresh)
+    # --json и --diff: сообщения сборщиков уходят в stderr, в stdout - только результат
+    quiet = args.json or args.diff or args.save_baseline
     
-    # Сбор серийных номеров
-    print("\n" + "="*80)
-    print("🔍 НАЧИНАЮ ПОИСК СЕРИЙНЫХ НОМЕРОВ УСТРОЙСТВ...")
-    print("="*80)
-    
-    # Проверяем права администратора (рекомендуется для получения полной информации)
-    if platform.system() == "Windows":
-        try:
-            is_admin = ctypes.windll.shell32.IsUserAnAdmin() != 0
-            if not is_admin:
-                print("⚠️  ВНИМАНИЕ: Скрипт запущен без прав администратора.")
-                print("   Некоторые серийные номера могут быть недоступны.")
-                print("   Для получения полной информации запустите от имени администратора.\n")
-        except:
-            pass
+    if not quiet:
+        print("\n" + "="*80)
+        print("🔍 НАЧИНАЮ ПОИСК СЕРИЙНЫХ НОМЕРОВ УСТРОЙСТВ...")
+        print("="*80)
+        
+        # Проверяем права администратора (рекомендуется для получения полной информации)
+        if platform.system() == "Windows":
+            try:
+                import ctypes
+                is_admin = ctypes.windll.shell32.IsUserAnAdmin() != 0
+                if not is_admin:
+                    print("⚠️  ВНИМАНИЕ: Скрипт запущен без прав администратора.")
+                    print("   Некоторые серийные номера могут быть недоступны.")
+                    print("   Для получения полной информации запустите от имени администратора.\n")
+            except:
+                pass
     
     # Получаем серийные номера
-    serial_numbers = get_hardware_serial_numbers()
+    try:
+        with contextlib.redirect_stdout(sys.stderr) if quiet else contextlib.nullcontext(), \
+                tracing_from_args(args, 'serial'), inventory_run():
+            serial_numbers = get_hardware_serial_numbers()
+    finally:
+        close_powershell_worker()
+    
+    if args.diff or args.save_baseline:
+        # Сравнение с базовым снимком: выводятся только изменения
+        return baseline_from_args(args, 'serial', fingerprint_devices(serial_numbers))
+    
+    if args.json:
+        write_record(structured_serials(serial_numbers))
+        return
     
     # Выводим серийные номера
     print_serial_numbers(serial_numbers)
@@ -511,5 +572,8 @@ def main():
     print(f"🔑 Найдено устройств с серийными номерами: {len([k for k in serial_numbers.keys() if k != 'Ошибка'])}")
 
 if __name__ == "__main__":
-    main()
-    input("\nНажмите Enter для выхода...")
\ No newline at end of file
+    args = parse_args()
+    status = main(args=args)
+    if not (args.json or args.diff or args.save_baseline):
+        input("\nНажмите Enter для выхода...")
+    sys.exit(status)
\ No newline at end of file
@@ -0,0 +1,104 @@
+import argparse
+import os
+import selectors
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional, Sequence, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# (name, argv after the interpreter, budget for time-to-first-output in ms).
+# Budgets are about twice the median on a development machine with a warm
+# inventory cache (the warm-up run fills it), so --check flags real regressions.
+CASES: Tuple[Tuple[str, Tuple[str, ...], float], ...] = (
+    ("python baseline", ("-c", "print()"), 50.0),
+    ("hardware --help", ("hardware.py", "--help"), 150.0),
+    ("serial --help", ("serial.py", "--help"), 150.0),
+    ("sensors --help", ("sensors.py", "--help"), 120.0),
+    ("fleet --help", ("fleet.py", "--help"), 120.0),
+    ("msinfo_request --help", ("msinfo_request.py", "--help"), 120.0),
+    ("nfo_parser --help", ("nfo_parser.py", "--help"), 120.0),
+    ("taskManager", ("taskManager.py",), 150.0),
+    ("hardware --json", ("hardware.py", "--json"), 400.0),
+    ("serial --json", ("serial.py", "--json"), 250.0),
+    ("sensors --json", ("sensors.py", "--json"), 150.0),
+)
+
+
+def measure(argv: Sequence[str], timeout: float = 60.0) -> Tuple[float, float]:
+    """Run one process; return (seconds to first byte on stdout, seconds to exit).
+
+    Only stdout counts: progress messages of --json runs go to stderr.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, *argv], cwd=HERE, stdin=subprocess.DEVNULL,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    first = None
+    with selectors.DefaultSelector() as selector:
+        selector.register(process.stdout, selectors.EVENT_READ)
+        selector.register(process.stderr, selectors.EVENT_READ)
+        deadline = start + timeout
+        while selector.get_map():
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                process.kill()
+                break
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fileobj.fileno(), 65536)
+                if not chunk:
+                    selector.unregister(key.fileobj)
+                elif first is None and key.fileobj is process.stdout:
+                    first = time.perf_counter() - start
+    process.wait()
+    process.stdout.close()
+    process.stderr.close()
+    total = time.perf_counter() - start
+    return (total if first is None else first), total
+
+
+def run(cases, repeat: int) -> List[dict]:
+    results = []
+    for name, argv, budget in cases:
+        measure(argv)  # warm-up: page cache, __pycache__, inventory cache
+        samples = [measure(argv) for _ in range(repeat)]
+        first = [s[0] * 1000 for s in samples]
+        total = [s[1] * 1000 for s in samples]
+        results.append({
+            "name": name,
+            "first_min_ms": min(first),
+            "first_median_ms": statistics.median(first),
+            "exit_median_ms": statistics.median(total),
+            "budget_ms": budget,
+        })
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time-to-first-output of every entry point")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per entry point (default 5)")
+    parser.add_argument('--only', metavar='TEXT', help="run only cases whose name contains TEXT")
+    parser.add_argument('--check', action='store_true',
+                        help="exit with status 1 if a median exceeds its budget")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    cases = [case for case in CASES if not args.only or args.only in case[0]]
+    results = run(cases, max(1, args.repeat))
+    print(f"{'entry point':<22} {'first min':>10} {'first med':>10} {'exit med':>10} {'budget':>8}")
+    over = 0
+    for r in results:
+        mark = ''
+        if r["first_median_ms"] > r["budget_ms"]:
+            mark = '  OVER'
+            over += 1
+        print(f"{r['name']:<22} {r['first_min_ms']:>8.1f}ms {r['first_median_ms']:>8.1f}ms "
+              f"{r['exit_median_ms']:>8.1f}ms {r['budget_ms']:>6.0f}ms{mark}")
+    return 1 if args.check and over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import json
+import re
+import sys
+from typing import Any, Dict, Optional
+
+# Machine-readable output (--json) shared by hardware.py, serial.py and sensors.py.
+# Keys are derived from the Russian report labels with a fixed glossary, so they
+# do not change between runs; quantities are converted to base units (bytes, Hz,
+# percent), "Да"/"Нет" become booleans and "Не доступно" and friends become null.
+
+
+class Quantity(str):
+    """Formatted report value that also carries the exact number in base units.
+
+    It is a str, so console output is unchanged; JSON output uses ``value``.
+    """
+
+    __slots__ = ('value', 'unit')
+
+    def __new__(cls, text: str, value, unit: str):
+        obj = super().__new__(cls, text)
+        obj.value = value
+        obj.unit = unit
+        return obj
+
+
+class Row(str):
+    """Formatted list item that also carries its fields for JSON output.
+
+    A section value may be a list of rows (top processes): the console shows
+    the text, JSON output an object per row.
+    """
+
+    __slots__ = ('fields',)
+
+    def __new__(cls, text: str, fields: Dict[str, Any]):
+        obj = super().__new__(cls, text)
+        obj.fields = fields
+        return obj
+
+
+def gigabytes(nbytes: float, digits: int = 2) -> Quantity:
+    """Byte count shown in ГБ (binary, as in the rest of the report)"""
+    return Quantity(f"{nbytes / (1024**3):.{digits}f} ГБ", int(nbytes), 'bytes')
+
+
+def megahertz(mhz: float) -> Quantity:
+    return Quantity(f"{mhz} МГц", mhz * 1e6, 'Hz')
+
+
+def percent(value: float, digits: Optional[int] = 1) -> Quantity:
+    text = f"{value}%" if digits is None else f"{value:.{digits}f}%"
+    return Quantity(text, value, 'percent')
+
+
+# Longest phrases first: "физический диск" must win over "диск"
+_GLOSSARY = sorted({
+    'операционная система': 'os', 'версия ос': 'os_version', 'производитель ос': 'os_vendor',
+    'версия сборки': 'build', 'дата установки': 'install_date', 'время работы': 'last_boot',
+    'имя компьютера': 'hostname', 'система': 'system', 'платформа': 'platform',
+    'архитектура': 'architecture', 'процессор': 'processor', 'модель': 'model',
+    'производитель': 'manufacturer', 'количество ядер': 'cores',
+    'логические процессоры': 'logical_processors', 'макс. частота': 'max_clock',
+    'текущая частота': 'current_clock', 'загрузка': 'load', 'кэш': 'cache', 'сокет': 'socket',
+    'модулей памяти': 'memory_modules', 'модуль': 'module', 'скорость': 'speed',
+    'всего слотов памяти': 'memory_slots', 'максимальный объем': 'max_capacity',
+    'установлено': 'installed', 'физически': 'physical', 'озу': 'ram',
+    'файла подкачки': 'swap', 'использование': 'usage', 'использовано': 'used',
+    'используется': 'used', 'доступно': 'available', 'свободно': 'free', 'всего': 'total',
+    'топ процессов по использованию': 'top_processes_by', 'физических дисков': 'physical_disks',
+    'физический диск': 'physical_disk', 'диск': 'disk', 'общий размер': 'total_size',
+    'файловая система': 'filesystem', 'статус': 'status', 'размер': 'size',
+    'тип носителя': 'media_type', 'тип': 'type', 'интерфейс': 'interface',
+    'устройство': 'device', 'видеопамять': 'vram', 'драйвер': 'driver',
+    'частота обновления': 'refresh_rate', 'видеокарта': 'gpu', 'локальный': 'local',
+    'адрес': 'address', 'маска подсети': 'netmask', 'сетевой адаптер': 'network_adapter',
+    'включен': 'enabled', 'материнская плата': 'motherboard', 'версия': 'version',
+    'дата': 'date', 'серийный номер': 'serial_number', 'метод получения': 'method',
+    'емкость': 'capacity', 'монитор': 'monitor', 'мониторов': 'monitors',
+    'разрешение': 'resolution', 'положение': 'position', 'информация': 'info',
+    'обнаружено': 'detected', 'батарея': 'battery', 'заряд': 'charge',
+    'подключено к сети': 'plugged_in', 'осталось времени': 'time_left',
+    'ошибка': 'error', 'трассировка': 'traceback', 'оперативная память': 'memory',
+    'накопители': 'storage', 'диски': 'disks', 'графические процессоры': 'gpus', 'сеть': 'network',
+    'мониторы': 'monitors', '(гб)': 'bytes', '(%)': 'percent',
+}.items(), key=lambda item: -len(item[0]))
+
+_TRANSLIT = dict(zip(
+    'абвгдеёжзийклмнопрстуфхцчшщъыьэюя',
+    ['a', 'b', 'v', 'g', 'd', 'e', 'e', 'zh', 'z', 'i', 'y', 'k', 'l', 'm', 'n', 'o', 'p', 'r', 's',
+     't', 'u', 'f', 'kh', 'ts', 'ch', 'sh', 'shch', '', 'y', '', 'e', 'yu', 'ya']))
+
+_key_cache: Dict[str, str] = {}
+
+
+def stable_key(label: str) -> str:
+    """snake_case ASCII key for a report label, e.g. '  Диск 1 Свободно' -> 'disk_1_free'"""
+    key = _key_cache.get(label)
+    if key is None:
+        text = label.strip().lower()
+        for phrase, token in _GLOSSARY:
+            if phrase in text:
+                text = text.replace(phrase, f' {token} ')
+        text = ''.join(_TRANSLIT.get(ch, ch) for ch in text)
+        key = _key_cache[label] = re.sub(r'[^a-z0-9]+', '_', text).strip('_')
+    return key
+
+
+_MISSING = {'', 'не доступно', 'не доступен', 'n/a', 'неизвестно', 'null'}
+_BOOLEANS = {'да': True, 'нет': False}
+_UNITS = {
+    'тб': ('bytes', 1024**4), 'tb': ('bytes', 1024**4),
+    'гб': ('bytes', 1024**3), 'gb': ('bytes', 1024**3),
+    'мб': ('bytes', 1024**2), 'mb': ('bytes', 1024**2),
+    'кб': ('bytes', 1024), 'kb': ('bytes', 1024),
+    'ггц': ('Hz', 1e9), 'ghz': ('Hz', 1e9),
+    'мгц': ('Hz', 1e6), 'mhz': ('Hz', 1e6),
+    'гц': ('Hz', 1), 'hz': ('Hz', 1),
+    '%': ('percent', 1),
+}
+_QUANTITY = re.compile(r'^(-?\d+(?:[.,]\d+)?)\s*([^\d\s]+)$')
+_INTEGER = re.compile(r'^-?[1-9]\d{0,8}$|^0$')
+# Keys whose digit-only values are identifiers, not counts
+_TEXT_KEYS = ('serial', 'version', 'date', 'model', 'id', 'build', 'boot', 'number', 'socket')
+
+
+def structured_value(value: Any, key: str = '') -> Any:
+    """Report value in base units: Quantity/'12.3 ГБ' -> bytes, 'МГц' -> Hz, 'Да' -> True"""
+    if isinstance(value, Quantity):
+        return value.value
+    if isinstance(value, Row):
+        return dict(value.fields)
+    if isinstance(value, list):
+        return [structured_value(item, key) for item in value]
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    lowered = text.lower()
+    if lowered in _MISSING:
+        return None
+    if lowered in _BOOLEANS:
+        return _BOOLEANS[lowered]
+    match = _QUANTITY.match(text)
+    if match and match.group(2).lower() in _UNITS:
+        unit, factor = _UNITS[match.group(2).lower()]
+        number = float(match.group(1).replace(',', '.')) * factor
+        return int(round(number)) if unit == 'bytes' else number
+    if _INTEGER.match(text) and not any(token in key for token in _TEXT_KEYS):
+        return int(text)
+    return text
+
+
+def structured_section(data: Dict[str, Any], convert: bool = True) -> Dict[str, Any]:
+    """Section dict with stable keys; ``convert=False`` keeps values verbatim (serial numbers)"""
+    result = {}
+    for label, value in data.items():
+        key = stable_key(label)
+        if not key:
+            continue
+        result[key] = structured_value(value, key) if convert else (None if (
+            isinstance(value, str) and value.strip().lower() in _MISSING) else value)
+    return result
+
+
+def write_record(record: Any, stream=None):
+    """Write one JSON document plus newline in a single buffered write (NDJSON-friendly)"""
+    stream = sys.stdout if stream is None else stream
+    data = (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+    buffer = getattr(stream, 'buffer', None)
+    if buffer is not None:
+        stream.flush()
+        buffer.write(data)
+        buffer.flush()
+    else:
+        stream.write(data.decode('utf-8'))
+        stream.flush()
@@ -1,87 +1,153 @@
+import argparse
 import platform
 import psutil
 import datetime
 import socket
+import sys
+import time
+from typing import List, Optional
+from cpu_sampler import get_cpu_sampler
+from process_table import SORT_KEYS, get_process_table
 
 
-print("======================================== System Information ========================================")
-uname = platform.uname()
-print(f"System: {uname.system}")
-print(f"Node Name: {uname.node}")
-print(f"Release: {uname.release}")
-print(f"Version: {uname.version}")
-print(f"Machine: {uname.machine}")
-print(f"Processor: {uname.processor}")
-
-print("======================================== Boot Time ========================================")
-boot_time = datetime.datetime.fromtimestamp(psutil.boot_time())
-print(f"Boot Time: {boot_time}")
-
-print("======================================== CPU Info ========================================")
-print(f"Physical cores: {psutil.cpu_count(logical=False)}")
-print(f"Total cores: {psutil.cpu_count(logical=True)}")
-cpufreq = psutil.cpu_freq()
-print(f"Max Frequency: {cpufreq.max:.2f}Mhz")
-print(f"Min Frequency: {cpufreq.min:.2f}Mhz")
-print(f"Current Frequency: {cpufreq.current:.2f}Mhz")
-
-print("CPU Usage Per Core:")
-for i, percentage in enumerate(psutil.cpu_percent(percpu=True, interval=1)):
-    print(f"Core {i}: {percentage}%")
-print(f"Total CPU Usage: {psutil.cpu_percent()}%")
-
-print("======================================== Memory Information ========================================")
-svmem = psutil.virtual_memory()
-print(f"Total: {svmem.total / (1024 ** 3):.2f}GB")
-print(f"Available: {svmem.available / (1024 ** 3):.2f}GB")
-print(f"Used: {svmem.used / (1024 ** 2):.2f}MB")
-print(f"Percentage: {svmem.percent}%")
-
-print("==================== SWAP ====================")
-swap = psutil.swap_memory()
-print(f"Total: {swap.total / (1024 ** 3):.2f}GB")
-print(f"Free: {swap.free / (1024 ** 3):.2f}GB")
-print(f"Used: {swap.used / (1024 ** 2):.2f}MB")
-print(f"Percentage: {swap.percent}%")
-
-print("======================================== Disk Information ========================================")
-print("Partitions and Usage:")
-partitions = psutil.disk_partitions()
-for partition in partitions:
-    print(f"=== Device: {partition.device} ===")
-    print(f"  Mountpoint: {partition.mountpoint}")
-    print(f"  File system type: {partition.fstype}")
+def print_system_report():
+    # CPU usage is sampled in the background while the other sections are printed
+    cpu_sampler = get_cpu_sampler()
+
+    print("======================================== System Information ========================================")
+    uname = platform.uname()
+    print(f"System: {uname.system}")
+    print(f"Node Name: {uname.node}")
+    print(f"Release: {uname.release}")
+    print(f"Version: {uname.version}")
+    print(f"Machine: {uname.machine}")
+    print(f"Processor: {uname.processor}")
+
+    print("======================================== Boot Time ========================================")
+    boot_time = datetime.datetime.fromtimestamp(psutil.boot_time())
+    print(f"Boot Time: {boot_time}")
+
+    print("======================================== CPU Info ========================================")
+    print(f"Physical cores: {psutil.cpu_count(logical=False)}")
+    print(f"Total cores: {psutil.cpu_count(logical=True)}")
+    cpufreq = psutil.cpu_freq()
+    print(f"Max Frequency: {cpufreq.max:.2f}Mhz")
+    print(f"Min Frequency: {cpufreq.min:.2f}Mhz")
+    print(f"Current Frequency: {cpufreq.current:.2f}Mhz")
+
+    print("CPU Usage Per Core:")
+    for i, percentage in enumerate(cpu_sampler.percent_per_core()):
+        print(f"Core {i}: {percentage}%")
+    print(f"Total CPU Usage: {cpu_sampler.percent()}%")
+
+    print("======================================== Memory Information ========================================")
+    svmem = psutil.virtual_memory()
+    print(f"Total: {svmem.total / (1024 ** 3):.2f}GB")
+    print(f"Available: {svmem.available / (1024 ** 3):.2f}GB")
+    print(f"Used: {svmem.used / (1024 ** 2):.2f}MB")
+    print(f"Percentage: {svmem.percent}%")
+
+    print("==================== SWAP ====================")
+    swap = psutil.swap_memory()
+    print(f"Total: {swap.total / (1024 ** 3):.2f}GB")
+    print(f"Free: {swap.free / (1024 ** 3):.2f}GB")
+    print(f"Used: {swap.used / (1024 ** 2):.2f}MB")
+    print(f"Percentage: {swap.percent}%")
+
+    print("======================================== Disk Information ========================================")
+    print("Partitions and Usage:")
+    partitions = psutil.disk_partitions()
+    for partition in partitions:
+        print(f"=== Device: {partition.device} ===")
+        print(f"  Mountpoint: {partition.mountpoint}")
+        print(f"  File system type: {partition.fstype}")
+        try:
+            usage = psutil.disk_usage(partition.mountpoint)
+        except PermissionError:
+            continue
+        print(f"  Total Size: {usage.total / (1024 ** 3):.2f}GB")
+        print(f"  Used: {usage.used / (1024 ** 3):.2f}GB")
+        print(f"  Free: {usage.free / (1024 ** 3):.2f}GB")
+        print(f"  Percentage: {usage.percent}%")
+
+    disk_io = psutil.disk_io_counters()
+    print(f"Total read: {disk_io.read_bytes / (1024 ** 3):.2f}GB")
+    print(f"Total write: {disk_io.write_bytes / (1024 ** 3):.2f}GB")
+
+    print("======================================== Network Information ========================================")
+    net_io = psutil.net_io_counters()
+    addrs = psutil.net_if_addrs()
+    for interface_name, interface_addrs in addrs.items():
+        print(f"=== Interface: {interface_name} ===")
+        for addr in interface_addrs:
+            if addr.family == socket.AF_INET:
+                print(f"  IP Address: {addr.address}")
+                print(f"  Netmask: {addr.netmask}")
+                print(f"  Broadcast IP: {addr.broadcast}")
+            elif addr.family == socket.AF_INET6:
+                print(f"  IPv6 Address: {addr.address}")
+                print(f"  Netmask: {addr.netmask}")
+                print(f"  Broadcast IP: {addr.broadcast}")
+            elif addr.family == psutil.AF_LINK:
+                print(f"  MAC Address: {addr.address}")
+                print(f"  Netmask: {addr.netmask}")
+                print(f"  Broadcast MAC: {addr.broadcast}")
+
+    print(f"Total Bytes Sent: {net_io.bytes_sent / (1024 ** 2):.2f}MB")
+    print(f"Total Bytes Received: {net_io.bytes_recv / (1024 ** 2):.2f}MB")
+
+
+def print_top(table, count: int, sort: str, stream=None):
+    """One frame of the live monitor"""
+    stream = sys.stdout if stream is None else stream
+    svmem = psutil.virtual_memory()
+    print(f"{datetime.datetime.now():%H:%M:%S}  CPU: {get_cpu_sampler().percent()}%  "
+          f"Memory: {svmem.percent}%  Processes: {len(table)} (+{table.added} -{table.removed})  "
+          f"Refresh: {table.refresh_seconds * 1000:.1f}ms", file=stream)
+    print(f"{'PID':>7} {'NAME':<28} {'CPU%':>6} {'RSS':>10} {'IO/s':>10}", file=stream)
+    for entry in table.top(count, sort):
+        print(f"{entry.pid:>7} {entry.name[:28]:<28} {entry.cpu_percent:>6.1f} "
+              f"{entry.rss / (1024 ** 2):>8.1f}MB {entry.io_rate / 1024:>8.1f}KB", file=stream)
+
+
+def watch(interval: float = 2.0, count: int = 15, sort: str = 'cpu', iterations: Optional[int] = None):
+    """Top-style monitor: the process table is kept between ticks and updated incrementally"""
+    table = get_process_table()
+    table.refresh()
+    clear = sys.stdout.isatty()
+    tick = 0
+    while iterations is None or tick < iterations:
+        time.sleep(interval)
+        table.refresh()
+        if clear:
+            print("\x1b[H\x1b[2J", end='')
+        elif tick:
+            print()
+        print_top(table, count, sort)
+        sys.stdout.flush()
+        tick += 1
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="System information and a top-style process monitor")
+    parser.add_argument('--watch', action='store_true', help="show the busiest processes continuously")
+    parser.add_argument('--interval', type=float, default=2.0, help="seconds between refreshes (default: 2)")
+    parser.add_argument('--top', type=int, default=15, metavar='N', help="number of processes shown (default: 15)")
+    parser.add_argument('--sort', choices=SORT_KEYS, default='cpu', help="sort by CPU, RSS or I/O rate (default: cpu)")
+    parser.add_argument('--iterations', type=int, metavar='N', help="stop after N refreshes")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    if not args.watch:
+        print_system_report()
+        return
     try:
-        usage = psutil.disk_usage(partition.mountpoint)
-    except PermissionError:
-        continue
-    print(f"  Total Size: {usage.total / (1024 ** 3):.2f}GB")
-    print(f"  Used: {usage.used / (1024 ** 3):.2f}GB")
-    print(f"  Free: {usage.free / (1024 ** 3):.2f}GB")
-    print(f"  Percentage: {usage.percent}%")
-
-disk_io = psutil.disk_io_counters()
-print(f"Total read: {disk_io.read_bytes / (1024 ** 3):.2f}GB")
-print(f"Total write: {disk_io.write_bytes / (1024 ** 3):.2f}GB")
-
-print("======================================== Network Information ========================================")
-net_io = psutil.net_io_counters()
-addrs = psutil.net_if_addrs()
-for interface_name, interface_addrs in addrs.items():
-    print(f"=== Interface: {interface_name} ===")
-    for addr in interface_addrs:
-        if addr.family == socket.AF_INET:
-            print(f"  IP Address: {addr.address}")
-            print(f"  Netmask: {addr.netmask}")
-            print(f"  Broadcast IP: {addr.broadcast}")
-        elif addr.family == socket.AF_INET6:
-            print(f"  IPv6 Address: {addr.address}")
-            print(f"  Netmask: {addr.netmask}")
-            print(f"  Broadcast IP: {addr.broadcast}")
-        elif addr.family == psutil.AF_LINK:
-            print(f"  MAC Address: {addr.address}")
-            print(f"  Netmask: {addr.netmask}")
-            print(f"  Broadcast MAC: {addr.broadcast}")
-
-print(f"Total Bytes Sent: {net_io.bytes_sent / (1024 ** 2):.2f}MB")
-print(f"Total Bytes Received: {net_io.bytes_recv / (1024 ** 2):.2f}MB")
+        watch(args.interval, args.top, args.sort, args.iterations)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_probe import AsyncProbeEngine, ProbeCancelled, ProbeError, ProbeTimeout, active_probe_runner
+
+# Пробы - короткие скрипты того же интерпретатора вместо wmic/powershell
+
+
+def python(code):
+    return [sys.executable, '-c', code]
+
+
+def test_output_exit_status_and_missing_program():
+    engine = AsyncProbeEngine()
+
+    async def main():
+        assert await engine.run(python("print('Name=CPU0')")) == 'Name=CPU0\n'
+        with pytest.raises(ProbeError) as failed:
+            await engine.run(python("import sys; sys.exit(3)"))
+        assert failed.value.returncode == 3 and not isinstance(failed.value, ProbeTimeout)
+        with pytest.raises(ProbeError):
+            await engine.run(['no-such-probe-program'])
+    asyncio.run(main())
+    assert engine.spawns == 2
+
+
+def test_timeout_kills_the_probe():
+    engine = AsyncProbeEngine(timeout=0.3)
+
+    async def main():
+        start = time.monotonic()
+        with pytest.raises(ProbeTimeout):
+            await engine.run(python("import time; time.sleep(30)"))
+        return time.monotonic() - start
+    assert asyncio.run(main()) < 5.0
+
+
+def test_concurrency_is_limited():
+    engine = AsyncProbeEngine(concurrency=2)
+    probe = python("import time; time.sleep(0.4)")
+
+    async def main():
+        start = time.monotonic()
+        await asyncio.gather(*(engine.run(probe) for _ in range(4)))
+        return time.monotonic() - start
+    # 4 пробы по 0.4 с, не более двух одновременно: не меньше двух "волн"
+    assert asyncio.run(main()) >= 0.8
+
+
+def test_collector_timeout_cancels_its_probes():
+    engine = AsyncProbeEngine()
+    outcome = []
+    done = threading.Event()
+
+    def collector():
+        runner = active_probe_runner()
+        try:
+            try:
+                runner(python("import time; time.sleep(30)"))
+            except ProbeError as e:
+                outcome.append(type(e))
+            # После отмены новые пробы сборщика не запускаются
+            try:
+                runner(python("print('late')"))
+            except ProbeError as e:
+                outcome.append(type(e))
+        finally:
+            done.set()
+
+    async def main():
+        start = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await engine.call(collector, timeout=0.3)
+        return time.monotonic() - start
+    assert asyncio.run(main()) < 5.0
+    assert done.wait(5.0)
+    assert outcome == [ProbeCancelled, ProbeCancelled]
+    assert engine.spawns == 1
+    # Вне движка исполнителя нет
+    assert active_probe_runner() is None
@@ -0,0 +1,92 @@
+import collections
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cpu_sampler
+from cpu_sampler import CpuSampler, _busy_total
+
+Times = collections.namedtuple('Times', 'user system idle iowait guest')
+
+
+class FakeCpu:
+    """psutil и часы: счетчики времени CPU меняются только вручную"""
+
+    def __init__(self, cores=2):
+        self.now = 100.0
+        self.cores = [[0.0, 0.0] for _ in range(cores)]  # (занято, простой) на ядро
+        self.sleeps = []
+
+    def run(self, seconds, busy):
+        """Прошло ``seconds`` секунд, каждое ядро занято долю ``busy[i]`` этого времени"""
+        self.now += seconds
+        for core, share in zip(self.cores, busy):
+            core[0] += seconds * share
+            core[1] += seconds * (1 - share)
+
+    def cpu_times(self, percpu=False):
+        per_core = [Times(busy, 0.0, idle, 0.0, 0.0) for busy, idle in self.cores]
+        if percpu:
+            return per_core
+        return Times(*(sum(t[i] for t in per_core) for i in range(5)))
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.run(seconds, [1.0] * len(self.cores))
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    cpu = FakeCpu()
+    monkeypatch.setattr(cpu_sampler, 'psutil', cpu)
+    monkeypatch.setattr(cpu_sampler, 'time', cpu)
+    return cpu
+
+
+def sampler_with_ticks(fake, ticks, interval=0.5, **kwargs):
+    """Сборщик без фонового потока: снимки добавляются так, как это делал бы _run"""
+    sampler = CpuSampler(interval=interval, **kwargs)
+    sampler._thread = object()  # _window не запускает поток
+    sampler._history.append(sampler._snapshot())
+    for busy in ticks:
+        fake.run(interval, busy)
+        sampler._history.append(sampler._snapshot())
+    return sampler
+
+
+def test_percent_covers_the_horizon(fake):
+    # 2 с простоя, затем 1 с: ядро 0 занято полностью, ядро 1 - наполовину
+    sampler = sampler_with_ticks(fake, [[0, 0]] * 4 + [[1, 0.5]] * 2)
+    assert sampler.percent() == 75.0
+    assert sampler.percent_per_core() == [100.0, 50.0]
+    assert sampler.percent(horizon=3.0) == 25.0
+    assert fake.sleeps == []
+
+
+def test_horizon_longer_than_history_uses_the_oldest_snapshot(fake):
+    sampler = sampler_with_ticks(fake, [[1, 1], [0, 0]])
+    assert sampler.percent(horizon=60.0) == 50.0
+
+
+def test_fresh_sampler_waits_only_the_minimum_window(fake):
+    sampler = sampler_with_ticks(fake, [], min_window=0.1)
+    assert sampler.percent() == 100.0
+    assert fake.sleeps == [pytest.approx(0.1)]
+    assert sampler.waited == pytest.approx(0.1)
+
+
+def test_guest_time_is_not_counted_twice():
+    # guest уже входит в user
+    assert _busy_total(Times(10.0, 5.0, 80.0, 5.0, 4.0)) == (15.0, 100.0)
+
+
+def test_idle_counters_give_zero_not_nan(fake):
+    sampler = sampler_with_ticks(fake, [])
+    fake.now += 1.0  # время идет, счетчики стоят (например, остановленная VM)
+    assert sampler.percent() == 0.0
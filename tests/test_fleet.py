@@ -0,0 +1,170 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import zlib
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fleet
+from fleet import FLAG_COMPRESSED, FRAME_HEADER, FleetAgent, FleetAggregator, FleetError, encode_frame, read_frame
+
+
+def frame_reader(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+def read(data: bytes):
+    async def run():
+        return await read_frame(frame_reader(data))
+    return asyncio.run(run())
+
+
+def test_frame_round_trip():
+    message = {'id': 1, 'op': 'inventory', 'text': 'Процессор ' * 500}
+    assert read(encode_frame(message)) == message
+    compressed = encode_frame(message, compress=True)
+    assert FRAME_HEADER.unpack(compressed[:FRAME_HEADER.size])[1] & FLAG_COMPRESSED
+    assert len(compressed) < len(encode_frame(message))
+    assert read(compressed) == message
+
+
+def test_clean_eof_and_truncated_header():
+    assert read(b'') is None
+    with pytest.raises(FleetError):
+        read(b'\x00\x00')
+
+
+def test_oversized_frame_is_rejected_before_reading():
+    header = FRAME_HEADER.pack(fleet.MAX_FRAME + 1, 0)
+    with pytest.raises(FleetError, match='exceeds'):
+        read(header)
+
+
+def test_decompression_bomb_is_rejected(monkeypatch):
+    monkeypatch.setattr(fleet, 'MAX_FRAME', 1024 * 1024)
+    bomb = zlib.compress(b'[' * (8 * 1024 * 1024), 9)
+    assert len(bomb) < fleet.MAX_FRAME
+    with pytest.raises(FleetError, match='expands'):
+        read(FRAME_HEADER.pack(len(bomb), FLAG_COMPRESSED) + bomb)
+
+
+def test_corrupt_compressed_frame():
+    with pytest.raises(FleetError):
+        read(FRAME_HEADER.pack(4, FLAG_COMPRESSED) + b'junk')
+    truncated = zlib.compress(b'{"id": 1}' * 200)[:-8]
+    with pytest.raises(FleetError):
+        read(FRAME_HEADER.pack(len(truncated), FLAG_COMPRESSED) + truncated)
+
+
+def test_agents_round_trip():
+    async def run():
+        agents = [await FleetAgent(fleet.fake_backends(f'node{i}', sensor_count=64), port=0, name=f'node{i}').start()
+                  for i in range(3)]
+        aggregator = FleetAggregator([f'127.0.0.1:{agent.port}' for agent in agents], compress=True)
+        try:
+            first = await aggregator.poll(('inventory', 'serials', 'sensors'))
+            second = await aggregator.poll(('serials',))
+        finally:
+            await aggregator.close()
+            for agent in agents:
+                await agent.close()
+        return agents, aggregator, first, second
+
+    agents, aggregator, first, second = asyncio.run(run())
+    assert all(host['ok'] for host in first['hosts'].values())
+    names = sorted(host['inventory']['sections']['os']['hostname'] for host in first['hosts'].values())
+    assert names == ['node0', 'node1', 'node2']
+    assert all(len(host['sensors']['sensors']) == 64 for host in first['hosts'].values())
+    assert all(host['ok'] for host in second['hosts'].values())
+    # Соединения переиспользуются между опросами
+    assert aggregator.connects == 3
+    assert sum(agent.requests for agent in agents) == 12
+
+
+def test_agent_survives_bomb():
+    async def run(bomb):
+        agent = await FleetAgent(fleet.fake_backends(), port=0).start()
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', agent.port)
+            writer.write(FRAME_HEADER.pack(len(bomb), FLAG_COMPRESSED) + bomb)
+            await writer.drain()
+            # Агент закрывает только это соединение
+            assert await reader.read() == b''
+            writer.close()
+            aggregator = FleetAggregator([f'127.0.0.1:{agent.port}'])
+            try:
+                return await aggregator.poll(('serials',))
+            finally:
+                await aggregator.close()
+        finally:
+            await agent.close()
+
+    bomb = zlib.compress(b'0' * (fleet.MAX_FRAME + 1), 9)
+    dataset = asyncio.run(run(bomb))
+    assert all(host['ok'] for host in dataset['hosts'].values())
+
+
+def test_shared_monitor_is_created_once_and_polled_serially(monkeypatch):
+    monkeypatch.setattr(fleet, '_monitor', None)
+    created = []
+    state = {'active': 0, 'overlaps': 0, 'polls': 0}
+
+    class SlowMonitor:
+        def __init__(self):
+            time.sleep(0.01)
+            created.append(self)
+
+        def get_sensor_readings(self):
+            state['active'] += 1
+            state['overlaps'] += state['active'] > 1
+            time.sleep(0.005)
+            state['polls'] += 1
+            state['active'] -= 1
+            return {'temperature': []}
+
+    module = SimpleNamespace(SystemMonitor=SlowMonitor)
+    threads = [threading.Thread(target=fleet._shared_readings, args=(module,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert state['polls'] == 8 and state['overlaps'] == 0
+
+
+def test_truncated_payload_fails_only_its_host():
+    async def short_payload(reader, writer):
+        await read_frame(reader)
+        writer.write(FRAME_HEADER.pack(100, 0) + b'{"id": 1')
+        await writer.drain()
+        writer.close()
+
+    async def run():
+        stub = await asyncio.start_server(short_payload, '127.0.0.1', 0)
+        agents = [await FleetAgent(fleet.fake_backends(f'node{i}'), port=0).start() for i in range(2)]
+        hosts = [f'127.0.0.1:{agent.port}' for agent in agents]
+        hosts.insert(1, f'127.0.0.1:{stub.sockets[0].getsockname()[1]}')
+        aggregator = FleetAggregator(hosts)
+        try:
+            return hosts, await aggregator.poll(('serials',))
+        finally:
+            await aggregator.close()
+            for agent in agents:
+                await agent.close()
+            stub.close()
+            await stub.wait_closed()
+
+    hosts, dataset = asyncio.run(run())
+    results = dataset['hosts']
+    assert [results[host]['ok'] for host in hosts] == [True, False, True]
+    assert 'truncated frame' in results[hosts[1]]['error']
+    with pytest.raises(FleetError, match='truncated frame'):
+        read(FRAME_HEADER.pack(100, 0) + b'{"id": 1')
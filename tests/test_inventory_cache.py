@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inventory_cache import STATIC, InventoryCache
+from probe_memo import inventory_run, memoized
+
+
+def failing_probe():
+    raise OSError('WMI timeout')
+
+
+def collect(probe_fails):
+    serials = {'Система (BIOS)': {'Серийный номер': 'ABC123'}}
+    try:
+        memoized(('cmd', 'wmic cpu get SerialNumber'), failing_probe if probe_fails else lambda: 'CPU1')
+        serials['Процессор'] = {'Серийный номер': 'CPU1'}
+    except Exception:
+        pass  # как в serial.py: устройство просто не попадает в отчет
+    return serials
+
+
+def test_section_with_a_failed_probe_is_not_cached(tmp_path):
+    cache = InventoryCache(str(tmp_path), boot_id='1')
+    with inventory_run():
+        first = cache.cached('serial', STATIC, lambda: collect(True))
+    assert 'Процессор' not in first
+    assert cache.get('serial', STATIC) is None
+    with inventory_run():
+        second = cache.cached('serial', STATIC, lambda: collect(False))
+    assert 'Процессор' in second
+    assert cache.get('serial', STATIC) == second
+
+
+def test_failure_inside_a_nested_section_is_not_cached_outside(tmp_path):
+    cache = InventoryCache(str(tmp_path), boot_id='1')
+    outer = cache.cached('outer', STATIC, lambda: {'inner': cache.cached('inner', STATIC, lambda: collect(True))})
+    assert outer['inner']
+    assert cache.get('inner', STATIC) is None and cache.get('outer', STATIC) is None
+
+
+def test_nested_error_keys_are_not_cached(tmp_path):
+    cache = InventoryCache(str(tmp_path), boot_id='1')
+    cache.cached('serial', STATIC, lambda: {'Диски': {'Ошибка': 'Get-PhysicalDisk недоступен'}})
+    cache.cached('list', STATIC, lambda: {'Модули': [{'Ошибка чтения': 'нет данных'}]})
+    assert cache.get('serial', STATIC) is None and cache.get('list', STATIC) is None
@@ -0,0 +1,71 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import linux_backend
+from inventory_fingerprint import diff_snapshots, fingerprint_sections, split_components
+
+
+def monitors(root, second_mode):
+    # Каталоги перечисляются по имени: DP-1 - первый монитор, HDMI-A-1 - второй
+    for name, mode in (('card0-DP-1', '1920x1080'), ('card0-HDMI-A-1', second_mode)):
+        directory = root / 'sys' / 'class' / 'drm' / name
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / 'status').write_text('connected\n')
+        (directory / 'modes').write_text(mode + '\n')
+    return {'monitors': linux_backend.monitor_info(str(root))}
+
+
+def test_each_monitor_is_its_own_component(tmp_path):
+    components = split_components('monitors', monitors(tmp_path, '2560x1440')['monitors'])
+    assert components['Монитор 1'] == {
+        'monitor': 'DP-1', 'monitor_resolution': '1920x1080', 'monitor_device': 'card0-DP-1'}
+    assert components['Монитор 2'] == {
+        'monitor': 'HDMI-A-1', 'monitor_resolution': '2560x1440', 'monitor_device': 'card0-HDMI-A-1'}
+
+
+def test_change_of_second_monitor_is_reported_on_it(tmp_path):
+    baseline = fingerprint_sections(monitors(tmp_path / 'before', '2560x1440'))
+    current = fingerprint_sections(monitors(tmp_path / 'after', '3840x2160'))
+    changes = diff_snapshots(baseline, current)
+    assert [(c['label'], c['change']) for c in changes] == [('Монитор 2', 'modified')]
+    assert changes[0]['fields'] == {'monitor_resolution': ['2560x1440', '3840x2160']}
+
+
+def test_volatile_fields_do_not_change_the_fingerprint():
+    before = {'memory': {'Всего ОЗУ': '16 ГБ', 'Свободно': '3 ГБ'}}
+    after = {'memory': {'Всего ОЗУ': '16 ГБ', 'Свободно': '9 ГБ'}}
+    assert fingerprint_sections(before) == fingerprint_sections(after)
+
+
+def disks(*models):
+    section = {'Всего физических дисков': str(len(models))}
+    for i, (model, serial) in enumerate(models, 1):
+        section[f'Физический диск {i}'] = model
+        section[f'  Физический диск {i} Серийный номер'] = serial
+        section[f'  Физический диск {i} Размер'] = '931.5 ГБ'
+    return {'disks': section}
+
+
+def test_removing_first_disk_is_one_removal():
+    baseline = fingerprint_sections(disks(('Samsung SSD 980', 'S1'), ('WD Blue', 'W2')))
+    current = fingerprint_sections(disks(('WD Blue', 'W2')))
+    changes = diff_snapshots(baseline, current)
+    assert [(c['change'], c['label'], c['fields'].get('physical_disk_serial_number'))
+            for c in changes if c['component'] != 'disks'] == [('removed', 'Физический диск 1', 'S1')]
+
+
+def test_swapped_disk_is_removal_and_addition():
+    baseline = fingerprint_sections(disks(('Samsung SSD 980', 'S1'), ('WD Blue', 'W2')))
+    current = fingerprint_sections(disks(('Samsung SSD 980', 'S1'), ('Crucial MX500', 'C3')))
+    changes = [(c['change'], c['fields'].get('physical_disk_serial_number'))
+               for c in diff_snapshots(baseline, current)]
+    assert changes == [('removed', 'W2'), ('added', 'C3')]
+
+
+def test_identical_components_are_counted():
+    baseline = fingerprint_sections(disks(('WD Blue', ''), ('WD Blue', '')))
+    current = fingerprint_sections(disks(('WD Blue', '')))
+    assert len(baseline['disks']['components']) == 3
+    assert [c['change'] for c in diff_snapshots(baseline, current) if c['component'] != 'disks'] == ['removed']
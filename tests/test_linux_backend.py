@@ -0,0 +1,32 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import linux_backend
+
+
+def write(root, path, text):
+    path = root.joinpath(*path.split('/'))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def test_monitor_labels_are_numbered(tmp_path):
+    write(tmp_path, 'sys/class/drm/card0-HDMI-A-1/status', 'connected\n')
+    write(tmp_path, 'sys/class/drm/card0-HDMI-A-1/modes', '1920x1080\n1280x720\n')
+    write(tmp_path, 'sys/class/drm/card0-DP-1/status', 'connected\n')
+    write(tmp_path, 'sys/class/drm/card0-DP-1/modes', '2560x1440\n')
+    write(tmp_path, 'sys/class/drm/card0-DP-2/status', 'disconnected\n')
+    info = linux_backend.monitor_info(str(tmp_path))
+    assert info['Всего мониторов'] == "2 физических, 2 всего"
+    resolutions = {info[f'  Монитор {i} Устройство']: info[f'  Монитор {i} Разрешение'] for i in (1, 2)}
+    assert resolutions == {'card0-HDMI-A-1': '1920x1080', 'card0-DP-1': '2560x1440'}
+
+
+def test_offline_memory_blocks_are_not_counted(tmp_path):
+    write(tmp_path, 'sys/devices/system/memory/block_size_bytes', '8000000\n')  # 128 МБ
+    for n in range(16):
+        write(tmp_path, f'sys/devices/system/memory/memory{n}/online', '0\n' if n >= 8 else '1\n')
+    info = linux_backend.memory_details(str(tmp_path))
+    assert info['Установлено ОЗУ (физически)'] == "1.00 ГБ"
@@ -0,0 +1,119 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nfo_parser import index_categories, iter_nfo, load_index, lookup, parse_batch, parse_nfo
+
+REPORT = '''<?xml version="1.0" encoding="UTF-16"?>
+<MsInfo>
+<Metadata>
+<Version>8.0</Version>
+<CreationUTC>10/17/2026 08:00:00</CreationUTC>
+</Metadata>
+<Category name="System Summary">
+<Data>
+<Item><![CDATA[OS Name]]></Item>
+<Value><![CDATA[Microsoft Windows 10 Pro]]></Value>
+</Data>
+<Data>
+<Item><![CDATA[System Name]]></Item>
+<Value><![CDATA[БУХГАЛТЕРИЯ-01]]></Value>
+</Data>
+<Category name="Hardware Resources">
+<Category name="Conflicts/Sharing"/>
+<Category name="IRQs">
+<Data>
+<Resource><![CDATA[IRQ 0]]></Resource>
+<Device><![CDATA[System timer]]></Device>
+</Data>
+</Category>
+</Category>
+<Category name="Components">
+<Category name="Display">
+<Data>
+<Item><![CDATA[Name]]></Item>
+<Value><![CDATA[NVIDIA GeForce RTX 3060]]></Value>
+</Data>
+</Category>
+<Category name="Sound Device"/>
+<Data>
+<Item><![CDATA[Note]]></Item>
+<Value><![CDATA[rows after a subcategory]]></Value>
+</Data>
+</Category>
+</Category>
+</MsInfo>
+'''
+
+
+def write_report(directory, name='report.nfo', text=REPORT):
+    path = os.path.join(str(directory), name)
+    with open(path, 'w', encoding='utf-16') as f:  # с BOM, как у msinfo32
+        f.write(text)
+    return path
+
+
+def test_iterparse_records(tmp_path):
+    path = write_report(tmp_path)
+    metadata = {}
+    records = [(record.category, record.rows) for record in iter_nfo(path, metadata)]
+    assert metadata == {'Version': '8.0', 'CreationUTC': '10/17/2026 08:00:00'}
+    assert [category for category, _ in records] == [
+        'System Summary',
+        'System Summary/Hardware Resources/IRQs',
+        'System Summary/Components/Display',
+        'System Summary/Components',
+    ]
+    assert records[0][1][1] == {'Item': 'System Name', 'Value': 'БУХГАЛТЕРИЯ-01'}
+    assert records[1][1] == [{'Resource': 'IRQ 0', 'Device': 'System timer'}]
+    assert parse_nfo(path)['categories'][2]['rows'] == [{'Item': 'Name', 'Value': 'NVIDIA GeForce RTX 3060'}]
+
+
+def test_sidecar_index_lookup(tmp_path):
+    path = write_report(tmp_path)
+    index = load_index(path)
+    assert os.path.exists(path + '.idx')
+    assert index['encoding'].lower().startswith('utf-16')
+    categories = index_categories(index)
+    assert 'System Summary/Components/Sound Device' in categories
+    assert 'System Summary/Hardware Resources/Conflicts/Sharing' in categories
+
+    display = list(lookup(path, ['Components/Display']))
+    assert [(r.category, r.items()) for r in display] == [
+        ('System Summary/Components/Display', {'Name': 'NVIDIA GeForce RTX 3060'})]
+    summary = list(lookup(path, ['System Summary']))
+    assert [r.category for r in summary] == ['System Summary']
+    assert summary[0].items()['System Name'] == 'БУХГАЛТЕРИЯ-01'
+    # <Category/> без строк и неизвестные имена ничего не дают и не ломают чтение соседних
+    assert list(lookup(path, ['Components/Sound Device', 'Hardware Resources/Conflicts/Sharing', 'Nope'])) == []
+    assert [r.category for r in lookup(path, ['Sound Device', 'Components/Display'])] == [
+        'System Summary/Components/Display']
+
+
+def test_recursive_lookup_matches_iterparse(tmp_path):
+    path = write_report(tmp_path)
+    expected = [r.as_dict() for r in iter_nfo(path) if r.category.startswith('System Summary/Components')]
+    assert [r.as_dict() for r in lookup(path, ['Components'], recursive=True)] == expected
+
+
+def test_stale_index_is_rebuilt(tmp_path):
+    path = write_report(tmp_path)
+    load_index(path)
+    write_report(tmp_path, text=REPORT.replace('RTX 3060', 'RTX 4070 Ti SUPER'))
+    display = list(lookup(path, ['Components/Display']))
+    assert display[0].items() == {'Name': 'NVIDIA GeForce RTX 4070 Ti SUPER'}
+    with open(path + '.idx', encoding='utf-8') as f:
+        assert json.load(f)['size'] == os.path.getsize(path)
+
+
+def test_batch_with_broken_file(tmp_path):
+    paths = [write_report(tmp_path, f'r{i}.nfo') for i in range(3)]
+    paths.append(write_report(tmp_path, 'broken.nfo', REPORT[:400]))
+    output = str(tmp_path / 'dataset.ndjson')
+    stats = parse_batch(paths, output, workers=2)
+    assert stats['files'] == 4 and stats['failed'] == 1
+    with open(output, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 3 * 5 + 1
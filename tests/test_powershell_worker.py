@@ -0,0 +1,93 @@
+import os
+import sys
+import textwrap
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from powershell_worker import PowerShellWorker, PowerShellWorkerError
+
+# Заменитель PowerShell: тот же протокол (строка JSON на запрос и на ответ)
+# поверх stdin/stdout, со сценариями сбоев по тексту скрипта
+STAND_IN = textwrap.dedent('''
+    import json, os, sys, time
+    sys.stdin.reconfigure(encoding='utf-8')
+    sys.stdout.reconfigure(encoding='utf-8')
+    print("Windows PowerShell banner", flush=True)
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        script = request['script']
+        if script == 'crash':
+            os._exit(3)
+        if script == 'hang':
+            time.sleep(30)
+        if script == 'fail':
+            print(json.dumps({'id': request['id'], 'ok': False, 'output': '', 'error': 'boom'}), flush=True)
+            continue
+        if script == 'stale':
+            print(json.dumps({'id': request['id'] - 1, 'ok': True, 'output': 'old'}), flush=True)
+        print(json.dumps({'id': request['id'], 'ok': True, 'output': f"{os.getpid()} {script}\\r\\n"},
+                         ensure_ascii=False), flush=True)
+''')
+
+
+@pytest.fixture
+def worker(tmp_path):
+    script = tmp_path / 'stand_in.py'
+    script.write_text(STAND_IN, encoding='utf-8')
+    worker = PowerShellWorker([sys.executable, str(script)], timeout=10)
+    yield worker
+    worker.close()
+
+
+def run(worker, script, **kwargs):
+    pid, output = worker.run(script, **kwargs).split(' ', 1)
+    return int(pid), output
+
+
+def test_one_process_serves_all_requests(worker):
+    first, output = run(worker, 'Get-WmiObject Win32_BIOS')
+    assert output == 'Get-WmiObject Win32_BIOS'
+    second, output = run(worker, 'Write-Output "Серийный номер"')
+    assert output == 'Write-Output "Серийный номер"'
+    assert first == second == worker.process.pid
+    assert worker.restarts == 0
+
+
+def test_error_response_keeps_the_process(worker):
+    pid, _ = run(worker, 'ok')
+    with pytest.raises(PowerShellWorkerError, match='boom'):
+        worker.run('fail')
+    assert run(worker, 'ok')[0] == pid
+
+
+def test_response_to_another_request_is_skipped(worker):
+    assert run(worker, 'stale')[1] == 'stale'
+
+
+def test_crash_restarts_on_next_request(worker):
+    pid, _ = run(worker, 'ok')
+    with pytest.raises(PowerShellWorkerError):
+        worker.run('crash')
+    new_pid, output = run(worker, 'ok')
+    assert output == 'ok' and new_pid != pid
+    assert worker.restarts == 1
+
+
+def test_timeout_kills_the_hung_process(worker):
+    pid, _ = run(worker, 'ok')
+    with pytest.raises(PowerShellWorkerError):
+        worker.run('hang', timeout=0.5)
+    assert not worker.is_alive()
+    assert run(worker, 'ok')[0] != pid
+
+
+def test_close_ends_the_process(worker):
+    run(worker, 'ok')
+    process = worker.process
+    worker.close()
+    assert process.poll() is not None
+    assert worker.process is None
@@ -0,0 +1,78 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from probe_memo import ProbeMemo, inventory_run, memoized, normalize_command
+
+
+def test_value_and_error_are_remembered():
+    memo = ProbeMemo()
+    calls = []
+    assert memo.get_or_run('a', lambda: calls.append(1) or 'value') == 'value'
+    assert memo.get_or_run('a', lambda: calls.append(1) or 'other') == 'value'
+
+    def missing():
+        calls.append(2)
+        raise FileNotFoundError('wmic')
+    for _ in range(2):
+        with pytest.raises(FileNotFoundError):
+            memo.get_or_run('b', missing)
+    assert calls == [1, 2]
+    assert (memo.executions, memo.hits) == (2, 2)
+
+
+def test_interrupt_is_not_remembered():
+    memo = ProbeMemo()
+
+    def interrupted():
+        raise KeyboardInterrupt
+    with pytest.raises(KeyboardInterrupt):
+        memo.get_or_run('a', interrupted)
+    assert len(memo) == 0
+    assert memo.get_or_run('a', lambda: 'value') == 'value'
+
+
+def test_waiter_retries_after_interrupt():
+    memo = ProbeMemo()
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def interrupted():
+        started.set()
+        release.wait()
+        raise KeyboardInterrupt
+
+    def owner():
+        try:
+            memo.get_or_run('a', interrupted)
+        except KeyboardInterrupt:
+            results.append('interrupted')
+
+    first = threading.Thread(target=owner)
+    first.start()
+    started.wait()
+    second = threading.Thread(target=lambda: results.append(memo.get_or_run('a', lambda: 'value')))
+    second.start()
+    release.set()
+    first.join()
+    second.join()
+    assert sorted(results) == ['interrupted', 'value']
+
+
+def test_memoized_only_inside_run():
+    calls = []
+    memoized('k', lambda: calls.append(1))
+    memoized('k', lambda: calls.append(1))
+    with inventory_run():
+        memoized('k', lambda: calls.append(2))
+        memoized('k', lambda: calls.append(2))
+    assert calls == [1, 1, 2]
+
+
+def test_normalize_command():
+    assert normalize_command('WMIC  cpu get Name /value') == 'wmic cpu get name /value'
+    assert normalize_command('Get-Item  C:\\Temp') == 'Get-Item C:\\Temp'
@@ -0,0 +1,62 @@
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cpu_sampler
+from collection_benchmark import run_sections
+from probe_replay import FixtureBundle, replaying, tool_sections
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'windows_desktop.json')
+
+
+def collect(bundle, tools=('hardware', 'serial')):
+    with contextlib.redirect_stdout(io.StringIO()):
+        with replaying(bundle) as runner:
+            result = {tool: {title: func() for title, func in tool_sections(tool)} for tool in tools}
+    return result, runner
+
+
+def test_replayed_sections():
+    result, runner = collect(FixtureBundle.load(FIXTURE))
+    hardware = result['hardware']
+    assert hardware['Операционная система']['Имя компьютера'] == 'DESKTOP-01'
+    assert hardware['Операционная система']['Производитель ОС'] == 'Microsoft Windows 10 Pro'
+    cpu = hardware['Процессор (CPU)']
+    assert cpu['Модель'] == 'Intel(R) Core(TM) i7-9700 CPU @ 3.00GHz'
+    assert (cpu['Количество ядер'], cpu['Архитектура'], cpu['L3 кэш']) == ('8', 'x64', '12288 KB')
+    assert hardware['Оперативная память (RAM)']['Модуль 2 (BANK 2)'] == '8.0 ГБ'
+    assert hardware['Накопители (Диски)']['Физический диск 1'] == 'ST1000DM010-2EP102'
+    assert hardware['Графические процессоры (GPU)']['GPU 0'] == 'NVIDIA GeForce GTX 1060'
+    assert hardware['Материнская плата']['Серийный номер'] == 'MB998877'
+    serials = result['serial']['Серийные номера']
+    assert serials['Процессор']['Серийный номер'] == 'BFEBFBFF000906ED'
+    assert serials['Диск 1 (Samsung SSD 970 EVO 500GB)']['Серийный номер'] == 'S466NX0K123456A'
+    assert serials['Система (SMBIOS)'] == {'Серийный номер': 'CH5566', 'Asset Tag': 'TAG1',
+                                           'Метод получения': 'SMBIOS SystemEnclosure'}
+    assert runner.misses == []
+
+
+def test_spawn_counts_and_probe_time(monkeypatch):
+    # Свежий сборщик загрузки CPU: первый запрос ждет минимальное окно
+    sampler = cpu_sampler.CpuSampler(min_window=0.2)
+    monkeypatch.setattr(cpu_sampler, '_cpu_sampler', sampler)
+    try:
+        rows = run_sections(replaying(FixtureBundle.load(FIXTURE)), ['hardware', 'serial'])
+    finally:
+        sampler.stop()
+    spawns = {row['section']: row['spawns'] for row in rows}
+    # Каждая команда запускается один раз за сбор: serial получает общие с hardware запросы WMI
+    # из памяти, а все его PowerShell-скрипты идут в один рабочий процесс (+ wmic батареи и корпуса)
+    assert spawns == {
+        'Операционная система': 1, 'Процессор (CPU)': 1, 'Оперативная память (RAM)': 3,
+        'Накопители (Диски)': 1, 'Графические процессоры (GPU)': 1, 'Сеть': 1, 'Материнская плата': 2,
+        'Мониторы': 0, 'Батарея': 0, 'Серийные номера': 3,
+    }
+    assert all(row['misses'] == 0 for row in rows)
+    cpu = next(row for row in rows if row['section'] == 'Процессор (CPU)')
+    # Ожидание окна загрузки CPU - время пробы, а не разбора
+    assert cpu['probe'] > 0.15
+    assert cpu['wall'] - cpu['probe'] < 0.1
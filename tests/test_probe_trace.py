@@ -0,0 +1,138 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from probe_memo import inventory_run, memoized
+from probe_trace import LatencyHistogram, ProbeTracer, install_tracer, traced_probe, traced_section
+
+# Пробы-заглушки: вывод задается словарем, время - подменой perf_counter
+OUTPUTS = {
+    'wmic cpu get Name /value': 'Name=Intel Core i7-9700\r\n',
+    'wmic bios get Version /value': 'Version=ALASKA-1072009\r\n',
+    'dxdiag /t report.txt': '',
+}
+
+
+@traced_probe('cmd')
+def run(command):
+    if command == 'wmic nosuch get Name /value':
+        raise subprocess.CalledProcessError(44135, command)
+    if command == 'slow':
+        raise subprocess.TimeoutExpired(command, 10)
+    return OUTPUTS[command]
+
+
+@traced_section
+def cpu_section():
+    name = run('wmic cpu get Name /value').split('=', 1)[1].strip()
+    run('wmic bios get Version /value')  # вывод не попадает в результат
+    run('dxdiag /t report.txt')
+    try:
+        run('wmic nosuch get Name /value')
+    except subprocess.CalledProcessError:
+        pass
+    return {'Модель': name}
+
+
+@pytest.fixture
+def tracer():
+    tracer = ProbeTracer(slow_seconds=0.5)
+    previous = install_tracer(tracer)
+    yield tracer
+    install_tracer(previous)
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = LatencyHistogram()
+    for ms in (0.5, 3, 3, 40, 700, 45000):
+        histogram.add(ms / 1000)
+    counts = dict(histogram.buckets())
+    assert counts['<=1ms'] == 1 and counts['<=5ms'] == 2 and counts['<=50ms'] == 1
+    assert counts['<=1000ms'] == 1 and counts['>30000ms'] == 1
+    assert sum(counts.values()) == len(histogram) == 6
+    assert histogram.quantile(0.5) == pytest.approx(0.040)
+    assert histogram.quantile(0.99) == histogram.maximum == pytest.approx(45.0)
+    assert LatencyHistogram().quantile(0.5) == 0.0
+
+
+def test_used_detection_and_status(tracer):
+    assert cpu_section() == {'Модель': 'Intel Core i7-9700'}
+    records = {r.command: r for r in tracer.records}
+    assert all(r.section == 'cpu_section' for r in records.values())
+    assert records['wmic cpu get Name /value'].used is True
+    assert records['wmic bios get Version /value'].used is False
+    # Пустой вывод (dxdiag пишет в файл): использование неизвестно
+    assert records['dxdiag /t report.txt'].used is None
+    failed = records['wmic nosuch get Name /value']
+    assert (failed.status, failed.error, failed.ok) == (44135, 'exit status 44135', False)
+    assert records['wmic cpu get Name /value'].output_bytes == len(OUTPUTS['wmic cpu get Name /value'])
+
+
+def test_summary_and_slow_probes(tracer, monkeypatch):
+    clock = iter([0.0, 0.01, 1.0, 1.8, 2.0, 2.002])
+
+    monkeypatch.setattr('probe_trace.time.perf_counter', lambda: next(clock))
+    run('wmic cpu get Name /value')
+    run('wmic cpu get Name /value')
+    with pytest.raises(subprocess.TimeoutExpired):
+        run('slow')
+    summary = tracer.summary()
+    assert summary['probes'] == 3
+    assert summary['histogram']['<=10ms'] == 1 and summary['histogram']['<=1000ms'] == 1
+    assert summary['sections'] == {'-': {'count': 3, 'total': pytest.approx(0.812), 'max': pytest.approx(0.8)}}
+    cpu = next(c for c in summary['commands'] if c['command'] == 'wmic cpu get Name /value')
+    assert (cpu['count'], cpu['failures'], cpu['p95']) == (2, 0, pytest.approx(0.8))
+    slow = next(c for c in summary['commands'] if c['command'] == 'slow')
+    assert slow['failures'] == 1
+    assert [(r['command'], r['error']) for r in summary['slow']] == [('wmic cpu get Name /value', None)]
+    assert tracer.records[2].error == 'timeout'
+
+
+def test_without_tracer_nothing_is_recorded():
+    tracer = ProbeTracer()
+    assert cpu_section() == {'Модель': 'Intel Core i7-9700'}
+    assert tracer.records == []
+
+
+@traced_section
+def bios_section():
+    # Тот же запрос, что и в cpu_section: из памяти сбора, без нового запуска
+    version = memoized(('cmd', 'bios'), lambda: run('wmic bios get Version /value'))
+    return {'BIOS': version.split('=', 1)[1].strip()}
+
+
+@traced_section
+def board_section():
+    memoized(('cmd', 'bios'), lambda: run('wmic bios get Version /value'))
+    return {'Плата': 'PRIME Z390'}
+
+
+@traced_section
+def shared_first_section():
+    memoized(('cmd', 'bios'), lambda: run('wmic bios get Version /value'))
+    return {}
+
+
+def test_memoized_output_is_used_if_any_section_uses_it(tracer):
+    with inventory_run():
+        shared_first_section()
+        board_section()
+        bios_section()
+    [record] = tracer.records
+    assert (record.section, record.consumers, record.used) == (
+        'shared_first_section', ['board_section', 'bios_section'], True)
+    [command] = tracer.summary()['commands']
+    assert command['sections'] == ['bios_section', 'board_section', 'shared_first_section']
+    assert command['unused'] == 0
+
+
+def test_memoized_output_nobody_uses(tracer):
+    with inventory_run():
+        shared_first_section()
+        board_section()
+    [record] = tracer.records
+    assert (record.consumers, record.used) == (['board_section'], False)
@@ -0,0 +1,189 @@
+import collections
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import process_table
+from process_table import ProcessTable
+
+CpuTimes = collections.namedtuple('CpuTimes', 'user system')
+MemInfo = collections.namedtuple('MemInfo', 'rss')
+IoCounters = collections.namedtuple('IoCounters', 'read_bytes write_bytes')
+
+
+class NoSuchProcess(Exception):
+    pass
+
+
+class AccessDenied(Exception):
+    pass
+
+
+class ZombieProcess(NoSuchProcess):
+    pass
+
+
+class FakeOs:
+    """Таблица процессов ОС: pid -> состояние (имя, время создания, счетчики)"""
+
+    def __init__(self):
+        self.table = {}
+        self.clock = 1000.0
+        self.created = 0
+
+    def start(self, pid, name, cpu=0.0, rss=0, io=0, io_denied=False):
+        self.clock += 1
+        self.table[pid] = {'name': name, 'create_time': self.clock, 'cpu': cpu, 'rss': rss, 'io': io,
+                           'io_denied': io_denied}
+
+    def state(self, pid):
+        if pid not in self.table:
+            raise NoSuchProcess(pid)
+        return self.table[pid]
+
+
+class FakeProcess:
+    """Как psutil.Process: create_time() запоминается при создании объекта"""
+
+    def __init__(self, system, pid):
+        self.pid = pid
+        self._system = system
+        self._create_time = system.state(pid)['create_time']
+        self._proc = self._Implementation(system, pid)
+        system.created += 1
+
+    class _Implementation:
+        def __init__(self, system, pid):
+            self._system, self._pid = system, pid
+
+        def create_time(self):
+            return self._system.state(self._pid)['create_time']
+
+    def oneshot(self):
+        import contextlib
+        return contextlib.nullcontext()
+
+    def name(self):
+        return self._system.state(self.pid)['name']
+
+    def create_time(self):
+        return self._create_time
+
+    def cpu_times(self):
+        cpu = self._system.state(self.pid)['cpu']
+        return CpuTimes(cpu / 2, cpu / 2)
+
+    def memory_info(self):
+        return MemInfo(self._system.state(self.pid)['rss'])
+
+    def io_counters(self):
+        state = self._system.state(self.pid)
+        if state['io_denied']:
+            raise AccessDenied(self.pid)
+        return IoCounters(state['io'], 0)
+
+
+class FakePsutil:
+    NoSuchProcess = NoSuchProcess
+    AccessDenied = AccessDenied
+    ZombieProcess = ZombieProcess
+
+    def __init__(self, system):
+        self.system = system
+
+    def pids(self):
+        return list(self.system.table)
+
+    def Process(self, pid):
+        return FakeProcess(self.system, pid)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def system(monkeypatch):
+    system = FakeOs()
+    monkeypatch.setattr(process_table, 'psutil', FakePsutil(system))
+    system.time = FakeClock()
+    monkeypatch.setattr(process_table, 'time', system.time)
+    return system
+
+
+def tick(system, table, seconds=1.0):
+    system.time.now += seconds
+    return table.refresh()
+
+
+def test_only_new_processes_are_created(system):
+    for pid in range(1, 101):
+        system.start(pid, f'proc{pid}')
+    table = ProcessTable()
+    assert tick(system, table) == (100, 0)
+    assert system.created == 100
+    # Без смены процессов новые объекты не создаются
+    assert tick(system, table) == (0, 0)
+    assert system.created == 100
+    del system.table[5]
+    del system.table[6]
+    system.start(200, 'new')
+    assert tick(system, table) == (1, 2)
+    assert system.created == 101 and len(table) == 99
+
+
+def test_cpu_and_io_rates_are_per_tick_deltas(system):
+    system.start(1, 'busy', cpu=10.0, rss=500, io=1000)
+    system.start(2, 'idle', cpu=1.0, rss=900, io_denied=True)
+    table = ProcessTable()
+    tick(system, table)
+    system.table[1].update(cpu=10.5, io=5000)
+    tick(system, table, seconds=2.0)
+    busy, idle = table.top(2, 'cpu')
+    assert (busy.name, busy.cpu_percent, busy.io_rate) == ('busy', 25.0, 2000.0)
+    assert (idle.cpu_percent, idle.io_rate, idle.io_denied) == (0.0, 0.0, True)
+    assert [e.name for e in table.top(1, 'rss')] == ['idle']
+    assert busy.as_dict() == {'pid': 1, 'name': 'busy', 'cpu_percent': 25.0, 'rss': 500, 'io_rate': 2000}
+    with pytest.raises(ValueError):
+        table.top(1, 'name')
+
+
+def test_reused_pid_is_tracked_as_a_new_process(system):
+    system.start(7, 'old', cpu=100.0)
+    table = ProcessTable()
+    tick(system, table)
+    # Процесс 7 завершился, и PID сразу занял другой: pids() этого не показывает
+    system.start(7, 'new', cpu=0.5)
+    added, removed = tick(system, table)
+    assert (added, removed) == (1, 1)
+    [entry] = table.top(1)
+    # Счетчики нового процесса не вычитаются из счетчиков старого
+    assert (entry.name, entry.cpu_percent, entry.cpu_time) == ('new', 0.0, 0.5)
+    system.table[7]['cpu'] = 1.0
+    tick(system, table)
+    assert table.top(1)[0].cpu_percent == 50.0
+
+
+def test_process_exiting_during_refresh(system):
+    system.start(1, 'short')
+    table = ProcessTable()
+    tick(system, table)
+    real_sample = ProcessTable._sample
+
+    def exits_before_sample(entry, elapsed):
+        system.table.pop(entry.pid, None)
+        return real_sample(entry, elapsed)
+
+    table._sample = exits_before_sample
+    assert tick(system, table) == (0, 1)
+    assert len(table) == 0
@@ -0,0 +1,85 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sensor_alerts import CLEARED, FIRING, AlertEngine, AlertRule
+
+
+def record(index, identifier, category='temperature'):
+    return SimpleNamespace(index=index, identifier=identifier, category=category, name=identifier.rsplit('/', 1)[-1],
+                           hardware='CPU', unit='°C')
+
+
+RECORDS = [record(0, '/intelcpu/0/temperature/0'), record(1, '/intelcpu/0/temperature/1'),
+           record(2, '/intelcpu/0/load/0', 'load')]
+
+
+def run(engine, ticks):
+    """ticks: (время, значения) -> [(время, состояние, датчик, правило)]"""
+    log = []
+    for timestamp, values in ticks:
+        for event in engine.evaluate(values, timestamp):
+            log.append((timestamp, event.state, event.identifier, event.rule.name))
+    return log
+
+
+def test_hysteresis_keeps_the_alert_until_the_value_is_back_below_the_margin():
+    engine = AlertEngine([AlertRule('hot', category='temperature', above=80.0, hysteresis=2.0)])
+    engine.compile(RECORDS)
+    sensor = '/intelcpu/0/temperature/0'
+    log = run(engine, [(t, [value, 50.0, 99.0]) for t, value in enumerate([79, 81, 79, 80, 78.5, 78, 81])])
+    # 79 и 80 после срабатывания - еще не снятие; 78 = 80 - 2 снимает
+    assert log == [(1, FIRING, sensor, 'hot'), (5, CLEARED, sensor, 'hot'), (6, FIRING, sensor, 'hot')]
+    assert [e.identifier for e in engine.active()] == [sensor]
+
+
+def test_for_seconds_needs_the_condition_to_hold():
+    engine = AlertEngine([AlertRule('hot', category='temperature', above=80.0, for_seconds=3.0)])
+    engine.compile(RECORDS[:1])
+    log = run(engine, [(0, [85.0]), (2, [85.0]), (3, [70.0]), (4, [85.0]), (6, [85.0]), (7, [85.0])])
+    # Провал в 3 с сбрасывает ожидание: срабатывание через 3 с после 4 с
+    assert log == [(7, FIRING, '/intelcpu/0/temperature/0', 'hot')]
+
+
+def test_below_and_rate_rules():
+    engine = AlertEngine([
+        AlertRule('cold', sensor='/intelcpu/0/temperature/1', below=10.0, hysteresis=1.0),
+        AlertRule('spike', category='load', rate_above=20.0, hysteresis=5.0),
+    ])
+    engine.compile(RECORDS)
+    log = run(engine, [(0, [50, 12, 10]), (1, [50, 9, 40]), (2, [50, 10.5, 60]), (3, [50, 11, 74]),
+                       (5, [50, 11, 80])])
+    assert log == [(1, FIRING, '/intelcpu/0/temperature/1', 'cold'), (1, FIRING, '/intelcpu/0/load/0', 'spike'),
+                   (3, CLEARED, '/intelcpu/0/temperature/1', 'cold'), (3, CLEARED, '/intelcpu/0/load/0', 'spike')]
+
+
+def test_missing_values_keep_state_and_recompile_keeps_active_alerts():
+    engine = AlertEngine([AlertRule('hot', category='temperature', above=80.0, severity='critical'),
+                          AlertRule('warm', category='temperature', above=70.0)])
+    events = []
+    engine.add_sink(events.append)
+    engine.compile(RECORDS)
+    nan = float('nan')
+    run(engine, [(0, [85.0, 75.0, 0.0]), (1, [nan, nan, nan])])
+    assert engine.severities() == {'/intelcpu/0/temperature/0': 'critical', '/intelcpu/0/temperature/1': 'warning'}
+    # Пересборка реестра (новый порядок датчиков) не повторяет и не теряет срабатывания
+    engine.compile([record(0, '/intelcpu/0/temperature/1'), record(1, '/intelcpu/0/temperature/0')])
+    assert run(engine, [(2, [75.0, 85.0])]) == []
+    assert run(engine, [(3, [60.0, 85.0])]) == [(3, CLEARED, '/intelcpu/0/temperature/1', 'warm')]
+    assert [(e.state, e.rule.name) for e in events] == [(FIRING, 'hot'), (FIRING, 'warm'), (FIRING, 'warm'),
+                                                        (CLEARED, 'warm')]
+
+
+def test_duplicate_rule_names_are_rejected():
+    # Состояние и события привязаны к имени правила: второе правило с тем же именем подменило бы первое
+    rules = [AlertRule('hot', category='temperature', above=80.0), AlertRule('hot', sensor='/gpu*', above=90.0)]
+    with pytest.raises(ValueError, match="duplicate alert rule name 'hot'"):
+        AlertEngine(rules)
+    engine = AlertEngine(rules[:1])
+    engine.rules.append(rules[1])
+    with pytest.raises(ValueError):
+        engine.compile(RECORDS)
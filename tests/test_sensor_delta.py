@@ -0,0 +1,61 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sensor_delta import Deadband, DeltaEmitter
+
+
+def readings(category='temperature', **values):
+    return {category: [{'identifier': f'/cpu/0/{category}/{name}', 'name': name, 'value': value}
+                       for name, value in values.items()]}
+
+
+def emitted(result):
+    keyframe, data = result
+    return keyframe, {s['name']: s['value'] for sensors in data.values() for s in sensors}
+
+
+def test_deadband_absolute_relative_and_any_change():
+    assert not Deadband(absolute=0.5).exceeded(50.0, 50.5)
+    assert Deadband(absolute=0.5).exceeded(50.0, 49.4)
+    assert not Deadband(relative=0.05).exceeded(100.0, 104.0)
+    assert Deadband(relative=0.05).exceeded(100.0, 106.0)
+    # Любое из условий
+    assert Deadband(absolute=10.0, relative=0.01).exceeded(100.0, 102.0)
+    assert not Deadband().exceeded(1.0, 1.0) and Deadband().exceeded(1.0, 1.000001)
+
+
+def test_small_changes_are_suppressed_until_they_add_up():
+    emitter = DeltaEmitter(keyframe_interval=60.0)
+    assert emitted(emitter.process(readings(a=50.0, b=60.0), now=0.0)) == (True, {'a': 50.0, 'b': 60.0})
+    assert emitted(emitter.process(readings(a=50.3, b=60.0), now=1.0)) == (False, {})
+    # Сравнение с последним отправленным значением: дрейф 0.3 + 0.3 превышает 0.5
+    assert emitted(emitter.process(readings(a=50.6, b=60.0), now=2.0)) == (False, {'a': 50.6})
+    assert emitted(emitter.process(readings(a=50.9, b=59.0), now=3.0)) == (False, {'b': 59.0})
+
+
+def test_per_category_deadbands_and_overrides():
+    emitter = DeltaEmitter({'load': Deadband(absolute=10.0)})
+    emitter.process({**readings(a=50.0), **readings('load', l=20.0), **readings('level', x=1.0)}, now=0.0)
+    result = emitter.process({**readings(a=50.6), **readings('load', l=28.0), **readings('level', x=1.01)}, now=1.0)
+    # Температура - 0.5 по умолчанию, нагрузка - переопределенные 10, неизвестная категория - любое изменение
+    assert emitted(result) == (False, {'a': 50.6, 'x': 1.01})
+    assert result[1]['load'] == []
+
+
+def test_new_sensor_is_sent_at_once():
+    emitter = DeltaEmitter()
+    emitter.process(readings(a=50.0), now=0.0)
+    assert emitted(emitter.process(readings(a=50.0, b=30.0), now=1.0)) == (False, {'b': 30.0})
+
+
+def test_keyframes_resend_everything_and_forget_vanished_sensors():
+    emitter = DeltaEmitter(keyframe_interval=10.0)
+    emitter.process(readings(a=50.0, b=60.0), now=0.0)
+    assert emitted(emitter.process(readings(a=50.0), now=5.0)) == (False, {})
+    assert emitted(emitter.process(readings(a=50.0), now=10.0)) == (True, {'a': 50.0})
+    # b пропал в кадре 10 с: вернувшись, он отправляется, хотя значение не изменилось
+    assert emitted(emitter.process(readings(a=50.0, b=60.0), now=11.0)) == (False, {'b': 60.0})
+    emitter.request_keyframe()
+    assert emitted(emitter.process(readings(a=50.0, b=60.0), now=12.0)) == (True, {'a': 50.0, 'b': 60.0})
@@ -0,0 +1,105 @@
+import os
+import re
+import sys
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sensor_exporter import OPENMETRICS_CONTENT_TYPE, PROMETHEUS_CONTENT_TYPE, SensorExporter, render_openmetrics
+
+
+class FakeSensors:
+    """Источник показаний вместо SystemMonitor"""
+
+    def __init__(self):
+        self.polls = 0
+
+    def get_sensor_readings(self):
+        self.polls += 1
+        return {
+            'temperature': [{'identifier': '/amdcpu/0/temperature/0', 'hardware': 'Ryzen "7"', 'name': 'Tctl',
+                             'unit': 'celsius', 'value': 45.5}],
+            'fan': [{'identifier': '/lpc/0/fan/1', 'hardware': 'Nuvoton', 'name': 'Fan #1',
+                     'unit': 'rpm', 'value': 1200.0}],
+        }
+
+
+SAMPLE_SUFFIXES = {'counter': ('_total',), 'gauge': ('',), 'summary': ('_count', '_sum', '')}
+
+
+def families(body):
+    """{TYPE name: (тип, [имена образцов])}"""
+    result, current = {}, None
+    for line in body.splitlines():
+        match = re.match(r'# TYPE (\S+) (\S+)$', line)
+        if match:
+            current = match.group(1)
+            result[current] = (match.group(2), [])
+        elif line and not line.startswith('#'):
+            result[current][1].append(re.match(r'[a-zA-Z_:][a-zA-Z0-9_:]*', line).group(0))
+    return result
+
+
+@pytest.fixture
+def exporter():
+    exporter = SensorExporter(FakeSensors(), interval=60, host='127.0.0.1', port=0).start()
+    yield exporter
+    exporter.stop()
+
+
+def scrape(exporter, accept=None):
+    request = urllib.request.Request(f'http://127.0.0.1:{exporter.port}/metrics')
+    if accept:
+        request.add_header('Accept', accept)
+    with urllib.request.urlopen(request) as response:
+        return response.headers['Content-Type'], response.read().decode('utf-8')
+
+
+def test_prometheus_text_format(exporter):
+    content_type, body = scrape(exporter)
+    assert content_type == PROMETHEUS_CONTENT_TYPE
+    assert '# EOF' not in body
+    parsed = families(body)
+    # 0.0.4: TYPE объявляет само имя образца счетчика
+    assert parsed['sensor_exporter_collections_total'] == ('counter', ['sensor_exporter_collections_total'])
+    for name, (kind, samples) in parsed.items():
+        assert all(sample == name or kind == 'summary' and sample[len(name):] in SAMPLE_SUFFIXES[kind]
+                   for sample in samples), (name, samples)
+
+
+def test_openmetrics_format(exporter):
+    content_type, body = scrape(exporter, 'application/openmetrics-text; version=1.0.0,text/plain;q=0.5')
+    assert content_type == OPENMETRICS_CONTENT_TYPE
+    assert body.endswith('# EOF\n') and body.count('# EOF') == 1
+    parsed = families(body)
+    assert parsed['sensor_exporter_collections'] == ('counter', ['sensor_exporter_collections_total'])
+    for name, (kind, samples) in parsed.items():
+        assert all(sample.startswith(name) and sample[len(name):] in SAMPLE_SUFFIXES[kind]
+                   for sample in samples), (name, samples)
+
+
+def test_scrapes_do_not_poll_hardware(exporter):
+    for _ in range(5):
+        scrape(exporter)
+    assert exporter.source.polls == 1
+    _, body = scrape(exporter)
+    assert 'sensor_exporter_scrape_duration_seconds_count 5' in body
+
+
+def test_sensor_labels_are_escaped():
+    body = render_openmetrics(FakeSensors().get_sensor_readings())
+    assert 'hardware="Ryzen \\"7\\""' in body
+    assert 'hardware_sensor_value{hardware="Nuvoton",sensor="Fan #1",category="fan",unit="rpm",' \
+           'identifier="/lpc/0/fan/1"} 1200.0' in body
+
+
+def test_non_finite_values_use_exposition_spellings():
+    readings = {'fan': [{'name': name, 'value': value, 'hardware': 'Nuvoton', 'unit': 'rpm',
+                         'identifier': f'/lpc/0/fan/{name}'} for name, value in
+                        (('stalled', float('nan')), ('up', float('inf')), ('down', float('-inf')), ('ok', 900))]}
+    values = [line.rsplit(' ', 1)[1] for line in render_openmetrics(readings).splitlines()
+              if not line.startswith('#')]
+    # Prometheus и OpenMetrics понимают только NaN, +Inf и -Inf
+    assert values == ['NaN', '+Inf', '-Inf', '900.0']
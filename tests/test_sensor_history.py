@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sensor_history import SensorHistory, SensorRingBuffer
+
+
+def readings(**values):
+    return {'temperature': [{'identifier': f'/cpu/0/temperature/{name}', 'name': name, 'value': value}
+                            for name, value in values.items()]}
+
+
+def test_ring_keeps_the_newest_samples_in_order():
+    ring = SensorRingBuffer(4)
+    assert ring.latest() is None and len(ring) == 0
+    for i in range(10):
+        ring.append(float(i), i * 10.0)
+    assert len(ring) == 4
+    assert ring.latest() == (9.0, 90.0)
+    timestamps, values = ring.last(10)
+    assert timestamps.tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert values.tolist() == [60.0, 70.0, 80.0, 90.0]
+    assert ring.last(2)[0].tolist() == [8.0, 9.0]
+    assert ring.last(0)[0].tolist() == []
+
+
+def test_views_are_contiguous_at_every_wrap_position():
+    ring = SensorRingBuffer(3)
+    for i in range(7):
+        ring.append(float(i), float(i))
+        timestamps, values = ring.last(3)
+        # Зеркальная копия: после любого числа записей окно - один непрерывный срез
+        assert timestamps.contiguous and timestamps.tolist() == [float(t) for t in range(max(0, i - 2), i + 1)]
+        assert values.tolist() == timestamps.tolist()
+
+
+def test_window_selects_by_time():
+    ring = SensorRingBuffer(5)
+    for i in range(8):
+        ring.append(float(i), -float(i))
+    timestamps, values = ring.window(4.0, 6.0)
+    assert timestamps.tolist() == [4.0, 5.0, 6.0] and values.tolist() == [-4.0, -5.0, -6.0]
+    assert ring.window(5.5)[0].tolist() == [6.0, 7.0]
+    # Начало окна старше хранимой истории: возвращается то, что есть
+    assert ring.window(0.0, 3.5)[0].tolist() == [3.0]
+    assert ring.window(10.0)[0].tolist() == []
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        SensorRingBuffer(0)
+
+
+def test_history_records_reading_sets():
+    history = SensorHistory(capacity=3)
+    history.record(readings(a=40.0, b=50.0), 1.0)
+    history.record(readings(a=41.0), 2.0)
+    assert sorted(history.identifiers()) == ['/cpu/0/temperature/a', '/cpu/0/temperature/b']
+    assert '/cpu/0/temperature/b' in history and '/cpu/0/temperature/c' not in history
+    assert history.last('/cpu/0/temperature/a', 5)[1].tolist() == [40.0, 41.0]
+    assert history.window('/cpu/0/temperature/b', 0.0)[1].tolist() == [50.0]
+    # Неизвестный датчик - пустые представления, а не ошибка
+    assert history.last('/gpu/0/temperature/0', 5)[0].tolist() == []
+    assert history.window('/gpu/0/temperature/0', 0.0)[1].tolist() == []
+    assert history.buffer('/cpu/0/temperature/a').capacity == 3
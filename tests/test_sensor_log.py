@@ -0,0 +1,118 @@
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sensor_log
+from sensor_log import DEFAULT_SEGMENT_ROWS, MAX_SEGMENT_BYTES, SensorLogReader, SensorLogWriter
+
+
+def readings(**values):
+    return {'temperature': [{'identifier': f'/cpu/0/temperature/{name}', 'name': name, 'hardware': 'CPU',
+                             'unit': 'celsius', 'value': value} for name, value in values.items()]}
+
+
+def series(directory, name):
+    with SensorLogReader(directory) as reader:
+        points = []
+        for timestamps, values in reader.scan(f'/cpu/0/temperature/{name}'):
+            points.extend(zip(timestamps.tolist(), values.tolist()))
+        return points
+
+
+def same(points, expected):
+    return len(points) == len(expected) and all(
+        t == et and (math.isnan(v) if math.isnan(ev) else v == ev) for (t, v), (et, ev) in zip(points, expected))
+
+
+def test_new_sensor_joins_the_current_segment(tmp_path):
+    directory = str(tmp_path)
+    with SensorLogWriter(directory, segment_rows=100, batch_size=2) as writer:
+        writer.record(readings(a=40.0), 1.0)
+        writer.record(readings(a=41.0), 2.0)
+        writer.record(readings(a=42.0, b=50.0), 3.0)
+        writer.record(readings(b=51.0), 4.0)
+    segments = writer.index['segments']
+    assert len(segments) == 1 and segments[0]['columns'] == 2 and segments[0]['rows'] == 4
+    assert same(series(directory, 'a'), [(1.0, 40.0), (2.0, 41.0), (3.0, 42.0), (4.0, math.nan)])
+    assert same(series(directory, 'b'), [(1.0, math.nan), (2.0, math.nan), (3.0, 50.0), (4.0, 51.0)])
+
+
+def test_new_sensor_after_restart(tmp_path):
+    directory = str(tmp_path)
+    with SensorLogWriter(directory, segment_rows=100) as writer:
+        writer.record(readings(a=40.0), 1.0)
+    with SensorLogWriter(directory, segment_rows=100) as writer:
+        writer.record(readings(a=41.0, b=50.0), 2.0)
+    assert len(writer.index['segments']) == 1
+    assert same(series(directory, 'b'), [(1.0, math.nan), (2.0, 50.0)])
+
+
+def test_full_segment_starts_a_new_one(tmp_path):
+    directory = str(tmp_path)
+    with SensorLogWriter(directory, segment_rows=3, batch_size=1) as writer:
+        for i in range(7):
+            writer.record(readings(a=float(i)), float(i))
+    assert [s['rows'] for s in writer.index['segments']] == [3, 3, 1]
+    assert series(directory, 'a') == [(float(i), float(i)) for i in range(7)]
+    with SensorLogReader(directory) as reader:
+        assert [list(t) for t, _ in reader.scan('/cpu/0/temperature/a', 2.5, 4.5)] == [[3.0, 4.0]]
+
+
+def test_segment_creation_does_not_touch_the_columns(tmp_path):
+    directory = str(tmp_path)
+    sensors = {f's{i}': 30.0 + i for i in range(300)}
+    start = time.perf_counter()
+    with SensorLogWriter(directory, batch_size=1) as writer:
+        writer.record(readings(**sensors), 1.0)
+    elapsed = time.perf_counter() - start
+    path = os.path.join(directory, writer.index['segments'][0]['file'])
+    # 301 блок x 86400 строк не влезает в MAX_SEGMENT_BYTES: строк в сегменте меньше, файл разреженный
+    assert 0 < writer.index['segments'][0]['rows'] and os.path.getsize(path) <= MAX_SEGMENT_BYTES
+    with SensorLogReader(directory) as reader:
+        capacity = reader._segment(writer.index['segments'][0]['file']).capacity
+    assert DEFAULT_SEGMENT_ROWS // 4 < capacity < DEFAULT_SEGMENT_ROWS
+    assert os.stat(path).st_blocks * 512 < 16 * 1024 * 1024
+    assert elapsed < 1.0
+    assert series(directory, 's299') == [(1.0, 329.0)]
+
+
+def test_segment_that_cannot_grow_is_replaced(tmp_path, monkeypatch):
+    directory = str(tmp_path)
+
+    def mapped_by_reader(segment, columns):
+        raise PermissionError(13, 'The process cannot access the file', segment.path)
+
+    with SensorLogWriter(directory, segment_rows=100, batch_size=1) as writer:
+        writer.record(readings(a=40.0), 1.0)
+        monkeypatch.setattr(sensor_log._Segment, 'add_columns', mapped_by_reader)
+        writer.record(readings(a=41.0, b=50.0), 2.0)
+    assert [(s['columns'], s['rows']) for s in writer.index['segments']] == [(1, 1), (2, 1)]
+    assert series(directory, 'a') == [(1.0, 40.0), (2.0, 41.0)]
+    assert series(directory, 'b') == [(2.0, 50.0)]
+
+
+def test_prune_keeps_segments_it_cannot_delete(tmp_path, monkeypatch, capsys):
+    directory = str(tmp_path)
+    remove = os.remove
+    locked = set()
+
+    def remove_unless_locked(path):
+        if os.path.basename(path) in locked:
+            raise PermissionError(13, 'The process cannot access the file', path)
+        remove(path)
+
+    monkeypatch.setattr(os, 'remove', remove_unless_locked)
+    with SensorLogWriter(directory, segment_rows=2, batch_size=1) as writer:
+        for i in range(6):
+            writer.record(readings(a=float(i)), float(i))
+        locked.add(writer.index['segments'][0]['file'])
+        assert writer.prune(4.0) == 1
+        assert [s['start'] for s in writer.index['segments']] == [0.0, 4.0]
+        assert 'not pruned yet' in capsys.readouterr().err
+        locked.clear()
+        assert writer.prune(4.0) == 1
+    assert [s['start'] for s in writer.index['segments']] == [4.0]
+    assert series(directory, 'a') == [(4.0, 4.0), (5.0, 5.0)]
@@ -0,0 +1,154 @@
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sensors
+from sensor_registry import SensorRegistry, SensorSubscription
+
+CATEGORIES = {'Temperature': 'temperature', 'Load': 'load'}
+UNITS = {'Temperature': '°C', 'Load': '%'}
+
+
+class FakeSensor:
+    def __init__(self, identifier, name, sensor_type, value):
+        self.Identifier = identifier
+        self.Name = name
+        self.SensorType = sensor_type
+        self.value = value
+        self.reads = 0
+
+    @property
+    def Value(self):
+        self.reads += 1
+        return self.value
+
+
+class FakeHardware:
+    def __init__(self, identifier, name, hardware_type, sensors):
+        self.Identifier = identifier
+        self.Name = name
+        self.HardwareType = hardware_type
+        self.Sensors = sensors
+        self.SubHardware = []
+        self.updates = 0
+
+    def Update(self):
+        self.updates += 1
+
+
+class FakeComputer:
+    def __init__(self, hardware=()):
+        self.Hardware = list(hardware)
+
+    def Open(self):
+        pass
+
+
+def cpu():
+    return FakeHardware('/intelcpu/0', 'Intel Core i7', 'Cpu', [
+        FakeSensor('/intelcpu/0/temperature/0', 'CPU Package', 'Temperature', 55.0),
+        FakeSensor('/intelcpu/0/load/0', 'CPU Total', 'Load', 12.5),
+        FakeSensor('/intelcpu/0/factor/0', 'Multiplier', 'Factor', 36.0),
+    ])
+
+
+def gpu():
+    return FakeHardware('/gpu-nvidia/0', 'GeForce GTX 1060', 'GpuNvidia', [
+        FakeSensor('/gpu-nvidia/0/temperature/0', 'GPU Core', 'Temperature', None),
+        FakeSensor('/gpu-nvidia/0/load/0', 'GPU Core', 'Load', 30.0),
+    ])
+
+
+def test_build_resolves_metadata_once():
+    registry = SensorRegistry(FakeComputer([cpu(), gpu()]), CATEGORIES, UNITS)
+    registry.ensure_current()
+    # Датчики без категории (Factor) пропускаются, как и при обходе дерева
+    assert [r.identifier for r in registry.records] == [
+        '/intelcpu/0/temperature/0', '/intelcpu/0/load/0', '/gpu-nvidia/0/temperature/0', '/gpu-nvidia/0/load/0']
+    record = registry.records[0]
+    assert (record.category, record.unit, record.hardware, record.hardware_type) == (
+        'temperature', '°C', 'Intel Core i7', 'Cpu')
+    assert record.as_dict(55.0) == {'name': 'CPU Package', 'value': 55.0, 'hardware': 'Intel Core i7',
+                                    'type': 'Temperature', 'unit': '°C', 'identifier': '/intelcpu/0/temperature/0'}
+    assert registry.builds == 1
+
+
+def test_fetch_reads_only_values():
+    computer = FakeComputer([cpu(), gpu()])
+    registry = SensorRegistry(computer, CATEGORIES, UNITS)
+    registry.ensure_current()
+    values = registry.fetch()
+    assert values[:2].tolist() == [55.0, 12.5] and values[3] == 30.0
+    # Датчик без значения - NaN, а не 0
+    assert math.isnan(values[2])
+    sensor = computer.Hardware[0].Sensors[0]
+    sensor.value = 60.0
+    reads = sensor.reads
+    assert registry.fetch()[0] == 60.0
+    assert sensor.reads == reads + 1
+
+
+def test_rebuild_only_when_the_tree_changes():
+    computer = FakeComputer([cpu()])
+    registry = SensorRegistry(computer, CATEGORIES, UNITS)
+    registry.ensure_current()
+    registry.ensure_current()
+    assert registry.builds == 1
+    # pythonnet отдает новые обертки тех же узлов: это не изменение дерева
+    computer.Hardware = [cpu()]
+    registry.ensure_current()
+    assert registry.builds == 1
+    computer.Hardware.append(gpu())
+    registry.ensure_current()
+    assert registry.builds == 2 and len(registry.records) == 4
+    computer.Hardware[1].Sensors.pop()
+    registry.ensure_current()
+    assert registry.builds == 3 and len(registry.records) == 3
+    # Событие HardwareAdded/HardwareRemoved
+    registry.invalidate(computer, None)
+    registry.ensure_current()
+    assert registry.builds == 4
+
+
+def test_subscription_matches_category_and_hardware_type():
+    registry = SensorRegistry(FakeComputer([cpu(), gpu()]), CATEGORIES, UNITS)
+    registry.ensure_current()
+    temperatures = SensorSubscription(categories=['temperature'])
+    gpus = SensorSubscription(hardware_types=['gpunvidia'])  # без учета регистра
+    gpu_load = SensorSubscription(categories=['load'], hardware_types=['GpuNvidia'])
+    assert [r.identifier for r in registry.records if temperatures.matches(r)] == [
+        '/intelcpu/0/temperature/0', '/gpu-nvidia/0/temperature/0']
+    assert [r.identifier for r in registry.records if gpu_load.matches(r)] == ['/gpu-nvidia/0/load/0']
+    records, nodes = registry.select([gpus, gpu_load])
+    assert [r.identifier for r in records] == ['/gpu-nvidia/0/temperature/0', '/gpu-nvidia/0/load/0']
+    assert nodes == [registry.computer.Hardware[1]]
+
+
+def test_monitor_updates_only_subscribed_hardware(monkeypatch, capsys):
+    computer = FakeComputer([cpu(), gpu()])
+    monkeypatch.setattr(sensors, 'Computer', lambda: computer)
+    monkeypatch.setattr(sensors, 'SENSOR_CATEGORIES', CATEGORIES)
+    monkeypatch.setattr(sensors, 'SENSOR_UNITS', UNITS)
+    monitor = sensors.SystemMonitor()
+    cpu_node, gpu_node = computer.Hardware
+
+    data = monitor.get_sensor_readings()
+    assert (cpu_node.updates, gpu_node.updates) == (1, 1)
+    assert [s['identifier'] for s in data['load']] == ['/intelcpu/0/load/0', '/gpu-nvidia/0/load/0']
+
+    subscription = monitor.subscribe(hardware_types=['GpuNvidia'])
+    data = monitor.get_sensor_readings()
+    # Процессор не обновляется и не читается
+    assert (cpu_node.updates, gpu_node.updates) == (1, 2)
+    assert data == {'temperature': [], 'load': [
+        {'name': 'GPU Core', 'value': 30.0, 'hardware': 'GeForce GTX 1060', 'type': 'Load', 'unit': '%',
+         'identifier': '/gpu-nvidia/0/load/0'}]}
+    reads = cpu_node.Sensors[0].reads
+    monitor.get_sensor_readings()
+    assert cpu_node.Sensors[0].reads == reads
+
+    monitor.unsubscribe(subscription)
+    monitor.get_sensor_readings()
+    assert (cpu_node.updates, gpu_node.updates) == (2, 4)
@@ -0,0 +1,73 @@
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sensor_history import SensorHistory
+from sensor_rollup import RollupSeries, SensorRollups
+
+TIERS = ((60, 3600), (600, 6 * 3600), (3600, 48 * 3600))
+
+
+def filled(seconds, raw=None):
+    rollups = SensorRollups(TIERS, raw=raw)
+    for t in range(0, seconds, 30):
+        rollups.record_value('/cpu/0/temperature/0', float(t), float(t % 100))
+    return rollups
+
+
+def test_finest_tier_that_still_retains_the_start():
+    rollups = filled(12 * 3600)
+    end = 12 * 3600.0
+    # Минутный слой хранит час: на последние полчаса хватает его
+    assert rollups.choose_resolution(60, end - 1800, end) == 60
+    # Три часа назад есть только в 10-минутном слое
+    assert rollups.choose_resolution(60, end - 3 * 3600, end) == 600
+    assert rollups.choose_resolution(0, end - 3 * 3600, end) == 600
+    # Запрошенное разрешение грубее минутного слоя: берётся ближайший не мельче
+    assert rollups.choose_resolution(120, end - 1800, end) == 600
+    assert rollups.choose_resolution(7200, end - 1800, end) == 3600
+    # Никто не хранит начало: слой с самым длинным хранением
+    assert rollups.choose_resolution(60, end - 100 * 3600, end) == 3600
+
+
+def test_query_uses_the_chosen_tier():
+    rollups = filled(12 * 3600)
+    end = 12 * 3600.0
+    resolution, rows = rollups.query('/cpu/0/temperature/0', end - 3 * 3600, end, 60)
+    assert resolution == 600
+    assert rows[0][0] == end - 3 * 3600 and rows[-1][0] == end - 600
+    assert len(rows) == 18
+
+
+def test_retention_is_measured_from_the_newest_sample():
+    rollups = filled(12 * 3600)
+    # Окно в прошлом: минутные корзины за 10-11 часов уже перезаписаны
+    assert rollups.choose_resolution(60, 10 * 3600.0, 11 * 3600.0) == 600
+
+
+def test_raw_samples_only_for_zero_resolution():
+    history = SensorHistory(16)
+    rollups = filled(3600, raw=history)
+    history.record_value('/cpu/0/temperature/0', 3590.0, 42.0)
+    assert rollups.choose_resolution(0, 3500.0, 3600.0) == 0
+    assert rollups.query('/cpu/0/temperature/0', 3500.0, 3600.0)[1] == [(3590.0, 42.0, 42.0, 42.0, 42.0)]
+    assert rollups.choose_resolution(30, 3500.0, 3600.0) == 60
+
+
+def test_ring_wrap_around_overwrites_expired_buckets():
+    series = RollupSeries(10, 30)
+    assert series.capacity == 3
+    for t in range(0, 60, 5):
+        series.add(float(t), float(t))
+    # Корзины 0..20 с перезаписаны корзинами 30..50 с в тех же слотах
+    assert series.buckets(0, 59) == [(30.0, 30.0, 35.0, 32.5, 35.0), (40.0, 40.0, 45.0, 42.5, 45.0),
+                                     (50.0, 50.0, 55.0, 52.5, 55.0)]
+    # Опоздавший отсчёт для перезаписанной корзины отбрасывается
+    series.add(12.0, 1000.0)
+    assert series.buckets(0, 59)[0] == (30.0, 30.0, 35.0, 32.5, 35.0)
+    # После долгой паузы старые корзины не выдаются за свежие
+    series.add(95.0, 7.0)
+    assert series.buckets(60, 99) == [(90.0, 7.0, 7.0, 7.0, 7.0)]
+    assert all(math.isfinite(value) for row in series.buckets(0, 99) for value in row)
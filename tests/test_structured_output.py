@@ -0,0 +1,24 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from structured_output import Row, gigabytes, stable_key, structured_section
+
+
+def test_row_lists_become_lists_of_objects():
+    rows = [Row(f"claude (PID: 18501) - {gigabytes(300 << 20)}",
+                {"name": "claude", "pid": 18501, "rss_bytes": 300 << 20}),
+            Row("bash (PID: 7) - 0.01 ГБ", {"name": "bash", "pid": 7, "rss_bytes": 6 << 20})]
+    section = structured_section({'Всего ОЗУ': gigabytes(8 << 30), 'Топ процессов по использованию ОЗУ': rows})
+    assert section == {
+        'total_ram': 8 << 30,
+        'top_processes_by_ram': [{"name": "claude", "pid": 18501, "rss_bytes": 300 << 20},
+                                 {"name": "bash", "pid": 7, "rss_bytes": 6 << 20}],
+    }
+    assert rows[0] == "claude (PID: 18501) - 0.29 ГБ"
+
+
+def test_stable_key():
+    assert stable_key('  Диск 1 Свободно') == 'disk_1_free'
+    assert stable_key('  Монитор 2 Разрешение') == 'monitor_2_resolution'
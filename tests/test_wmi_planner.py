@@ -0,0 +1,130 @@
+import collections
+import contextlib
+import io
+import os
+import platform
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_probe import ProbeError, use_probe_runner
+from inventory_cache import inventory_cache_bypassed
+from lazy_backend import substitute_module
+from probe_memo import inventory_run
+from probe_trace import ProbeTracer, install_tracer, traced_section
+from wmi_planner import WmiQueryPlanner, get_wmi_planner, parse_wmic_values
+
+# Так wmic пишет /value в канал: '\r\r\n' после каждой строки, пустые строки
+# между экземплярами. Байты взяты как есть, без нормализации.
+MEMORYCHIP_PIPED = (
+    b"\r\r\n\r\r\n"
+    b"BankLabel=BANK 0\r\r\nCapacity=8589934592\r\r\nDeviceLocator=DIMM A1\r\r\n\r\r\n\r\r\n"
+    b"BankLabel=BANK 1\r\r\nCapacity=17179869184\r\r\nDeviceLocator=DIMM B1\r\r\n\r\r\n\r\r\n"
+).decode('cp866')
+
+
+class CountingRunner:
+    """Фальшивый probe runner: отвечает на wmic, считает запуски по классам"""
+
+    def __init__(self):
+        self.wmic = collections.Counter()
+
+    def __call__(self, argv, encoding=None, timeout=None):
+        if argv[0].lower() != 'wmic':
+            raise ProbeError(f"{argv[0]}: not installed")
+        # wmic <класс> get A,B /value или wmic path <класс> get A,B /value
+        get = [a.lower() for a in argv].index('get')
+        self.wmic[' '.join(argv[1:get]).lower()] += 1
+        return ''.join(f"{prop}=1\r\r\n" for prop in argv[get + 1].split(',')) + "\r\r\n"
+
+    def powershell(self, script, timeout=None):
+        raise ProbeError("powershell: not installed")
+
+
+def test_piped_output_keeps_instances_together():
+    records = parse_wmic_values(MEMORYCHIP_PIPED)
+    assert records == [
+        {'banklabel': 'BANK 0', 'capacity': '8589934592', 'devicelocator': 'DIMM A1'},
+        {'banklabel': 'BANK 1', 'capacity': '17179869184', 'devicelocator': 'DIMM B1'},
+    ]
+
+
+def test_text_mode_output_keeps_instances_together():
+    # subprocess в текстовом режиме превращает '\r\r\n' в '\n\n'
+    text = MEMORYCHIP_PIPED.replace('\r\r\n', '\n\n')
+    assert len(parse_wmic_values(text)) == 2
+    assert parse_wmic_values(text)[1]['devicelocator'] == 'DIMM B1'
+
+
+def test_single_instance_properties_stay_in_one_record():
+    output = "\r\r\nName=Intel(R) Core(TM) i7\r\r\nNumberOfCores=8\r\r\nSocketDesignation=LGA1700\r\r\n\r\r\n"
+    planner = WmiQueryPlanner(runner=lambda cmd: output)
+    planner.request('cpu', 'Name', 'NumberOfCores', 'SocketDesignation')
+    assert planner.records('cpu') == [
+        {'name': 'Intel(R) Core(TM) i7', 'numberofcores': '8', 'socketdesignation': 'LGA1700'}]
+    assert planner.get('cpu', 'NumberOfCores') == '8'
+
+
+def test_empty_output():
+    assert parse_wmic_values("") == []
+    assert parse_wmic_values("\r\r\n\r\r\n") == []
+
+
+def test_planner_runs_each_class_once():
+    calls = []
+    planner = WmiQueryPlanner(runner=lambda cmd: calls.append(cmd) or "Caption=Windows\r\r\n")
+    planner.request('os', 'Caption')
+    planner.get('os', 'Caption')
+    planner.view('os')
+    assert calls == ["wmic os get Caption /value"]
+    # Новое свойство делает результат неполным: класс запрашивается заново
+    planner.request('os', 'InstallDate')
+    planner.get('os', 'InstallDate')
+    assert calls[-1] == "wmic os get Caption,InstallDate /value"
+
+
+@pytest.fixture
+def windows(monkeypatch):
+    monkeypatch.setattr(platform, 'system', lambda: "Windows")
+    with substitute_module('wmi', None):
+        yield
+
+
+def test_one_wmic_spawn_per_class_across_sections(windows):
+    import hardware
+    import serial
+    runner = CountingRunner()
+    with contextlib.redirect_stdout(io.StringIO()), use_probe_runner(runner), \
+            inventory_cache_bypassed(), inventory_run():
+        for _, collect in hardware.INVENTORY_SECTIONS:
+            collect()
+        serial.get_hardware_serial_numbers()
+        planner = get_wmi_planner()
+    assert runner.wmic, "секции не обратились к wmic"
+    assert max(runner.wmic.values()) == 1, dict(runner.wmic)
+    # Батарею запрашивает только serial.py, остальные классы - через планировщик
+    assert set(runner.wmic) - {'path win32_battery'} <= {c.lower() for c in planner._requested}
+
+
+def test_planner_hits_count_as_consumers_for_tracing():
+    @traced_section
+    def hardware_cpu():
+        return {'Ядра': get_wmi_planner().get('cpu', 'NumberOfCores')}
+
+    @traced_section
+    def serial_cpu():
+        return {'Серийный номер': get_wmi_planner().get('cpu', 'ProcessorId')}
+
+    tracer = ProbeTracer()
+    previous = install_tracer(tracer)
+    try:
+        with inventory_run(), use_probe_runner(CountingRunner()):
+            hardware_cpu()
+            serial_cpu()
+    finally:
+        install_tracer(previous)
+    [record] = tracer.records
+    # Вторая секция получила результат из планировщика, но отмечена как получатель вывода
+    assert (record.section, record.consumers) == ('hardware_cpu', ['serial_cpu'])
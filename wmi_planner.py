@@ -0,0 +1,130 @@
+import threading
+from typing import Dict, List
+from probe_memo import memoized, shell_key, shell_output
+from probe_trace import memo_hit
+
+
+def run_wmic(cmd: str) -> str:
+    """Вывод команды wmic (пустая строка при ошибке); не более одного запуска за сбор"""
+    try:
+        return shell_output(cmd)
+    except Exception:
+        return ""
+
+
+# Свойства WMI, которые запрашивают секции инвентаризации (псевдоним wmic -> свойства)
+WMI_INVENTORY_PROPERTIES = {
+    'os': ['Caption', 'InstallDate', 'LastBootUpTime'],
+    'cpu': ['Name', 'NumberOfCores', 'NumberOfLogicalProcessors', 'MaxClockSpeed', 'Manufacturer',
+            'Architecture', 'L2CacheSize', 'L3CacheSize', 'SocketDesignation',
+            # Серийный номер процессора для serial.py
+            'ProcessorId', 'SerialNumber'],
+    'memorychip': ['BankLabel', 'Capacity', 'Speed', 'Manufacturer', 'PartNumber', 'SerialNumber', 'DeviceLocator'],
+    'memphysical': ['MaxCapacity', 'MemoryDevices'],
+    'computersystem': ['TotalPhysicalMemory'],
+    'diskdrive': ['DeviceID', 'Model', 'Size', 'InterfaceType', 'MediaType'],
+    'path win32_videocontroller': ['Name', 'AdapterRAM', 'DriverVersion', 'CurrentRefreshRate', 'PNPDeviceID'],
+    'nic': ['Name', 'Manufacturer', 'NetEnabled', 'MACAddress'],
+    'baseboard': ['Manufacturer', 'Product', 'Version', 'SerialNumber'],
+    'bios': ['Manufacturer', 'Version', 'ReleaseDate', 'SerialNumber'],
+    # Серийный номер корпуса для serial.py
+    'systemenclosure': ['SerialNumber', 'SMBIOSAssetTag'],
+}
+
+
+def parse_wmic_values(output: str) -> List[Dict[str, str]]:
+    """Разбирает вывод 'wmic ... /value' в список экземпляров (ключи в нижнем регистре)"""
+    # Через канал wmic завершает строки '\r\r\n', и после splitlines() между
+    # свойствами одного экземпляра появляются пустые строки. Поэтому границей
+    # экземпляров служит повтор ключа, а не пустая строка.
+    records = []
+    current = {}
+    for line in output.replace('\r', '').split('\n'):
+        line = line.strip()
+        if '=' not in line:
+            continue
+        key, value = line.split('=', 1)
+        key = key.strip().lower()
+        if key in current:
+            records.append(current)
+            current = {}
+        current[key] = value.strip()
+    if current:
+        records.append(current)
+    return records
+
+
+class WmiQueryPlanner:
+    """Планировщик WMI-запросов: одна команда wmic на класс для всех секций"""
+
+    def __init__(self, runner=None):
+        self.runner = runner if runner is not None else run_wmic
+        self._requested: Dict[str, List[str]] = {}
+        self._results: Dict[str, List[Dict[str, str]]] = {}
+        self._commands: Dict[str, str] = {}
+        # Секции могут собираться параллельно: запрос к одному классу выполняется один раз
+        self._lock = threading.Lock()
+        self._class_locks: Dict[str, threading.Lock] = {}
+
+    def request(self, wmi_class: str, *properties: str):
+        """Регистрирует свойства класса, которые понадобятся секциям"""
+        with self._lock:
+            props = self._requested.setdefault(wmi_class, [])
+            for prop in properties:
+                if prop.lower() not in (p.lower() for p in props):
+                    props.append(prop)
+                    # Новое свойство делает ранее полученный результат неполным
+                    self._results.pop(wmi_class, None)
+
+    def plan(self, properties: Dict[str, List[str]]):
+        """Регистрирует набор свойств сразу для нескольких классов"""
+        for wmi_class, props in properties.items():
+            self.request(wmi_class, *props)
+
+    def records(self, wmi_class: str) -> List[Dict[str, str]]:
+        """Возвращает все экземпляры класса, выполняя запрос не более одного раза"""
+        with self._lock:
+            if wmi_class in self._results:
+                self._reused(wmi_class)
+                return self._results[wmi_class]
+            props = list(self._requested.get(wmi_class, []))
+            class_lock = self._class_locks.setdefault(wmi_class, threading.Lock())
+        if not props:
+            return []
+        with class_lock:
+            if wmi_class in self._results:
+                self._reused(wmi_class)
+            else:
+                command = f"wmic {wmi_class} get {','.join(props)} /value"
+                output = self.runner(command)
+                self._commands[wmi_class] = command
+                self._results[wmi_class] = parse_wmic_values(output)
+            return self._results[wmi_class]
+
+    def _reused(self, wmi_class: str):
+        # Для трассировки: результат запроса получила еще одна секция (см. probe_trace.memo_hit)
+        memo_hit(shell_key(self._commands[wmi_class]))
+
+    def view(self, wmi_class: str) -> Dict[str, str]:
+        """Свойства первого экземпляра класса"""
+        records = self.records(wmi_class)
+        return records[0] if records else {}
+
+    def get(self, wmi_class: str, prop: str, default: str = "Не доступно") -> str:
+        """Значение одного свойства первого экземпляра класса"""
+        return self.view(wmi_class).get(prop.lower(), default)
+
+
+def _new_planner() -> WmiQueryPlanner:
+    planner = WmiQueryPlanner()
+    planner.plan(WMI_INVENTORY_PROPERTIES)
+    return planner
+
+
+def get_wmi_planner() -> WmiQueryPlanner:
+    """Планировщик текущего сбора (inventory_run) со всеми свойствами, нужными секциям.
+
+    Его используют и hardware.py, и serial.py, поэтому каждый класс WMI
+    запрашивается один раз за сбор; вне сбора каждый вызов получает новый планировщик.
+    """
+    return memoized(('wmi_planner',), _new_planner)